@@ -45,6 +45,8 @@ logger.add(f"{CommonUtil.get_external_path()}/error.log", rotation="10 MB", rete
 
 @logger.catch
 def main():
+    # 预览框在第一次使用时才加载 QtWebEngine，需要在创建 QApplication 前允许共享 OpenGL 上下文
+    QApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
 
 
@@ -36,6 +36,7 @@ class FsConstants(AppConstants):
 
     EDIT_BTN_PATH = "resources/images/btn/edit-btn.svg"
     MARKDOWN_BTN_PATH = "resources/images/btn/markdown-btn.svg"
+    SPLIT_BTN_PATH = "resources/images/btn/split-btn.svg"
     NEW_DIARY_BTN_PATH = "resources/images/btn/new-diary-btn.svg"
 
     BOLD_ICON_PATH = "resources/images/icon/bold.svg"
@@ -78,6 +79,14 @@ class FsConstants(AppConstants):
     DIARY_ENC_PATH = "diaries"
     DIARY_ARTICLE_PATH = "diaries/Diary"
     DIARY_KEY_PATH = "secret.key"
+    CACHE_PATH = "cache"
+    DATABASE_PATH = "database"
+    VAULT_SCAN_CACHE_FILE = "vault_scan.json"
+    SQLITE_VAULT_FILE = "diary.db"
+    SEARCH_INDEX_FILE = "search_index.enc"
+    LINK_INDEX_FILE = "link_index.enc"
+    TREE_SNAPSHOT_FILE = "tree_snapshot.json"
+    RENDER_CACHE_PATH = "render"
 
     #首选项
     PREFERENCES_WINDOW_TITLE = "首选项"
@@ -95,6 +104,18 @@ class FsConstants(AppConstants):
     WEBDAV_PASSWORD_KEY = "webdav.password"
     WEBDAV_LOCAL_DIR_KEY = "webdav.local.dir"
     WEBDAV_REMOTE_DIR_KEY = "webdav.remote.dir"
+    # 新写入日记的加密算法：fernet / aesgcm，aesgcm 需要显式开启，旧版本无法读取
+    ENCRYPTION_ALGORITHM_KEY = "encryption.algorithm"
+    # 按年/月分目录存放日记
+    STORAGE_SHARDED_KEY = "storage.sharded"
+    # 目录树中平铺显示年/月目录里的日记
+    TREE_SHARD_FLAT_KEY = "tree.shard.flat"
+    # 日记存储后端：file（每篇一个 .enc 文件）或 sqlite（单个数据库文件）
+    STORAGE_BACKEND_KEY = "storage.backend"
+    # 已解密日记的内存缓存大小（MB），0 表示不缓存
+    DIARY_CACHE_SIZE_KEY = "cache.diary.size"
+    # 预览渲染结果的磁盘缓存大小（MB），0 表示不缓存
+    RENDER_CACHE_SIZE_KEY = "cache.render.size"
     # 默认值
     NEW_CONFIG = {
         WEBDAV_AUTO_CHECKED_KEY: False,
@@ -103,6 +124,12 @@ class FsConstants(AppConstants):
         WEBDAV_PASSWORD_KEY: "",
         WEBDAV_LOCAL_DIR_KEY: "",
         WEBDAV_REMOTE_DIR_KEY: "",
+        ENCRYPTION_ALGORITHM_KEY: "fernet",
+        STORAGE_SHARDED_KEY: False,
+        TREE_SHARD_FLAT_KEY: False,
+        STORAGE_BACKEND_KEY: "file",
+        DIARY_CACHE_SIZE_KEY: 32,
+        RENDER_CACHE_SIZE_KEY: 64,
     }
     AppConstants.DEFAULT_CONFIG = {**AppConstants.DEFAULT_CONFIG, **NEW_CONFIG}
     # 类型映射
@@ -113,6 +140,12 @@ class FsConstants(AppConstants):
         WEBDAV_PASSWORD_KEY: str,
         WEBDAV_LOCAL_DIR_KEY: str,
         WEBDAV_REMOTE_DIR_KEY: str,
+        ENCRYPTION_ALGORITHM_KEY: str,
+        STORAGE_SHARDED_KEY: bool,
+        TREE_SHARD_FLAT_KEY: bool,
+        STORAGE_BACKEND_KEY: str,
+        DIARY_CACHE_SIZE_KEY: int,
+        RENDER_CACHE_SIZE_KEY: int,
     }
     AppConstants.CONFIG_TYPES = {**AppConstants.CONFIG_TYPES, **NEW_CONFIG_TYPES}
     ################### INI设置 #####################
\ No newline at end of file
@@ -1,6 +1,6 @@
-from PySide6.QtCore import Signal, Qt
+from PySide6.QtCore import Signal
 from PySide6.QtGui import QAction, QIcon
-from PySide6.QtWidgets import QMenu, QMessageBox, QInputDialog, QFileDialog, QLineEdit, QListWidgetItem
+from PySide6.QtWidgets import QMenu, QMessageBox, QInputDialog, QFileDialog, QLineEdit
 import os
 
 from fs_base.message_util import MessageUtil
@@ -13,21 +13,24 @@ from weasyprint.text.fonts import FontConfiguration
 
 
 class DiaryContextMenu(QMenu):
-    expand_folder_signal = Signal(QListWidgetItem)
+    # 新建了文件夹 (路径)，用于在目录树中加入节点
+    folder_created_signal = Signal(str)
+    # 日记或文件夹改名 (原路径, 新路径)、删除 (路径)，用于同步索引
+    diary_renamed_signal = Signal(str, str)
+    diary_deleted_signal = Signal(str)
 
-    def __init__(self, parent, diary_tree, diary_content, current_file, key, diary_dir, load_expand_folder):
+    def __init__(self, parent, diary_tree, diary_content, current_file, storage, diary_dir):
         super().__init__(parent)
         self.diary_tree = diary_tree
+        self.tree_model = diary_tree.model()
         self.diary_content = diary_content
         self.current_file = current_file
-        self.key = key
+        self.storage = storage
+        self.key = storage.key
         self.diary_dir = diary_dir
 
-        # 动态绑定槽函数
-        self.expand_folder_signal.connect(load_expand_folder)
-
-        selected_item = self.diary_tree.currentItem()
-        self.file_path = selected_item.data(0, Qt.ItemDataRole.UserRole)
+        selected_item = self.selected_node()
+        self.file_path = selected_item.path if selected_item else None
         # 添加新建文件夹选项
         create_folder_action = QAction(QIcon(CommonUtil.get_resource_path(FsConstants.FOLDER_ADD_RIGHT_MENU_PATH)), "新建文件夹", self)
         create_folder_action.triggered.connect(self.create_folder)
@@ -35,14 +38,15 @@ class DiaryContextMenu(QMenu):
         self.addSeparator()  # 分隔线
 
         """设置工具栏"""
-        if selected_item and os.path.isdir(self.file_path):
+        is_dir = bool(selected_item) and selected_item.is_dir
+        if selected_item and is_dir:
             logger.info(f"{CommonUtil.get_resource_path(FsConstants.FOLDER_RENAME_RIGHT_MENU_PATH)}")
             rename_folder_action = QAction(QIcon(CommonUtil.get_resource_path(FsConstants.FOLDER_RENAME_RIGHT_MENU_PATH)), "重命名文件夹", self)
             rename_folder_action.triggered.connect(self.rename_folder)  # 绑定重命名文件夹的操作
             self.addAction(rename_folder_action)
             self.addSeparator()  # 分隔线
 
-        if selected_item and os.path.isfile(self.file_path):
+        if selected_item and not is_dir and self.storage.exists(self.file_path):
             # 重命名选项
             rename_action = QAction(QIcon(CommonUtil.get_resource_path(FsConstants.FILE_RENAME_RIGHT_MENU_PATH)), "重命名日记", self)
             rename_action.triggered.connect(self.rename_diary)
@@ -60,52 +64,56 @@ class DiaryContextMenu(QMenu):
             export_pdf_action.triggered.connect(self.export_to_pdf)
             self.addAction(export_pdf_action)
 
+    def selected_node(self):
+        """目录树中选中的节点"""
+        return self.tree_model.node(self.diary_tree.currentIndex())
+
     def create_folder(self):
         """新建文件夹"""
 
-        selected_item = self.diary_tree.currentItem()
-        parent_path = selected_item.data(0, Qt.ItemDataRole.UserRole) if selected_item else self.diary_dir
+        selected_item = self.selected_node() or self.tree_model.root_node
+        if selected_item and not selected_item.is_dir:
+            # 选中的是日记时在其所在文件夹中新建
+            selected_item = selected_item.parent
+        parent_path = selected_item.path if selected_item else self.diary_dir
 
         folder_name, ok = QInputDialog.getText(self, "新建文件夹", "请输入文件夹名称：")
         if ok and folder_name:
             new_folder_path = os.path.join(parent_path, folder_name)
             try:
-                os.makedirs(new_folder_path, exist_ok=True)
+                self.storage.create_folder(new_folder_path)
                 logger.info(f"成功创建文件夹：{folder_name}")
 
-                self.expand_folder_signal.emit(selected_item)
+                self.folder_created_signal.emit(new_folder_path)
             except Exception as e:
                 logger.error(f"创建文件夹失败：{str(e)}")
                 MessageUtil.show_error_message(f"创建文件夹失败：{str(e)}")
 
     def rename_folder(self):
         """重命名选中的文件夹"""
-        selected_item = self.diary_tree.currentItem()
+        selected_item = self.selected_node()
         if not selected_item:
             MessageUtil.show_warning_message("请先选择一个文件夹！")
             return
 
         # 获取选中项的路径
-        folder_path = selected_item.data(0, Qt.ItemDataRole.UserRole)
+        folder_path = selected_item.path
 
-        if not os.path.isdir(folder_path):
+        if not self.storage.is_dir(folder_path):
             MessageUtil.show_warning_message("选中的不是文件夹！")
             return
 
         # 弹出对话框让用户输入新的文件夹名称
         new_name, ok = QInputDialog.getText(self, "重命名文件夹", "请输入新的文件夹名称:", QLineEdit.EchoMode.Normal,
-                                            selected_item.text(0))
+                                            selected_item.name)
 
         if ok and new_name:
             new_folder_path = os.path.join(os.path.dirname(folder_path), new_name)
 
             try:
-                os.rename(folder_path, new_folder_path)  # 重命名文件夹
-
-                # 更新树形结构
-                selected_item.setText(0, new_name)  # 更新显示的文件夹名称
-                selected_item.setData(0, Qt.ItemDataRole.UserRole, new_folder_path)  # 更新文件夹路径
-                self.expand_folder_signal.emit(selected_item)
+                self.storage.rename(folder_path, new_folder_path)  # 重命名文件夹
+                # 目录树中的节点和子节点路径随之更新
+                self.diary_renamed_signal.emit(folder_path, new_folder_path)
 
                 logger.info(f"文件夹 '{folder_path}' 已重命名为 '{new_folder_path}'")
             except Exception as e:
@@ -115,15 +123,15 @@ class DiaryContextMenu(QMenu):
 
     def delete_diary(self):
         """删除日记"""
-        selected_item = self.diary_tree.currentItem()
+        selected_item = self.selected_node()
         if not selected_item:
             MessageUtil.show_warning_message("请先选择一篇日记！")
             return
         # 获取选中项的路径
-        file_path = selected_item.data(0, Qt.ItemDataRole.UserRole)
+        file_path = selected_item.path
 
         # 确认是否删除
-        diary_name = selected_item.text(0)  # 传入 0 来获取第一列的文本
+        diary_name = selected_item.name
         # 确认是否删除
         reply = QMessageBox.question(
             self.parentWidget(),
@@ -135,19 +143,14 @@ class DiaryContextMenu(QMenu):
         if reply == QMessageBox.StandardButton.Yes:
             # 删除文件
             try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+                if self.storage.exists(file_path):
+                    # 同时从目录树中移除对应项
+                    self.storage.delete(file_path)
+                    self.diary_deleted_signal.emit(file_path)
                     MessageUtil.show_success_message(f"已删除日记")
                 else:
                     MessageUtil.show_warning_message(f"文件不存在")
-
-                # 从树形结构中移除对应项
-                parent_item = selected_item.parent()
-                if parent_item:
-                    parent_item.removeChild(selected_item)
-                else:
-                    self.diary_tree.takeTopLevelItem(self.diary_tree.indexOfTopLevelItem(selected_item))
-                self.expand_folder_signal.emit(selected_item)
+                    self.tree_model.remove_node(selected_item)
 
                 # 如果删除的是当前日记，清空编辑框
                 if self.current_file == diary_name:
@@ -162,17 +165,17 @@ class DiaryContextMenu(QMenu):
     def rename_diary(self):
         """重命名选中的日记"""
         # 获取当前选中的列表项
-        current_item = self.diary_tree.currentItem()
+        current_item = self.selected_node()
         if not current_item:
             MessageUtil.show_warning_message("请先选择要重命名的日记！")
             return
 
         # 确保选中的项是文件，而不是文件夹
-        if os.path.isdir(self.file_path):
+        if self.storage.is_dir(self.file_path):
             MessageUtil.show_warning_message("无法重命名文件夹！")
             return
 
-        old_name = current_item.text(0)
+        old_name = current_item.name
 
         # 输入新的文件名
         new_name, ok = QInputDialog.getText(self.parentWidget(), "重命名日记", "请输入新的日记名称：", text=old_name)
@@ -184,27 +187,20 @@ class DiaryContextMenu(QMenu):
         parent_dir = os.path.dirname(self.file_path)  # 新增关键行
         base_name = os.path.splitext(new_name)[0]
         new_file_path = os.path.join(parent_dir, f"{base_name}.enc")
-        if os.path.exists(new_file_path):
+        if self.storage.exists(new_file_path):
             MessageUtil.show_warning_message("文件名已存在，请使用其他名称。")
             return
 
         # 重命名文件
         try:
-            os.rename(self.file_path, new_file_path)
-
-            # 更新列表项显示名称
-            current_item.setText(0, new_name)
+            self.storage.rename(self.file_path, new_file_path)
+            self.diary_renamed_signal.emit(self.file_path, new_file_path)
 
             # 如果重命名的是当前正在编辑的文件，更新 self.current_file
             if self.current_file == old_name:
                 self.current_file = new_name
                 # 同步更新文件路径（关键）
                 self.file_path = new_file_path  # 假设上下文菜单的 parent 是 DiaryApp
-
-            # 新增：立即更新父目录的显示
-            parent_item = current_item.parent()
-            if parent_item:
-                self.expand_folder_signal.emit(parent_item)
             MessageUtil.show_success_message(f"日记已重命名")
         except Exception as e:
             logger.error(f"重命名失败：{str(e)}")
@@ -219,7 +215,7 @@ class DiaryContextMenu(QMenu):
             return
 
         # 检查Markdown编辑器是否处于预览模式
-        if not self.diary_content.is_preview_mode():
+        if not self.diary_content.is_preview_mode() and not self.diary_content.is_split_mode():
             MessageUtil.show_warning_message("请切换到预览模式再进行导出！")
             return
 
@@ -241,6 +237,7 @@ class DiaryContextMenu(QMenu):
                     MessageUtil.show_warning_message("当前内容为空，无法导出为PDF！")
                     return
                 font_config = FontConfiguration()
+                # 样式都内联在页面中，不给日记中的 HTML 指定本地的 base URL
                 html = HTML(string=html_content)
                 css = CSS(string=f'''
                     @font-face {{
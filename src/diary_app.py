@@ -1,9 +1,11 @@
 import sys
+import threading
 
-from PySide6.QtGui import QAction, QIcon
+from PySide6.QtGui import QAction, QIcon, QKeySequence, QShortcut
 from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QTextEdit, QListWidget, \
-    QMessageBox, QInputDialog, QWidget, QMenu, QSplitter, QFileDialog, QAbstractItemView, QTreeWidgetItem
-from PySide6.QtCore import Qt, QTimer, QObject, Signal
+    QMessageBox, QInputDialog, QWidget, QMenu, QSplitter, QFileDialog, QAbstractItemView, \
+    QProgressDialog
+from PySide6.QtCore import Qt, QTimer, QObject, Signal, QThread, QFileSystemWatcher
 import os
 
 from fs_base.config_manager import ConfigManager
@@ -12,16 +14,339 @@ from loguru import logger
 from src.const.fs_constants import FsConstants
 from src.context_menu import DiaryContextMenu
 from src.option_webdav_sync import OptionWebDavSync
+from src.quick_open_dialog import QuickOpenDialog
+from src.search.encrypted_index import EncryptedIndex
+from src.search.link_index import LinkIndex
+from src.search.path_index import PathIndex
+from src.search.search_index import SearchIndex
+from src.storage.diary_cache import DiaryCache
+from src.storage.render_cache import RenderCache
+from src.storage.storage_factory import StorageFactory
+from src.storage.storage_migration import StorageMigration
+from src.storage.tree_snapshot import TreeSnapshot
 from src.ui_components import UiComponents
 from src.util.common_util import CommonUtil
+from src.util.diary_file_util import DiaryFileUtil
 from src.util.encryption_util import EncryptionUtil
+from src.util.shard_layout_util import ShardLayoutUtil
 from fs_base.message_util import MessageUtil
+from src.widget.diary_tree_model import DiaryTreeModel
 from src.widget.markdown_editor import MarkdownEditor
+from src.widget.markdown_renderer import MarkdownRenderer
 from weasyprint import HTML, CSS
 from weasyprint.text.fonts import FontConfiguration
 
 DIARY_DIR = f"{CommonUtil.get_diary_article_path()}"
 
+
+class ShardMigrateThread(QThread):
+    """后台批量整理日记目录"""
+    progress_signal = Signal(int, int)
+    finished_signal = Signal(dict)
+
+    def __init__(self, storage, to_sharded):
+        super().__init__()
+        self.storage = storage
+        self.to_sharded = to_sharded
+
+    def run(self):
+        try:
+            moved = ShardLayoutUtil.migrate(self.storage, self.to_sharded, progress=self.progress_signal.emit)
+        except Exception as e:
+            logger.error(f"整理日记目录失败：{str(e)}")
+            moved = {}
+        finally:
+            self.storage.release_thread()
+        self.finished_signal.emit(moved)
+
+
+class StorageMigrateThread(QThread):
+    """后台将日记迁移到新的存储后端"""
+    progress_signal = Signal(int, int)
+    finished_signal = Signal(bool)
+
+    def __init__(self, source, target):
+        super().__init__()
+        self.source = source
+        self.target = target
+
+    def run(self):
+        try:
+            StorageMigration.migrate(self.source, self.target, progress=self.progress_signal.emit)
+            success = True
+        except Exception as e:
+            logger.error(f"迁移日记存储失败：{str(e)}")
+            success = False
+        finally:
+            self.source.release_thread()
+            self.target.release_thread()
+        self.finished_signal.emit(success)
+
+
+class IndexBuildThread(QThread):
+    """后台加载并补齐全文索引和链接索引，每篇日记只解密一次"""
+    progress_signal = Signal(int, int)
+    finished_signal = Signal(int)
+
+    def __init__(self, indexes, storage, load=True):
+        super().__init__()
+        self.indexes = indexes
+        self.storage = storage
+        self.load = load
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        indexed = 0
+        try:
+            if self.load:
+                for index in self.indexes:
+                    index.load()
+            indexed = EncryptedIndex.build_all(self.indexes, self.storage, progress=self.progress_signal.emit,
+                                               cancel_event=self.cancel_event)
+            for index in self.indexes:
+                index.save()
+        except Exception as e:
+            logger.error(f"建立搜索索引失败：{str(e)}")
+        finally:
+            self.storage.release_thread()
+        self.finished_signal.emit(indexed)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class IndexSaveThread(QThread):
+    """后台保存有变化的索引"""
+
+    def __init__(self, indexes):
+        super().__init__()
+        self.indexes = indexes
+
+    def run(self):
+        for index in self.indexes:
+            try:
+                index.save()
+            except Exception as e:
+                logger.error(f"保存索引失败：{str(e)}")
+
+
+class LinkRewriteThread(QThread):
+    """
+    日记改名后，后台批量更新其他日记中指向旧标题的 [[链接]]
+
+    写入前再比较一次读取时的签名，期间被保存过的日记不覆盖；
+    界面打开某篇日记前调用 skip()，之后不再修改这篇日记。跳过的日记记在 skipped 中，结束后由界面处理。
+    """
+    finished_signal = Signal(int)
+
+    def __init__(self, storage, cache, indexes, sources, old_title, new_title):
+        super().__init__()
+        self.storage = storage
+        self.cache = cache
+        self.indexes = indexes
+        self.sources = sources
+        self.old_title = old_title
+        self.new_title = new_title
+        self.skipped = set()
+        self.rewritten = 0
+        # 写入日记时持有，skip() 返回后这篇日记不会再被修改
+        self.lock = threading.Lock()
+
+    def skip(self, path):
+        with self.lock:
+            self.skipped.add(path)
+
+    def run(self):
+        rewritten = 0
+        try:
+            with self.storage.batch():
+                for path in self.sources:
+                    try:
+                        signature = tuple(self.storage.stat(path))
+                        content = self.storage.read(path)
+                        new_content = LinkIndex.rewrite_links(content, self.old_title, self.new_title)
+                        if new_content == content:
+                            continue
+                        with self.lock:
+                            if path in self.skipped:
+                                continue
+                            # 读取之后日记被保存过，不覆盖
+                            if tuple(self.storage.stat(path)) != signature:
+                                self.skipped.add(path)
+                                continue
+                            self.storage.write(path, new_content)
+                            signature = self.storage.stat(path)
+                        self.cache.discard(path)
+                        for index in self.indexes:
+                            index.update(path, new_content, signature)
+                        rewritten += 1
+                    except Exception as e:
+                        logger.warning(f"更新链接失败：{path}, {str(e)}")
+        except Exception as e:
+            logger.error(f"批量更新链接失败：{str(e)}")
+        finally:
+            self.storage.release_thread()
+        self.rewritten = rewritten
+        self.finished_signal.emit(rewritten)
+
+
+class DiaryLoadThread(QThread):
+    """后台读取并解密要打开的日记，优先从缓存中取"""
+    # 请求编号, 路径, 正文（失败时为 None）, 错误信息（文件不存在时为 "missing"）
+    finished_signal = Signal(int, str, object, str)
+
+    def __init__(self, storage, cache, request_id, path):
+        super().__init__()
+        self.storage = storage
+        self.cache = cache
+        self.request_id = request_id
+        self.path = path
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            result = self._load()
+        except Exception as e:
+            result = None, str(e)
+        finally:
+            self.storage.release_thread()
+        if result:
+            self.finished_signal.emit(self.request_id, self.path, *result)
+
+    def _load(self):
+        """返回 (正文, 错误信息)，已取消时返回 None"""
+        if not self.storage.exists(self.path):
+            return None, "missing"
+        signature = self.storage.stat(self.path)
+        content = self.cache.get(self.path, signature)
+        # 已经点击了其他日记，不用再解密
+        if content is None and not self.cancel_event.is_set():
+            content = self.storage.read(self.path)
+            self.cache.put(self.path, content, signature)
+        return (content, "") if content is not None else None
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class DiaryPrefetchThread(QThread):
+    """低优先级后台预读日记到缓存，用户打开其他日记或文件夹时取消"""
+    RECENT_COUNT = 3
+
+    def __init__(self, storage, cache, paths, recent_from=None):
+        """
+        :param paths: 依次预读的日记
+        :param recent_from: 从这些日记中再挑出最近修改的几篇预读
+        """
+        super().__init__()
+        self.storage = storage
+        self.cache = cache
+        self.paths = paths
+        self.recent_from = recent_from or []
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            signatures = {}
+            for path in self.recent_from:
+                if self.cancel_event.is_set():
+                    return
+                signatures[path] = self.storage.stat(path)
+            recent = sorted(signatures, key=lambda path: signatures[path][0], reverse=True)[:self.RECENT_COUNT]
+            for path in dict.fromkeys(self.paths + recent):
+                if self.cancel_event.is_set():
+                    return
+                signature = signatures.get(path) or self.storage.stat(path)
+                if not self.cache.contains(path, signature):
+                    self.cache.put(path, self.storage.read(path), signature, prefetched=True)
+        except Exception as e:
+            logger.debug(f"预读日记失败：{str(e)}")
+        finally:
+            self.storage.release_thread()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class SearchSnippetThread(QThread):
+    """后台读取搜索结果中的日记并生成摘要，优先从缓存中取"""
+    # 请求编号, 结果序号, 摘要（读取失败时为 None）
+    snippet_signal = Signal(int, int, object)
+
+    def __init__(self, storage, cache, request_id, paths, query):
+        super().__init__()
+        self.storage = storage
+        self.cache = cache
+        self.request_id = request_id
+        self.paths = paths
+        self.query = query
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            for row, path in enumerate(self.paths):
+                if self.cancel_event.is_set():
+                    return
+                try:
+                    signature = self.storage.stat(path)
+                    content = self.cache.get(path, signature)
+                    if content is None:
+                        content = self.storage.read(path)
+                        # 和预读一样，不覆盖缓存中较新的内容
+                        self.cache.put(path, content, signature, prefetched=True)
+                    snippet = SearchIndex.snippet(content, self.query)
+                except Exception as e:
+                    logger.warning(f"读取搜索结果失败：{path}, {str(e)}")
+                    snippet = None
+                self.snippet_signal.emit(self.request_id, row, snippet)
+        finally:
+            self.storage.release_thread()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class TreeReconcileThread(QThread):
+    """后台重新读取快照中的文件夹，与实际存储核对"""
+    # 文件夹路径 -> 内容列表，文件夹已不存在时为 None
+    finished_signal = Signal(dict)
+
+    def __init__(self, storage, folders, flat):
+        super().__init__()
+        self.storage = storage
+        self.folders = folders
+        self.flat = flat
+
+    def run(self):
+        results = {}
+        for folder in self.folders:
+            try:
+                results[folder] = self.storage.list_entries(folder, self.flat) if self.storage.is_dir(folder) else None
+            except Exception as e:
+                logger.warning(f"读取文件夹失败：{folder}, {str(e)}")
+        self.storage.release_thread()
+        self.finished_signal.emit(results)
+
+
+class PathIndexThread(QThread):
+    """后台列出所有日记和文件夹"""
+    finished_signal = Signal(list, list)
+
+    def __init__(self, storage):
+        super().__init__()
+        self.storage = storage
+
+    def run(self):
+        try:
+            files, folders = self.storage.list_files(), self.storage.list_folders()
+        except Exception as e:
+            logger.error(f"读取日记列表失败：{str(e)}")
+            files, folders = [], []
+        finally:
+            self.storage.release_thread()
+        self.finished_signal.emit(files, folders)
+
+
 class DiaryApp(QWidget):
     init_connect_webdav_signal = Signal()
 
@@ -35,6 +360,32 @@ class DiaryApp(QWidget):
         if not self.key:
             MessageUtil.show_error_message("无法加载密钥文件！")
             exit()
+        self.apply_encryption_algorithm(self.config_manager.get_config(FsConstants.ENCRYPTION_ALGORITHM_KEY))
+        # 日记存储后端
+        self.storage = StorageFactory.create_default(self.key)
+        # 年/月分目录存放
+        self.storage_sharded = self.config_manager.get_config(FsConstants.STORAGE_SHARDED_KEY)
+        self.shard_flat = self.config_manager.get_config(FsConstants.TREE_SHARD_FLAT_KEY)
+        self.migrate_thread = None
+        self.migrate_dialog = None
+        # 整理日记时收到的存储后端切换，整理完成后再切换
+        self.pending_storage_backend = None
+        # 目录树快照：启动时直接恢复目录树和展开状态，再在后台核对
+        self.tree_snapshot = TreeSnapshot(os.path.join(CommonUtil.get_cache_path(), FsConstants.TREE_SNAPSHOT_FILE),
+                                          DIARY_DIR)
+        self.tree_snapshot.load(self.storage.BACKEND, self.shard_flat)
+        self.tree_reconcile_thread = None
+        self.tree_snapshot_timer = QTimer()
+        self.tree_snapshot_timer.setInterval(2000)
+        self.tree_snapshot_timer.setSingleShot(True)
+        self.tree_snapshot_timer.timeout.connect(self.tree_snapshot.save)
+        QApplication.instance().aboutToQuit.connect(self.tree_snapshot.save)
+        # 目录树图标只创建一次
+        self.tree_icons = {
+            "root": QIcon(CommonUtil.get_resource_path(FsConstants.ROOT_FOLDER_TREE_ICON_PATH)),
+            "folder": QIcon(CommonUtil.get_resource_path(FsConstants.FOLDER_TREE_ICON_PATH)),
+            "diary": QIcon(CommonUtil.get_resource_path(FsConstants.DIARY_TREE_ICON_PATH)),
+        }
 
         # 初始化 WebDav 同步类
         self.webdav_sync = OptionWebDavSync()
@@ -42,6 +393,10 @@ class DiaryApp(QWidget):
 
         # 当前日记文件
         self.current_file = None
+        # 异步加载日记：每次打开日记递增编号，只显示最新一次请求的结果
+        self.load_request = 0
+        self.load_threads = []
+        self.load_callback = None
         self.menu = None
         # 保存延迟计时器
         self.save_timer = QTimer()
@@ -49,6 +404,47 @@ class DiaryApp(QWidget):
         self.save_timer.setSingleShot(True)
         self.save_timer.timeout.connect(self.auto_save)
 
+        # 最近打开的日记解密后的内容，隐藏到托盘时清空
+        self.diary_cache = DiaryCache(self.config_manager.get_config(FsConstants.DIARY_CACHE_SIZE_KEY) * 1024 * 1024)
+        # 预览的渲染结果加密缓存在磁盘上，预览和导出 PDF 共用
+        self.render_cache = RenderCache(
+            self.key, os.path.join(CommonUtil.get_cache_path(), FsConstants.RENDER_CACHE_PATH),
+            MarkdownRenderer.version(), self.config_manager.get_config(FsConstants.RENDER_CACHE_SIZE_KEY) * 1024 * 1024)
+        # 预读线程：取消后仍在运行的旧线程保留引用，结束后再释放
+        self.prefetch_threads = []
+        # 全文索引和链接索引：保存日记时增量更新，变化后延迟写盘，退出时再保存一次
+        self.search_index = SearchIndex(self.key)
+        self.link_index = LinkIndex(self.key)
+        self.index_thread = None
+        self.link_rewrite_thread = None
+        # 加载中的日记要修改的链接 [(路径, 旧标题, 新标题)]，加载完成后修改编辑器内容
+        self.pending_link_rewrites = []
+        self.index_save_thread = None
+        self.index_save_timer = QTimer()
+        self.index_save_timer.setInterval(30000)
+        self.index_save_timer.setSingleShot(True)
+        self.index_save_timer.timeout.connect(self.save_indexes)
+        QApplication.instance().aboutToQuit.connect(self.flush_indexes)
+        # 快速打开：路径索引启动时在后台建立，之后由改名、删除和文件监视增量更新
+        self.path_index = PathIndex(DIARY_DIR)
+        self.path_index_thread = None
+        self.quick_open_dialog = None
+        self.fs_watcher = QFileSystemWatcher()
+        self.fs_watcher.directoryChanged.connect(self.on_directory_changed)
+        self.changed_folders = set()
+        self.folder_sync_timer = QTimer()
+        self.folder_sync_timer.setInterval(300)
+        self.folder_sync_timer.setSingleShot(True)
+        self.folder_sync_timer.timeout.connect(self.sync_changed_folders)
+        # 输入停顿后再搜索
+        self.search_timer = QTimer()
+        self.search_timer.setInterval(200)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.timeout.connect(self.run_search)
+        # 搜索结果的摘要在后台生成：每次搜索递增编号，只填入最新一次的结果
+        self.search_request = 0
+        self.snippet_threads = []
+
         self.init_ui()
 
     def init_ui(self):
@@ -59,16 +455,33 @@ class DiaryApp(QWidget):
         add_button = self.diary_layout.add_button
         self.diary_tree = self.diary_layout.diary_tree
         self.diary_content = self.diary_layout.diary_content
+        self.diary_content.render_cache = self.render_cache
+        # 目录树模型：文件夹展开时读取（优先用快照），悬停时才读取日记元数据
+        self.tree_model = DiaryTreeModel(self.tree_icons, self._folder_entries, self.diary_tooltip, self)
+        self.diary_tree.setModel(self.tree_model)
 
         add_button.clicked.connect(self.new_diary)
-        self.diary_tree.itemClicked.connect(self.load_diary_or_folder)
+        self.diary_tree.clicked.connect(lambda index: self.load_diary_or_folder(self.tree_model.node(index)))
+        self.diary_tree.expanded.connect(self.on_tree_item_expanded)
+        self.diary_tree.collapsed.connect(self.on_tree_item_collapsed)
         self.diary_tree.customContextMenuRequested.connect(self.show_context_menu)
         self.diary_content.textChangedSignal.connect(self.start_save_timer)  # 监听文本修改
-
+        # 搜索
+        self.diary_layout.search_edit.textChanged.connect(self.search_timer.start)
+        self.diary_layout.search_result_list.itemClicked.connect(self.open_search_result)
+        self.diary_layout.index_cancel_button.clicked.connect(self.cancel_index_build)
+        # 链接和标签
+        self.diary_content.wikiLinkClicked.connect(self.open_wiki_link)
+        self.diary_content.tagClicked.connect(self.search_tag)
+        self.diary_layout.backlink_list.itemClicked.connect(
+            lambda backlink_item: self.open_diary_path(backlink_item.data(Qt.ItemDataRole.UserRole)))
+        QShortcut(QKeySequence("Ctrl+P"), self, self.show_quick_open)
 
         main_layout.addWidget(self.diary_layout)
         self.setLayout(main_layout)
         self.load_diary_tree()
+        self.start_path_index_build()
+        self.start_index_build()
         self.webdav_auto_checked = self.config_manager.get_config(FsConstants.WEBDAV_AUTO_CHECKED_KEY)
         if self.webdav_auto_checked:
             logger.info("---- WebDAV触发信号 ----")
@@ -77,63 +490,235 @@ class DiaryApp(QWidget):
     def on_config_updated(self, key, value):
         if key == FsConstants.WEBDAV_AUTO_CHECKED_KEY:
             self.webdav_auto_checked = value
+        elif key == FsConstants.ENCRYPTION_ALGORITHM_KEY:
+            self.apply_encryption_algorithm(value)
+        elif key == FsConstants.DIARY_CACHE_SIZE_KEY:
+            self.diary_cache.set_max_bytes(value * 1024 * 1024)
+        elif key == FsConstants.RENDER_CACHE_SIZE_KEY:
+            self.render_cache.set_max_bytes(value * 1024 * 1024)
+        elif key == FsConstants.STORAGE_SHARDED_KEY and value != self.storage_sharded:
+            self.storage_sharded = value
+            message = "是否将现有日记按创建时间整理到 年/月 目录中？" if value else "是否将 年/月 目录中的日记移回所属文件夹？"
+            reply = QMessageBox.question(self, "整理日记", message,
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes:
+                self.migrate_shard_layout(value)
+        elif key == FsConstants.TREE_SHARD_FLAT_KEY and value != self.shard_flat:
+            self.shard_flat = value
+            self.tree_snapshot.reset(self.storage.BACKEND, self.shard_flat)
+            self.load_diary_tree()
+        elif key == FsConstants.STORAGE_BACKEND_KEY and value != self.storage.BACKEND:
+            self.migrate_storage(value)
+
+    @staticmethod
+    def apply_encryption_algorithm(algorithm):
+        """设置新写入日记的加密算法，读取时按文件头自动识别"""
+        try:
+            EncryptionUtil.set_algorithm(algorithm)
+        except ValueError as e:
+            logger.warning(f"{str(e)}，使用默认算法 {EncryptionUtil.algorithm}")
+
     # 动态绑定信息用到的方法
-    def load_expand_folder(self, item):
-        self.expand_folder(item)
+    def current_node(self):
+        """目录树中选中的节点"""
+        return self.tree_model.node(self.diary_tree.currentIndex())
+
+    def select_node(self, node):
+        self.diary_tree.setCurrentIndex(self.tree_model.index_of(node))
 
     def load_diary_tree(self):
-        """加载树形结构的根目录"""
-        self.diary_tree.clear()
-        root_item = QTreeWidgetItem(self.diary_tree, [os.path.basename(DIARY_DIR)])
-        root_item.setData(0, Qt.ItemDataRole.UserRole, DIARY_DIR)
-        root_item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)  # 标记可展开
-        root_item.setIcon(0, QIcon(CommonUtil.get_resource_path(FsConstants.ROOT_FOLDER_TREE_ICON_PATH)))
-        self.diary_tree.addTopLevelItem(root_item)
+        """加载树形结构的根目录，按快照恢复之前展开的文件夹，随后在后台核对"""
+        root = self.tree_model.set_root(os.path.basename(DIARY_DIR), DIARY_DIR)
+        if self.tree_snapshot.is_expanded(DIARY_DIR):
+            self.diary_tree.setExpanded(self.tree_model.index_of(root), True)
+        self.start_tree_reconcile()
 
-    @staticmethod
-    def expand_folder(item):
-        """按需加载子目录和文件"""
-        folder_path = item.data(0, Qt.ItemDataRole.UserRole)
-        if not folder_path or not os.path.isdir(folder_path):
+    def expand_folder(self, item):
+        """按需加载子目录和文件，优先使用快照中的内容"""
+        if not item or not item.is_dir or not self.storage.is_dir(item.path):
             return
-        item.takeChildren()  # 清除旧子节点
-
-        # 加载子目录和文件
         try:
-            for entry in os.scandir(folder_path):
-                # logger.info(f"处理条目：{entry.name}, 路径：{entry.path}")  # 调试输出
-                if entry.is_dir():
-                    child_item = QTreeWidgetItem(item, [entry.name])
-                    child_item.setData(0, Qt.ItemDataRole.UserRole, entry.path)  # 设置子目录路径
-                    child_item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
-                    child_item.setIcon(0, QIcon(CommonUtil.get_resource_path(FsConstants.FOLDER_TREE_ICON_PATH)))
-
-                elif entry.is_file() and entry.name.endswith(".enc"):
-                    child_item = QTreeWidgetItem(item, [entry.name[:-4]])  # 去掉扩展名显示
-                    child_item.setData(0, Qt.ItemDataRole.UserRole, entry.path)  # 设置文件路径
-                    child_item.setIcon(0, QIcon(CommonUtil.get_resource_path(FsConstants.DIARY_TREE_ICON_PATH)))
-
+            entries = self._folder_entries(item.path)
         except Exception as e:
             logger.error(f"加载目录失败：{str(e)}")
             MessageUtil.show_error_message(f"加载目录失败")
+            return
+        self._populate_folder(item, entries)
+        # 展开文件夹后预读其中最近修改的日记
+        self.prefetch_diaries([], self._diary_paths(item))
+
+    def _folder_entries(self, folder_path):
+        """文件夹内容，平铺模式下年/月目录中的日记直接显示在所属文件夹下"""
+        entries = self.tree_snapshot.get(folder_path)
+        if entries is None:
+            entries = self.storage.list_entries(folder_path, self.shard_flat)
+            self.tree_snapshot.set(folder_path, entries)
+            self.tree_snapshot_timer.start()
+        return entries
+
+    def _populate_folder(self, item, entries):
+        """替换文件夹节点的子节点，恢复之前展开的子文件夹"""
+        self.tree_model.set_children(item, entries)
+        self._restore_expanded(item)
+
+    def _restore_expanded(self, item):
+        for child in item.children or []:
+            # 文件夹排在前面，遇到日记即可停止
+            if not child.is_dir:
+                break
+            if self.tree_snapshot.is_expanded(child.path):
+                self.diary_tree.setExpanded(self.tree_model.index_of(child), True)
+
+    def on_tree_item_expanded(self, index):
+        item = self.tree_model.node(index)
+        if not item.loaded:
+            self.expand_folder(item)
+        self.tree_snapshot.set_expanded(item.path, True)
+        self.tree_snapshot_timer.start()
+
+    def on_tree_item_collapsed(self, index):
+        self.tree_snapshot.set_expanded(self.tree_model.node(index).path, False)
+        self.tree_snapshot_timer.start()
+
+    def start_tree_reconcile(self):
+        """后台核对快照中的文件夹，只刷新内容有变化的节点"""
+        folders = self.tree_snapshot.folders()
+        if self.tree_reconcile_thread or not folders:
+            return
+        self.tree_reconcile_thread = TreeReconcileThread(self.storage, folders, self.shard_flat)
+        self.tree_reconcile_thread.finished_signal.connect(self._on_tree_reconciled)
+        self.tree_reconcile_thread.start()
+
+    def _on_tree_reconciled(self, results):
+        if self.sender() is not self.tree_reconcile_thread:
+            return
+        self.tree_reconcile_thread.wait()
+        self.tree_reconcile_thread = None
+        changed = 0
+        for folder, entries in results.items():
+            if entries is None:
+                self.tree_snapshot.remove(folder)
+            elif self.tree_snapshot.set(folder, entries):
+                changed += 1
+                self.refresh_tree_folder(folder, entries)
+        self.tree_snapshot.save()
+        logger.info(f"目录树已核对：{len(results)} 个文件夹，{changed} 个有变化")
+
+    def refresh_tree_folder(self, folder, entries=None):
+        """重新读取文件夹，内容有变化且节点已加载时刷新节点"""
+        if entries is None:
+            if not self.storage.is_dir(folder):
+                self.tree_snapshot.remove(folder)
+                return
+            old_entries = self.tree_snapshot.get(folder)
+            try:
+                entries = self.storage.list_entries(folder, self.shard_flat)
+            except OSError as e:
+                logger.warning(f"读取文件夹失败：{folder}, {str(e)}")
+                return
+            if not self.tree_snapshot.set(folder, entries) and old_entries is not None:
+                return
+            self.tree_snapshot_timer.start()
+        item = self.find_diary_item(folder)
+        if item and item.loaded:
+            current = self.current_node()
+            current_path = current.path if current else None
+            self._populate_folder(item, entries)
+            # 刷新后恢复选中的节点（不重新打开日记）
+            if current_path and (current := self.find_diary_item(current_path)):
+                self.select_node(current)
+
+    def _tree_folder(self, path):
+        """路径在目录树中所属的文件夹，平铺模式下 YYYY/MM 中的日记属于其上级文件夹"""
+        folder = os.path.dirname(path)
+        if self.shard_flat and ShardLayoutUtil.is_month_dir(folder) and not self.find_diary_item(folder) \
+                and not self.find_diary_item(os.path.dirname(folder)):
+            return ShardLayoutUtil.base_dir(folder)
+        return folder
+
+    def tree_add_path(self, path, is_dir):
+        """新建的日记或文件夹加入目录树，所属文件夹不在树中时加入其上级文件夹"""
+        folder = self._tree_folder(path)
+        parent = self.find_diary_item(folder)
+        if parent is None:
+            # 例如新建了 YYYY/MM 目录，只需加入最上层新出现的文件夹
+            if folder.startswith(os.path.join(DIARY_DIR, "")):
+                self.tree_add_path(folder, True)
+            return None
+        name = os.path.basename(path) if is_dir else os.path.splitext(os.path.basename(path))[0]
+        item = self.tree_model.insert_node(parent, name, path, is_dir)
+        self._save_tree_folder(parent)
+        return item
+
+    def tree_remove_path(self, path):
+        item = self.find_diary_item(path)
+        if item and item.parent:
+            parent = item.parent
+            self.tree_model.remove_node(item)
+            self._save_tree_folder(parent)
+
+    def tree_move_path(self, old_path, new_path):
+        """改名或移动后把节点放到新的排序位置，不重新读取文件夹"""
+        item = self.find_diary_item(old_path)
+        if item is None or item.parent is None:
+            self.tree_add_path(new_path, self.storage.is_dir(new_path))
+            return
+        old_parent = item.parent
+        parent = self.find_diary_item(self._tree_folder(new_path))
+        if parent is None:
+            self.tree_remove_path(old_path)
+            self.tree_add_path(new_path, item.is_dir)
+            return
+        name = os.path.basename(new_path) if item.is_dir else os.path.splitext(os.path.basename(new_path))[0]
+        selected = self.current_node() is item
+        self.tree_model.move_node(item, parent, name, new_path)
+        if selected:
+            # 新位置可能还没有分批显示，选中时一并显示
+            self.select_node(item)
+        self._save_tree_folder(old_parent)
+        self._save_tree_folder(parent)
+        if item.is_dir:
+            self._save_tree_folder(item, recursive=True)
+
+    def _save_tree_folder(self, item, recursive=False):
+        """把节点的子节点写回快照"""
+        stack = [item]
+        while stack:
+            item = stack.pop()
+            if item.loaded:
+                self.tree_snapshot.set(item.path, self.tree_model.entries(item))
+                if recursive:
+                    stack.extend(child for child in item.children if child.is_dir)
+        self.tree_snapshot_timer.start()
 
     def show_context_menu(self, position):
          """显示右键菜单"""
-         menu = DiaryContextMenu(self, self.diary_tree, self.diary_content, self.current_file, self.key, DIARY_DIR, self.load_expand_folder)
+         menu = DiaryContextMenu(self, self.diary_tree, self.diary_content, self.current_file, self.storage, DIARY_DIR)
+         menu.folder_created_signal.connect(lambda path: self.tree_add_path(path, True))
+         menu.diary_renamed_signal.connect(self.on_diary_renamed)
+         menu.diary_deleted_signal.connect(self.on_diary_deleted)
          menu.exec(self.diary_tree.viewport().mapToGlobal(position))
 
     def load_diary_or_folder(self, item):
         """加载选中的日记或展开文件夹"""
-        self.file_path = item.data(0, Qt.ItemDataRole.UserRole)
-        if not self.file_path:  # 检查路径是否为 None 或空值
+        path = item.path if item else None
+        if not path:  # 检查路径是否为 None 或空值
             MessageUtil.show_error_message("路径无效或丢失！")
             return
 
-        if os.path.isdir(self.file_path):
-            self.expand_folder(item)
+        # 点击文件夹不改变正在编辑的日记
+        if item.is_dir:
+            if not item.loaded:
+                self.expand_folder(item)
         else:
             self.load_diary(item)
 
+    def flush_pending_save(self):
+        """切换日记前把未保存的修改写回原来的日记"""
+        if self.save_timer.isActive():
+            self.save_timer.stop()
+            self.auto_save()
+
     def start_save_timer(self):
         """在用户输入时启动保存计时器"""
         if self.current_file:  # 只有选择了日记才进行保存
@@ -141,14 +726,17 @@ class DiaryApp(QWidget):
 
     def auto_save(self):
         """自动保存日记"""
-        if not self.current_file or os.path.isdir(self.file_path):
+        if not self.current_file or self.storage.is_dir(self.file_path):
             return
         content = self.diary_content.get_content()
 
         try:
-            encrypted_data = EncryptionUtil.encrypt(content.encode(), self.key)
-            with open(self.file_path, "wb") as file:
-                file.write(encrypted_data)
+            self.storage.write(self.file_path, content)
+            self.index_diary(self.file_path, content)
+            # 元数据已变化，下次悬停时重新读取
+            item = self.current_node()
+            if item and item.path == self.file_path:
+                self.tree_model.clear_tooltip(item)
         except Exception as e:
             logger.error(f"自动保存失败：{str(e)}")
             MessageUtil.show_error_message("自动保存失败")
@@ -169,42 +757,96 @@ class DiaryApp(QWidget):
 
 
 
-    def load_diary(self, item):
-        """加载选中的日记"""
+    def load_diary(self, item, on_loaded=None):
+        """
+        打开选中的日记：先显示加载中，在后台读取并解密，连续点击时只显示最后一篇
 
-        # 获取选中的日记文件路径
+        :param on_loaded: 日记显示到编辑器后调用
+        """
         # 直接从传入的item获取最新路径
-        file_path = item.data(0, Qt.ItemDataRole.UserRole)
-        self.current_file = item.text(0)
-        # 检查文件是否存在
-        if not os.path.exists(file_path):
-            logger.info(f"日记文件不存在：{file_path}")
-            MessageUtil.show_warning_message(f"日记文件不存在")
-
-            self._remove_tree_item(item)
-            self.current_file = None
-            return
-
+        file_path = item.path
+        # 先把未保存的修改写回上一篇日记，再切换路径
+        self.flush_pending_save()
+        self.cancel_diary_load()
+        # 没等到加载完成的日记，要修改的链接交回后台
+        pending, self.pending_link_rewrites = self.pending_link_rewrites, []
+        for path, old_title, new_title in pending:
+            if path == file_path:
+                self.pending_link_rewrites.append((path, old_title, new_title))
+            else:
+                self._start_link_rewrite([path], old_title, new_title)
+        # 后台正在更新链接时不再修改这篇日记，打开后由编辑器修改
+        if self.link_rewrite_thread:
+            self.link_rewrite_thread.skip(file_path)
+        self.load_request += 1
+        self.load_callback = on_loaded
+        # 加载完成前不保存编辑器内容
+        self.current_file = None
+        self.file_path = file_path
 
         # 如果 Markdown 编辑器在预览模式，切换回编辑模式
         if self.diary_content.is_preview_mode():
             self.diary_content.switch_to_edit()
+        self.diary_content.show_loading()
 
+        thread = DiaryLoadThread(self.storage, self.diary_cache, self.load_request, file_path)
+        thread.finished_signal.connect(self._on_diary_loaded)
+        thread.finished.connect(self._on_load_thread_finished)
+        self.load_threads.append(thread)
+        thread.start()
 
-        # 加载并显示日记内容
-        try:
-            with open(self.file_path, "rb") as file:
-                encrypted_data = file.read()
-                content = EncryptionUtil.decrypt(encrypted_data, self.key).decode()
-                self.diary_content.set_content(content)
+    def _on_diary_loaded(self, request_id, file_path, content, error):
+        # 加载期间又打开了其他日记，丢弃旧结果
+        if request_id != self.load_request:
+            return
+        callback, self.load_callback = self.load_callback, None
+        item = self.current_node()
+        if item and item.path != file_path:
+            item = None
+        if content is None:
+            if error == "missing":
+                logger.info(f"日记文件不存在：{file_path}")
+                MessageUtil.show_warning_message(f"日记文件不存在")
+            else:
+                logger.error(f"无法加载日记：{error}")
+                MessageUtil.show_error_message(f"无法加载日记")
+            if item:
+                self.tree_remove_path(file_path)
+            self.diary_content.set_content("")
+            return
 
-                # 更新当前文件路径（关键修复）
-                self.file_path = file_path  # 同步更新实例变量
-        except Exception as e:
-            logger.error(f"无法加载日记：{str(e)}")
-            MessageUtil.show_error_message(f"无法加载日记")
-            self._remove_tree_item(item)
-            self.current_file = None
+        self.diary_content.set_content(content)
+        # 趁用户阅读时在后台渲染，切换到预览时直接显示
+        self.diary_content.prerender()
+        # 加载期间日记可能被改名，以当前路径为准
+        self.current_file = os.path.splitext(os.path.basename(self.file_path))[0]
+        pending, self.pending_link_rewrites = self.pending_link_rewrites, []
+        for path, old_title, new_title in pending:
+            self._rewrite_open_diary_links(path, old_title, new_title)
+        cache = self.diary_cache
+        logger.info(f"日记缓存命中率 {cache.hit_rate():.0%}（命中 {cache.hits}/{cache.hits + cache.misses}，"
+                    f"其中预读 {cache.prefetch_hits}）")
+        self.refresh_backlinks()
+        if item:
+            self.prefetch_neighbours(item)
+        if callback:
+            callback()
+
+    def cancel_diary_load(self, wait=False):
+        """放弃正在加载的日记"""
+        self.load_request += 1
+        self.load_callback = None
+        for thread in self.load_threads:
+            thread.cancel()
+            if wait:
+                thread.wait()
+        if wait:
+            self.load_threads.clear()
+
+    def _on_load_thread_finished(self):
+        thread = self.sender()
+        if thread in self.load_threads:
+            self.load_threads.remove(thread)
 
     def new_diary(self):
         """新建日记"""
@@ -213,73 +855,622 @@ class DiaryApp(QWidget):
         if not ok or not file_name.strip():
             return  # 用户取消或未输入内容
 
-        self.current_file = file_name.strip()
-        selected_item = self.diary_tree.currentItem()
-        select_file_path = selected_item.data(0, Qt.ItemDataRole.UserRole)
-        if not selected_item:
-            file_path = f"{DIARY_DIR}/{self.current_file}.enc"
-        # 获取选中项的路径
-        else:
-            select_file_path = selected_item.data(0, Qt.ItemDataRole.UserRole)
-            # 获取父目录路径
-            parent_dir = select_file_path if os.path.isdir(select_file_path) else os.path.dirname(select_file_path)
-            # 使用 os.path.join 安全拼接路径
-            file_path = os.path.join(parent_dir, f"{self.current_file}.enc")
+        title = file_name.strip()
+        # 获取选中项的路径，没有选中时放到根目录
+        select_file_path = (self.current_node() or self.tree_model.root_node).path
+        # 获取父目录路径
+        parent_dir = select_file_path if self.storage.is_dir(select_file_path) else os.path.dirname(select_file_path)
+        # 年/月分目录存放时，放到所属文件夹下本月的目录中
+        if self.storage_sharded:
+            parent_dir = self.storage.shard_dir(parent_dir)
+        # 使用 os.path.join 安全拼接路径
+        file_path = os.path.join(parent_dir, f"{title}.enc")
 
         logger.info(f"当前创建文件的全路径:{file_path}")
 
         # 如果文件已存在，提示用户选择其他名称
-        if os.path.exists(file_path):
+        if self.storage.exists(file_path):
             MessageUtil.show_warning_message("同名日记已存在，请使用其他名称。")
             return
 
         # 创建一个空的加密文件
         try:
-            encrypted_data = EncryptionUtil.encrypt("".encode(), self.key)
-            with open(file_path, "wb") as file:
-                file.write(encrypted_data)
+            self.storage.write(file_path, "")
+            self.index_diary(file_path, "")
+            self.path_index.add(file_path)
 
         except Exception as e:
             logger.error(f"无法创建新日记文件：{str(e)}")
             MessageUtil.show_error_message(f"无法创建新日记文件")
             return
 
-        # 局部刷新父节点
-        parent_item = selected_item if os.path.isdir(select_file_path) else selected_item.parent()
-        self.expand_folder(parent_item)  # 重新展开父目录以加载新文件
+        # 创建成功后再切换：先保存正在编辑的日记，放弃还没加载完的日记
+        self.flush_pending_save()
+        self.cancel_diary_load()
+        self.current_file = title
+
+        # 只在所属文件夹中加入新节点
+        self.tree_add_path(file_path, False)
 
         # 在树形控件中选中新建的日记
-        item = self.find_diary_item(file_path)
+        item = self.reveal_diary_item(file_path)
         if item:
-            self.diary_tree.setCurrentItem(item)
+            self.select_node(item)
 
+        # 之后的编辑保存到新日记
+        self.file_path = file_path
         # 清空内容编辑器
-        self.diary_content.clear_content()
+        self.diary_content.set_content("")
         # 成功提示
         logger.info(f"已创建新日记：{self.current_file}")
 
+    def flush_diary_cache(self):
+        """清空已解密日记的缓存并释放预览框（窗口隐藏到托盘时调用）"""
+        # 等预读线程结束，避免清空后再写入
+        self.cancel_prefetch(wait=True)
+        logger.info(f"清空日记缓存：{len(self.diary_cache)} 篇")
+        self.diary_cache.clear()
+        self.diary_content.release_preview()
+
+    @staticmethod
+    def _diary_paths(folder_item):
+        return [child.path for child in folder_item.children or [] if not child.is_dir]
+
+    def prefetch_neighbours(self, item):
+        """打开日记后预读同一文件夹中的上一篇和下一篇"""
+        parent = item.parent
+        if not parent:
+            return
+        siblings = self._diary_paths(parent)
+        path = item.path
+        if path not in siblings:
+            return
+        position = siblings.index(path)
+        self.prefetch_diaries([siblings[i] for i in (position + 1, position - 1) if 0 <= i < len(siblings)])
+
+    def prefetch_diaries(self, paths, recent_from=None):
+        """取消上一次预读，在后台预读新的日记"""
+        self.cancel_prefetch()
+        if not self.diary_cache.max_bytes or not (paths or recent_from):
+            return
+        thread = DiaryPrefetchThread(self.storage, self.diary_cache, paths, recent_from)
+        thread.finished.connect(self._on_prefetch_finished)
+        self.prefetch_threads.append(thread)
+        thread.start(QThread.Priority.LowestPriority)
+
+    def cancel_prefetch(self, wait=False):
+        for thread in self.prefetch_threads:
+            thread.cancel()
+            if wait:
+                thread.wait()
+        if wait:
+            self.prefetch_threads.clear()
+
+    def _on_prefetch_finished(self):
+        thread = self.sender()
+        if thread in self.prefetch_threads:
+            self.prefetch_threads.remove(thread)
+
+    def index_diary(self, file_path, content):
+        """保存日记后更新缓存、全文索引和链接索引"""
+        try:
+            signature = self.storage.stat(file_path)
+            self.diary_cache.put(file_path, content, signature)
+            self.search_index.update(file_path, content, signature)
+            self.link_index.update(file_path, content, signature)
+        except Exception as e:
+            logger.warning(f"更新搜索索引失败：{str(e)}")
+        self.index_save_timer.start()
+
+    def save_indexes(self):
+        """在后台保存索引，上一次还没保存完时稍后再试"""
+        if self.index_save_thread:
+            self.index_save_timer.start()
+            return
+        self.index_save_thread = IndexSaveThread([self.search_index, self.link_index])
+        self.index_save_thread.finished.connect(self._on_index_save_finished)
+        self.index_save_thread.start()
+
+    def _on_index_save_finished(self):
+        if self.sender() is not self.index_save_thread:
+            return
+        self.index_save_thread.wait()
+        self.index_save_thread = None
+
+    def flush_indexes(self):
+        """退出前等待后台保存完成，再把剩下的变化追加到日志"""
+        self.index_save_timer.stop()
+        if self.index_save_thread:
+            self.index_save_thread.wait()
+            self.index_save_thread = None
+        for index in (self.search_index, self.link_index):
+            index.save(compact=False)
+
+    def on_diary_renamed(self, old_path, new_path):
+        """日记或文件夹改名后同步当前路径和索引，日记标题变化时更新其他日记中的链接"""
+        current_path = getattr(self, "file_path", None)
+        if current_path and (current_path == old_path or current_path.startswith(os.path.join(old_path, ""))):
+            self.file_path = new_path + current_path[len(old_path):]
+        self.diary_cache.discard(old_path)
+        self.tree_snapshot.rename(old_path, new_path)
+        self.tree_move_path(old_path, new_path)
+        self.search_index.rename(old_path, new_path)
+        self.link_index.rename(old_path, new_path)
+        self.path_index.rename(old_path, new_path)
+        self.index_save_timer.start()
+        old_title, new_title = LinkIndex.title(old_path), LinkIndex.title(new_path)
+        # 还有其他同名日记时，原来的链接仍然指向它们
+        if old_path.endswith(".enc") and old_title != new_title and not self.link_index.resolve(old_title):
+            self.rewrite_links(old_title, new_title)
+        self.refresh_backlinks()
+
+    def on_diary_deleted(self, path):
+        current_path = getattr(self, "file_path", None)
+        if current_path and (current_path == path or current_path.startswith(os.path.join(path, ""))):
+            # 正在编辑或加载的日记被删除，不再写回
+            self.save_timer.stop()
+            self.cancel_diary_load()
+            self.current_file = None
+            self.file_path = None
+            self.diary_content.set_content("")
+        self.diary_cache.discard(path)
+        self.tree_snapshot.remove(path)
+        self.tree_remove_path(path)
+        self.search_index.remove(path)
+        self.link_index.remove(path)
+        self.path_index.remove(path)
+        self.index_save_timer.start()
+        self.refresh_backlinks()
+
+    def rewrite_links(self, old_title, new_title):
+        """把指向旧标题的链接改为新标题：正在编辑的日记直接修改编辑器内容，其他日记在后台批量修改"""
+        # 先保存编辑器中的修改，链接索引才是最新的
+        self.flush_pending_save()
+        sources = self.link_index.linking_to(old_title)
+        open_path = getattr(self, "file_path", None)
+        if open_path in sources:
+            sources.remove(open_path)
+            self._rewrite_open_diary_links(open_path, old_title, new_title)
+        if sources:
+            self._start_link_rewrite(sources, old_title, new_title)
+
+    def _rewrite_open_diary_links(self, path, old_title, new_title):
+        """修改编辑器中日记的链接并立即保存，日记还在加载时等加载完成后再修改"""
+        if not self.current_file:
+            self.pending_link_rewrites.append((path, old_title, new_title))
+            return
+        content = self.diary_content.get_content()
+        new_content = LinkIndex.rewrite_links(content, old_title, new_title)
+        if new_content != content:
+            self.diary_content.set_content(new_content)
+            if self.diary_content.is_preview_mode():
+                self.diary_content.update_preview()
+            self.save_timer.stop()
+            self.auto_save()
+
+    def _start_link_rewrite(self, sources, old_title, new_title):
+        # 上一次改名的链接还在更新，等待完成后再开始，保证按顺序修改
+        while self.link_rewrite_thread:
+            self._finish_link_rewrite()
+        logger.info(f"更新链接：{old_title} -> {new_title}，共 {len(sources)} 篇日记")
+        self.link_rewrite_thread = LinkRewriteThread(self.storage, self.diary_cache,
+                                                     [self.search_index, self.link_index],
+                                                     sources, old_title, new_title)
+        self.link_rewrite_thread.finished_signal.connect(self._on_link_rewrite_finished)
+        self.link_rewrite_thread.start()
+
+    def _on_link_rewrite_finished(self, rewritten):
+        if self.sender() is not self.link_rewrite_thread:
+            return
+        self._finish_link_rewrite()
+
+    def _finish_link_rewrite(self):
+        """等待后台更新完成，跳过的日记打开着就修改编辑器内容，否则重新排队"""
+        thread = self.link_rewrite_thread
+        thread.wait()
+        self.link_rewrite_thread = None
+        self.index_save_timer.start()
+        self.refresh_backlinks()
+        logger.info(f"已更新 {thread.rewritten} 篇日记中的链接")
+        skipped = set(thread.skipped)
+        open_path = getattr(self, "file_path", None)
+        if open_path in skipped:
+            skipped.discard(open_path)
+            self._rewrite_open_diary_links(open_path, thread.old_title, thread.new_title)
+        if skipped:
+            self._start_link_rewrite(sorted(skipped), thread.old_title, thread.new_title)
+
+    def refresh_backlinks(self):
+        """显示链接到当前日记的其他日记"""
+        current_path = getattr(self, "file_path", None) if self.current_file else None
+        backlinks = self.link_index.backlinks(current_path) if current_path and current_path.endswith(".enc") else []
+        self.diary_layout.set_backlinks(backlinks, LinkIndex.title)
+
+    def open_wiki_link(self, title):
+        """打开预览中点击的 [[链接]]"""
+        path = self.link_index.resolve(title)
+        if not path:
+            MessageUtil.show_warning_message(f"没有找到日记：{title}")
+            return
+        self.open_diary_path(path)
+
+    def search_tag(self, tag):
+        """在侧边栏列出含有该标签的日记"""
+        self.diary_layout.search_edit.setText(f"#{tag}")
+        self.search_timer.stop()
+        self.run_search()
+
+    def start_index_build(self, load=True):
+        """后台建立或补齐全文索引，只索引新增和修改过的日记"""
+        if self.index_thread:
+            return
+        progress_bar = self.diary_layout.index_progress_bar
+        progress_bar.setRange(0, 0)
+        self.index_thread = IndexBuildThread([self.search_index, self.link_index], self.storage, load)
+        self.index_thread.progress_signal.connect(self._update_index_progress)
+        self.index_thread.finished_signal.connect(self._on_index_build_finished)
+        self.index_thread.start()
+
+    def _update_index_progress(self, done, total):
+        if self.sender() is not self.index_thread:
+            return
+        # 只有需要索引的日记较多时才显示进度
+        if total >= 20:
+            self.diary_layout.index_progress_widget.setVisible(True)
+        self.diary_layout.index_progress_bar.setRange(0, total)
+        self.diary_layout.index_progress_bar.setValue(done)
+
+    def _on_index_build_finished(self, indexed):
+        # 切换存储时取消的旧线程，结束信号可能在新线程启动后才到达
+        if self.sender() is not self.index_thread:
+            return
+        self.diary_layout.index_progress_widget.setVisible(False)
+        # 结束信号在 run() 返回前发出，等线程真正结束后再释放
+        self.index_thread.wait()
+        self.index_thread = None
+        logger.info(f"搜索索引已就绪：{len(self.search_index)} 篇日记，本次索引 {indexed} 篇")
+        self.refresh_backlinks()
+        if self.diary_layout.search_edit.text().strip():
+            self.run_search()
+
+    def cancel_index_build(self):
+        if self.index_thread:
+            self.index_thread.cancel()
+
+    def run_search(self):
+        """显示搜索结果和命中位置的摘要"""
+        query = self.diary_layout.search_edit.text().strip()
+        result_list = self.diary_layout.search_result_list
+        result_list.clear()
+        self.cancel_snippets()
+        self.diary_layout.show_search_results(bool(query))
+        if not query:
+            return
+        # 单独输入 #标签 时列出含有该标签的日记
+        tag = query[1:] if query.startswith("#") and DiaryFileUtil.TAG_PATTERN.fullmatch(query) else None
+        results = [(path, 0) for path in self.link_index.tagged(tag)] if tag else self.search_index.search(query)
+        # 先列出标题，摘要需要解密日记，在后台生成后再填入
+        paths = [path for path, _ in results]
+        for path in paths:
+            self.diary_layout.add_search_result(LinkIndex.title(path), "…", path)
+        if not results:
+            result_list.addItem("没有找到匹配的日记" if not self.index_thread else "正在建立索引，暂无匹配结果")
+            return
+        thread = SearchSnippetThread(self.storage, self.diary_cache, self.search_request, paths, tag or query)
+        thread.snippet_signal.connect(self._on_snippet_ready)
+        thread.finished.connect(self._on_snippet_thread_finished)
+        self.snippet_threads.append(thread)
+        thread.start()
+
+    def _on_snippet_ready(self, request_id, row, snippet):
+        if request_id != self.search_request:
+            return
+        item = self.diary_layout.search_result_list.item(row)
+        if not item:
+            return
+        if snippet is None:
+            # 读取失败的日记不显示
+            item.setHidden(True)
+            return
+        self.diary_layout.set_search_snippet(row, LinkIndex.title(item.data(Qt.ItemDataRole.UserRole)), snippet)
+
+    def cancel_snippets(self, wait=False):
+        """放弃正在生成的摘要"""
+        self.search_request += 1
+        for thread in self.snippet_threads:
+            thread.cancel()
+            if wait:
+                thread.wait()
+        if wait:
+            self.snippet_threads.clear()
+
+    def _on_snippet_thread_finished(self):
+        thread = self.sender()
+        if thread in self.snippet_threads:
+            self.snippet_threads.remove(thread)
+
+    def open_search_result(self, result_item):
+        """打开搜索结果对应的日记并定位到命中位置"""
+        path = result_item.data(Qt.ItemDataRole.UserRole)
+        if not path:
+            return
+        query = self.diary_layout.search_edit.text()
+
+        def select_match():
+            match = SearchIndex.find_match(self.diary_content.get_content(), query)
+            if match:
+                self.diary_content.select_range(*match)
+
+        self.open_diary_path(path, select_match)
+
+    def open_diary_path(self, path, on_loaded=None):
+        """在目录树中定位并打开日记，找不到时返回 False"""
+        item = self.reveal_diary_item(path)
+        if not item:
+            MessageUtil.show_warning_message("日记不存在")
+            self.search_index.remove(path)
+            self.link_index.remove(path)
+            self.path_index.remove(path)
+            return False
+        self.select_node(item)
+        self.load_diary(item, on_loaded)
+        return True
+
+    def show_quick_open(self):
+        if not self.quick_open_dialog:
+            self.quick_open_dialog = QuickOpenDialog(self, self.path_index)
+            self.quick_open_dialog.open_requested.connect(self.open_diary_path)
+        self.quick_open_dialog.popup()
+
+    def start_path_index_build(self):
+        """后台列出所有日记建立路径索引，文件存储时同时监视所有文件夹"""
+        if self.path_index_thread:
+            return
+        self.path_index_thread = PathIndexThread(self.storage)
+        self.path_index_thread.finished_signal.connect(self._on_path_index_built)
+        self.path_index_thread.start()
+
+    def _on_path_index_built(self, files, folders):
+        if self.sender() is not self.path_index_thread:
+            return
+        self.path_index_thread.wait()
+        self.path_index_thread = None
+        self.path_index.reset(files)
+        watched = self.fs_watcher.directories()
+        if watched:
+            self.fs_watcher.removePaths(watched)
+        # 数据库存储的所有修改都经过本程序，不需要监视
+        if self.storage.BACKEND == "file":
+            self.fs_watcher.addPaths([DIARY_DIR] + folders)
+        logger.info(f"路径索引已就绪：{len(files)} 篇日记")
+
+    def on_directory_changed(self, folder):
+        """外部程序修改了文件夹（同步盘、手动复制），稍后统一更新路径索引"""
+        self.changed_folders.add(folder)
+        self.folder_sync_timer.start()
+
+    def sync_changed_folders(self):
+        folders, self.changed_folders = self.changed_folders, set()
+        watched = set(self.fs_watcher.directories())
+        tree_folders = set()
+        for folder in folders:
+            # 平铺模式下年/月目录的变化体现在所属文件夹中
+            tree_folders.update([folder, os.path.dirname(folder), os.path.dirname(os.path.dirname(folder))]
+                                if self.shard_flat else [folder])
+            if not self.storage.is_dir(folder):
+                self.path_index.remove(folder)
+                continue
+            try:
+                entries = self.storage.list_entries(folder)
+            except OSError as e:
+                logger.warning(f"读取文件夹失败：{folder}, {str(e)}")
+                continue
+            self.path_index.sync_folder(folder, [path for _, path, is_dir in entries if not is_dir])
+            for _, path, is_dir in entries:
+                if is_dir and path not in watched:
+                    # 新出现的文件夹（可能带着日记一起复制进来）
+                    self.fs_watcher.addPath(path)
+                    watched.add(path)
+                    self.changed_folders.add(path)
+        for folder in tree_folders:
+            if folder.startswith(DIARY_DIR) and (self.tree_snapshot.get(folder) is not None
+                                                 or self.find_diary_item(folder)):
+                self.refresh_tree_folder(folder)
+        if self.changed_folders:
+            self.folder_sync_timer.start()
+
+    def reveal_diary_item(self, path):
+        """逐级读取并展开目录树，返回路径对应的节点"""
+        item = self.tree_model.root_node
+        found = self.find_diary_item(path)
+        while found is None and item:
+            self.tree_model.load_children(item)
+            found = self.find_diary_item(path)
+            part = os.path.relpath(path, item.path).split(os.sep)[0]
+            item = None if part == os.pardir else self.find_diary_item(os.path.join(item.path, part))
+        if found is None:
+            return None
+        ancestors = []
+        parent = found.parent
+        while parent:
+            ancestors.append(parent)
+            parent = parent.parent
+        for parent in reversed(ancestors):
+            self.diary_tree.setExpanded(self.tree_model.index_of(parent), True)
+        return found
+
+    def diary_tooltip(self, file_path):
+        """悬停时显示日记元数据，只解密文件头部的元数据块"""
+        meta = self.storage.read_meta(file_path)
+        return DiaryFileUtil.format_meta(meta) if meta else ""
+
     def find_diary_item(self, file_path):
-        """根据文件路径找到对应的树形控件条目"""
-        root = self.diary_tree.invisibleRootItem()
-        for i in range(root.childCount()):
-            item = root.child(i)
-            if item.data(0, Qt.ItemDataRole.UserRole) == file_path:
-                return item
-        return None
+        """根据文件路径找到已读取的目录树节点，不读取任何文件夹"""
+        return self.tree_model.find(file_path)
+
+    def migrate_shard_layout(self, to_sharded):
+        """在后台批量整理现有日记，完成后刷新目录树"""
+        if self.migrate_thread:
+            return
+        # 先保存正在编辑的内容，避免写回已移走的路径
+        self.save_timer.stop()
+        self.auto_save()
+
+        self.migrate_dialog = QProgressDialog("正在整理日记...", None, 0, 0, self)
+        self.migrate_dialog.setWindowTitle("整理日记")
+        self.migrate_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.migrate_dialog.show()
+
+        self.migrate_thread = ShardMigrateThread(self.storage, to_sharded)
+        self.migrate_thread.progress_signal.connect(self._update_migrate_progress)
+        self.migrate_thread.finished_signal.connect(self._on_migrate_finished)
+        self.migrate_thread.start()
 
+    def _update_migrate_progress(self, done, total):
+        self.migrate_dialog.setMaximum(total)
+        self.migrate_dialog.setValue(done)
+
+    def _on_migrate_finished(self, moved):
+        self.migrate_dialog.close()
+        self.migrate_dialog = None
+        self.migrate_thread.wait()
+        self.migrate_thread = None
+        # 当前打开的日记被移动时同步路径
+        if getattr(self, "file_path", None) in moved:
+            self.file_path = moved[self.file_path]
+        self.cancel_prefetch(wait=True)
+        self.diary_cache.clear()
+        for old_path, new_path in moved.items():
+            self.search_index.rename(old_path, new_path)
+            self.link_index.rename(old_path, new_path)
+        self.index_save_timer.start()
+        # 年/月目录有增减，重新建立路径索引和文件夹监视
+        self.start_path_index_build()
+        self.tree_snapshot.reset(self.storage.BACKEND, self.shard_flat)
+        self.load_diary_tree()
+        MessageUtil.show_success_message(f"已整理 {len(moved)} 篇日记")
+        self._migrate_pending_storage()
+
+    def _migrate_pending_storage(self):
+        """迁移期间收到的存储后端切换，在迁移完成后执行"""
+        backend, self.pending_storage_backend = self.pending_storage_backend, None
+        if backend and backend != self.storage.BACKEND:
+            self.migrate_storage(backend)
+
+    def migrate_storage(self, backend):
+        """切换存储后端，确认后把现有日记复制到新后端，原数据保留不删除"""
+        if self.migrate_thread:
+            # 正在整理日记（同一次保存设置中修改了分目录），整理完成后再切换
+            logger.info(f"正在整理日记，完成后切换到存储：{backend}")
+            self.pending_storage_backend = backend
+            return
+        message = "是否将现有日记复制到新的存储中？\n选择“否”将使用新存储中已有的日记。"
+        if backend == "sqlite":
+            message += "\n\n注意：数据库保存在本机的数据库目录中，不在同步目录里，切换后日记不再通过 WebDAV 同步。"
+        reply = QMessageBox.question(self, "切换存储", message,
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                                     | QMessageBox.StandardButton.Cancel)
+        if reply == QMessageBox.StandardButton.Cancel:
+            self._cancel_storage_switch()
+            return
+        self.save_timer.stop()
+        self.auto_save()
+        target = StorageFactory.create(backend, self.key)
+        if reply != QMessageBox.StandardButton.Yes:
+            if target.list_files():
+                self._switch_storage(target)
+                return
+            # 新存储中还没有日记，直接切换会看到空的目录树
+            reply = QMessageBox.question(self, "切换存储", "新的存储中还没有日记，不复制的话切换后目录树为空。\n"
+                                                          "是否将现有日记复制到新的存储中？",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.Cancel)
+            if reply != QMessageBox.StandardButton.Yes:
+                target.close()
+                self._cancel_storage_switch()
+                return
+
+        self.migrate_dialog = QProgressDialog("正在迁移日记...", None, 0, 0, self)
+        self.migrate_dialog.setWindowTitle("切换存储")
+        self.migrate_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.migrate_dialog.show()
+
+        self.migrate_thread = StorageMigrateThread(self.storage, target)
+        self.migrate_thread.progress_signal.connect(self._update_migrate_progress)
+        self.migrate_thread.finished_signal.connect(self._on_storage_migrate_finished)
+        self.migrate_thread.start()
+
+    def _cancel_storage_switch(self):
+        """取消切换存储，恢复配置中的存储后端"""
+        self.config_manager.set_config(FsConstants.STORAGE_BACKEND_KEY, self.storage.BACKEND)
+        MessageUtil.show_warning_message("已取消切换存储，继续使用原来的存储")
+
+    def _on_storage_migrate_finished(self, success):
+        target = self.migrate_thread.target
+        self.migrate_dialog.close()
+        self.migrate_dialog = None
+        self.migrate_thread.wait()
+        self.migrate_thread = None
+        if not success:
+            target.close()
+            # 迁移失败时恢复原来的配置
+            self.config_manager.set_config(FsConstants.STORAGE_BACKEND_KEY, self.storage.BACKEND)
+            MessageUtil.show_error_message("迁移日记失败，继续使用原来的存储")
+            self._migrate_pending_storage()
+            return
+        self._switch_storage(target)
+        MessageUtil.show_success_message("日记已迁移到新的存储")
+        self._migrate_pending_storage()
+
+    def _switch_storage(self, storage):
+        if self.link_rewrite_thread:
+            self.link_rewrite_thread.wait()
+            self.link_rewrite_thread = None
+        self.pending_link_rewrites.clear()
+        if self.index_thread:
+            self.index_thread.cancel()
+            self.index_thread.wait()
+            self.index_thread = None
+        if self.path_index_thread:
+            self.path_index_thread.wait()
+            self.path_index_thread = None
+        self.cancel_diary_load(wait=True)
+        self.cancel_prefetch(wait=True)
+        self.cancel_snippets(wait=True)
+        if self.tree_reconcile_thread:
+            self.tree_reconcile_thread.wait()
+            self.tree_reconcile_thread = None
+        self.storage.close()
+        self.storage = storage
+        self.tree_snapshot.reset(storage.BACKEND, self.shard_flat)
+        self.diary_cache.clear()
+        self.current_file = None
+        self.diary_content.clear_content()
+        self.refresh_backlinks()
+        self.load_diary_tree()
+        # 新存储中的日记可能不同，按签名补齐索引
+        self.start_path_index_build()
+        self.start_index_build(load=False)
 
     def closeEvent(self, event):
         self.auto_save()
+        if self.index_thread:
+            self.index_thread.cancel()
+            self.index_thread.wait()
+        if self.link_rewrite_thread:
+            self.link_rewrite_thread.wait()
+        self.flush_indexes()
+        self.cancel_diary_load(wait=True)
+        self.diary_content.wait_live_render()
+        self.cancel_prefetch(wait=True)
+        self.cancel_snippets(wait=True)
+        if self.tree_reconcile_thread:
+            self.tree_reconcile_thread.wait()
+        self.tree_snapshot.save()
+        self.diary_cache.clear()
+        self.storage.close()
         # 调用父类关闭事件
         super().closeEvent(event)
 
-    def _remove_tree_item(self, item):
-        """安全移除树节点"""
-        if parent := item.parent():
-            parent.removeChild(item)
-        else:
-            self.diary_tree.takeTopLevelItem(self.diary_tree.indexOfTopLevelItem(item))
-
     def _handle_webdav_sync(self):
         try:
             self.webdav_sync.signal_sync_webdav()
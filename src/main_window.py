@@ -49,9 +49,9 @@ class MainWindow(QMainWindow):
 
         # 创建主布局
         main_layout = QVBoxLayout(central_widget)
-        diary_app = DiaryApp()
+        self.diary_app = DiaryApp()
 
-        main_layout.addWidget(diary_app)  # 将其添加到布局中
+        main_layout.addWidget(self.diary_app)  # 将其添加到布局中
 
     # 从托盘菜单点击显示主界面
     def tray_menu_show_main(self):
@@ -68,6 +68,8 @@ class MainWindow(QMainWindow):
         event.ignore()
         self.hide()
         self.tray_menu.tray_icon.show()
+        # 隐藏到托盘后不在内存中保留解密的日记
+        self.diary_app.flush_diary_cache()
 
         if not self.is_floating_ball_visible:
             self.create_floating_ball()
@@ -1,7 +1,7 @@
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QApplication, QWidget, QGroupBox, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QPushButton, QFileDialog, QMessageBox, QCheckBox, QSlider
+    QLineEdit, QPushButton, QFileDialog, QMessageBox, QCheckBox, QSlider, QSpinBox
 )
 from PySide6.QtGui import QIcon
 import os
@@ -35,6 +35,9 @@ class OptionGeneral(MenuWindow):
         # 高级设置组
         main_layout.addWidget(self.create_advanced_group())
 
+        # 日记存储组
+        main_layout.addWidget(self.create_storage_group())
+
         # 配置文件路径组
         main_layout.addWidget(self.create_config_group())
 
@@ -91,6 +94,53 @@ class OptionGeneral(MenuWindow):
         group_box.setLayout(layout)
         return group_box
 
+    def create_storage_group(self):
+        """创建日记存储设置组"""
+        group_box = QGroupBox("日记存储")
+        layout = QVBoxLayout()
+
+        # 按年/月分目录存放，避免单个目录下日记过多
+        self.sharded_checkbox = QCheckBox("按 年/月 分目录存放日记")
+        self.sharded_checkbox.setChecked(self.config_manager.get_config(FsConstants.STORAGE_SHARDED_KEY))
+        layout.addWidget(self.sharded_checkbox)
+
+        self.shard_flat_checkbox = QCheckBox("目录树中平铺显示 年/月 目录里的日记")
+        self.shard_flat_checkbox.setChecked(self.config_manager.get_config(FsConstants.TREE_SHARD_FLAT_KEY))
+        layout.addWidget(self.shard_flat_checkbox)
+
+        # 数据库不在同步目录中，开启后日记不再通过 WebDAV 同步
+        self.sqlite_checkbox = QCheckBox("使用单文件数据库（SQLite）存储日记（保存在本机，不参与 WebDAV 同步）")
+        self.sqlite_checkbox.setChecked(self.config_manager.get_config(FsConstants.STORAGE_BACKEND_KEY) == "sqlite")
+        layout.addWidget(self.sqlite_checkbox)
+
+        # AES-GCM 更快、文件更小；保存过的日记带有新的文件头，无论哪种算法旧版本都无法读取
+        self.aesgcm_checkbox = QCheckBox("使用 AES-GCM 加密新写入的日记（更快、文件更小）")
+        self.aesgcm_checkbox.setChecked(self.config_manager.get_config(FsConstants.ENCRYPTION_ALGORITHM_KEY) == "aesgcm")
+        layout.addWidget(self.aesgcm_checkbox)
+
+        # 最近打开的日记保留解密后的内容，切换时不用重新解密
+        cache_layout = QHBoxLayout()
+        cache_layout.addWidget(QLabel("已解密日记的内存缓存（MB，0 为不缓存）:"))
+        self.cache_size_spinbox = QSpinBox()
+        self.cache_size_spinbox.setRange(0, 1024)
+        self.cache_size_spinbox.setValue(self.config_manager.get_config(FsConstants.DIARY_CACHE_SIZE_KEY))
+        cache_layout.addWidget(self.cache_size_spinbox)
+        cache_layout.addStretch()
+        layout.addLayout(cache_layout)
+
+        # 预览过的日记加密保存渲染结果，内容没变时再次预览不用重新渲染
+        render_cache_layout = QHBoxLayout()
+        render_cache_layout.addWidget(QLabel("预览渲染结果的磁盘缓存（MB，0 为不缓存）:"))
+        self.render_cache_size_spinbox = QSpinBox()
+        self.render_cache_size_spinbox.setRange(0, 4096)
+        self.render_cache_size_spinbox.setValue(self.config_manager.get_config(FsConstants.RENDER_CACHE_SIZE_KEY))
+        render_cache_layout.addWidget(self.render_cache_size_spinbox)
+        render_cache_layout.addStretch()
+        layout.addLayout(render_cache_layout)
+
+        group_box.setLayout(layout)
+        return group_box
+
     def create_float_ball_widget(self):
         """创建悬浮球相关控件"""
         widget = QWidget()
@@ -242,6 +292,14 @@ class OptionGeneral(MenuWindow):
                 self.config_manager.set_config(FsConstants.APP_MINI_IMAGE_KEY, self.float_ball_path_input.text().strip())
             if tray_menu_enabled:
                 self.config_manager.set_config(FsConstants.APP_TRAY_MENU_IMAGE_KEY, self.tray_menu_path_input.text().strip())
+            self.config_manager.set_config(FsConstants.STORAGE_SHARDED_KEY, self.sharded_checkbox.isChecked())
+            self.config_manager.set_config(FsConstants.TREE_SHARD_FLAT_KEY, self.shard_flat_checkbox.isChecked())
+            self.config_manager.set_config(FsConstants.STORAGE_BACKEND_KEY,
+                                           "sqlite" if self.sqlite_checkbox.isChecked() else "file")
+            self.config_manager.set_config(FsConstants.ENCRYPTION_ALGORITHM_KEY,
+                                           "aesgcm" if self.aesgcm_checkbox.isChecked() else "fernet")
+            self.config_manager.set_config(FsConstants.DIARY_CACHE_SIZE_KEY, self.cache_size_spinbox.value())
+            self.config_manager.set_config(FsConstants.RENDER_CACHE_SIZE_KEY, self.render_cache_size_spinbox.value())
             MessageUtil.show_success_message("设置已成功保存！")
         except Exception as e:
             MessageUtil.show_error_message(f"保存设置失败: {e}")
@@ -0,0 +1,65 @@
+import os
+
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem
+
+
+class QuickOpenDialog(QDialog):
+    """按标题模糊查找并打开日记（Ctrl+P）"""
+    open_requested = Signal(str)
+
+    def __init__(self, parent, path_index):
+        super().__init__(parent)
+        self.path_index = path_index
+        self.setWindowTitle("快速打开")
+        self.setMinimumSize(500, 360)
+
+        layout = QVBoxLayout(self)
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("输入日记标题或路径，支持模糊匹配")
+        self.query_edit.textChanged.connect(self.update_results)
+        self.query_edit.installEventFilter(self)
+        layout.addWidget(self.query_edit)
+
+        self.result_list = QListWidget()
+        self.result_list.itemActivated.connect(self.open_item)
+        self.result_list.itemClicked.connect(self.open_item)
+        layout.addWidget(self.result_list)
+        self.setLayout(layout)
+
+    def popup(self):
+        """每次打开时清空输入"""
+        self.query_edit.clear()
+        self.update_results()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.query_edit.setFocus()
+
+    def update_results(self):
+        self.result_list.clear()
+        for path in self.path_index.search(self.query_edit.text()):
+            folder = os.path.dirname(os.path.relpath(path, self.path_index.root))
+            item = QListWidgetItem(f"{self.path_index.title(path)}    {folder}" if folder else self.path_index.title(path))
+            item.setData(Qt.ItemDataRole.UserRole, path)
+            self.result_list.addItem(item)
+        if self.result_list.count():
+            self.result_list.setCurrentRow(0)
+
+    def eventFilter(self, watched, event):
+        """输入框中用上下键选择结果，回车打开"""
+        if watched is self.query_edit and event.type() == event.Type.KeyPress:
+            if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if event.key() == Qt.Key.Key_Down else -1
+                row = min(max(self.result_list.currentRow() + step, 0), self.result_list.count() - 1)
+                self.result_list.setCurrentRow(row)
+                return True
+            if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                self.open_item(self.result_list.currentItem())
+                return True
+        return super().eventFilter(watched, event)
+
+    def open_item(self, item):
+        if item:
+            self.hide()
+            self.open_requested.emit(item.data(Qt.ItemDataRole.UserRole))
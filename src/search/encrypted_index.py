@@ -0,0 +1,281 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from loguru import logger
+
+from src.util.diary_file_util import DiaryFileUtil
+from src.util.encryption_util import EncryptionUtil
+
+
+class EncryptedIndex(ABC):
+    """
+    按篇增量维护、加密保存的日记索引
+
+    每篇日记记录索引时的 (mtime_ns, size) 签名和从正文中提取的数据，
+    子类实现 extract() 提取数据，_add() / _discard() 维护各自的反查结构。
+    索引保存为一个快照文件和一个追加日志：平时只把变化的日记作为一条记录追加到日志，
+    日志超过快照的一半时再重写快照。快照和每条记录都是压缩后的 JSON，用日记密钥加密，不包含任何明文内容。
+    """
+    VERSION = 1
+    # 日志超过快照的这个比例（且不小于 COMPACT_MIN_BYTES）时重写快照
+    COMPACT_RATIO = 0.5
+    COMPACT_MIN_BYTES = 64 * 1024
+
+    def __init__(self, key, index_file):
+        self.key = key
+        self.index_file = index_file
+        self.log_file = f"{index_file}.log"
+        # 路径 -> (签名 [mtime_ns, size], 提取的数据)
+        self._docs = {}
+        self._lock = threading.RLock()
+        # 上次保存后变化的日记
+        self._changed = set()
+        # 快照的编号，日志记录只对同一个快照有效；None 表示需要重写快照
+        self._generation = None
+        # 保存可能在后台线程和退出流程中同时调用，依次写入
+        self._save_lock = threading.Lock()
+
+    # ---- 子类实现 ----
+    @abstractmethod
+    def extract(self, content):
+        """从日记正文中提取要索引的数据（需能被 JSON 序列化）"""
+
+    def _add(self, path, data):
+        pass
+
+    def _discard(self, path, data):
+        pass
+
+    def _clear(self):
+        pass
+
+    def _after_load(self):
+        pass
+
+    # ---- 增量更新 ----
+    def update(self, path, content, signature=None):
+        """新增或更新一篇日记"""
+        data = self.extract(content)
+        with self._lock:
+            self._remove_doc(path)
+            self._docs[path] = (list(signature) if signature else None, data)
+            self._add(path, data)
+            self._changed.add(path)
+
+    def remove(self, path):
+        """删除日记，或删除文件夹下的所有日记"""
+        with self._lock:
+            for doc in self._docs_under(path):
+                self._remove_doc(doc)
+                self._changed.add(doc)
+
+    def rename(self, old_path, new_path):
+        """日记或文件夹改名、移动后同步路径"""
+        with self._lock:
+            for doc in self._docs_under(old_path):
+                moved = new_path + doc[len(old_path):]
+                signature, data = self._docs.pop(doc)
+                self._discard(doc, data)
+                self._docs[moved] = (signature, data)
+                self._add(moved, data)
+                self._changed.update((doc, moved))
+
+    def _docs_under(self, path):
+        if path in self._docs:
+            return [path]
+        prefix = os.path.join(path, "")
+        return [doc for doc in self._docs if doc.startswith(prefix)]
+
+    def _remove_doc(self, path):
+        doc = self._docs.pop(path, None)
+        if doc:
+            self._discard(path, doc[1])
+
+    def signature(self, path):
+        """索引时记录的 (mtime_ns, size)，用于判断日记是否需要重新索引"""
+        doc = self._docs.get(path)
+        return doc[0] if doc else None
+
+    def paths(self):
+        with self._lock:
+            return list(self._docs)
+
+    def __len__(self):
+        return len(self._docs)
+
+    @property
+    def dirty(self):
+        return bool(self._changed) or self._generation is None
+
+    # ---- 持久化 ----
+    def load(self):
+        """读取加密的索引快照并重放日志，文件不存在、损坏或密钥不匹配时从空索引开始"""
+        try:
+            with open(self.index_file, "rb") as file:
+                data = self._decode(file.read())
+            if data.get("version") != self.VERSION:
+                return False
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"读取索引失败，将重新建立：{os.path.basename(self.index_file)}, {str(e)}")
+            return False
+        docs = data["docs"]
+        complete = self._replay_log(docs, data.get("generation"))
+        with self._lock:
+            self._docs.clear()
+            self._clear()
+            for path, (signature, doc_data) in docs.items():
+                self._docs[path] = (signature, doc_data)
+                self._add(path, doc_data)
+            self._after_load()
+            self._changed.clear()
+            # 日志有损坏的记录时，下次保存重写快照
+            self._generation = data.get("generation") if complete else None
+        logger.info(f"已加载索引 {os.path.basename(self.index_file)}：{len(self._docs)} 篇日记")
+        return True
+
+    def _replay_log(self, docs, generation):
+        """把日志中属于该快照的记录依次应用到 docs，遇到损坏的记录时停止，返回日志是否完整"""
+        try:
+            with open(self.log_file, "rb") as file:
+                log = file.read()
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            logger.warning(f"读取索引日志失败：{os.path.basename(self.log_file)}, {str(e)}")
+            return False
+        offset = 0
+        while offset < len(log):
+            try:
+                (size,) = struct.unpack_from(">I", log, offset)
+                record = self._decode(log[offset + 4:offset + 4 + size])
+            except Exception as e:
+                logger.warning(f"索引日志已损坏，忽略之后的记录：{os.path.basename(self.log_file)}, {str(e)}")
+                return False
+            offset += 4 + size
+            if generation is None or record.get("generation") != generation:
+                continue
+            for path, doc in record["docs"].items():
+                if doc is None:
+                    docs.pop(path, None)
+                else:
+                    docs[path] = doc
+        return True
+
+    def save(self, compact=True):
+        """
+        索引有变化时加密写入磁盘，可以在后台线程中调用
+
+        :param compact: 日志过大时是否重写快照；为 False 时只追加日志（快照不存在时仍会写入）
+        """
+        with self._save_lock:
+            with self._lock:
+                rewrite = self._generation is None or (compact and self._log_too_large())
+                if not rewrite and not self._changed:
+                    return
+                if rewrite:
+                    docs = {path: [signature, data] for path, (signature, data) in self._docs.items()}
+                else:
+                    docs = {path: list(self._docs[path]) if path in self._docs else None for path in self._changed}
+                changed, self._changed = self._changed, set()
+                generation = self._generation
+            try:
+                if rewrite:
+                    generation = os.urandom(8).hex()
+                    DiaryFileUtil.atomic_write(self.index_file, self._encode(
+                        {"version": self.VERSION, "generation": generation, "docs": docs}))
+                    # 旧快照的日志记录已经包含在新快照中
+                    if os.path.exists(self.log_file):
+                        os.remove(self.log_file)
+                    with self._lock:
+                        self._generation = generation
+                else:
+                    token = self._encode({"generation": generation, "docs": docs})
+                    with open(self.log_file, "ab") as file:
+                        file.write(struct.pack(">I", len(token)) + token)
+            except OSError as e:
+                with self._lock:
+                    self._changed |= changed
+                    if rewrite:
+                        self._generation = None
+                logger.warning(f"保存索引失败：{os.path.basename(self.index_file)}, {str(e)}")
+
+    def _log_too_large(self):
+        try:
+            log_size = os.path.getsize(self.log_file)
+        except OSError:
+            return False
+        try:
+            snapshot_size = os.path.getsize(self.index_file)
+        except OSError:
+            return True
+        return log_size > max(snapshot_size * self.COMPACT_RATIO, self.COMPACT_MIN_BYTES)
+
+    def _encode(self, data):
+        return EncryptionUtil.encrypt(zlib.compress(json.dumps(data, ensure_ascii=False).encode()), self.key)
+
+    def _decode(self, token):
+        return json.loads(zlib.decompress(EncryptionUtil.decrypt(token, self.key)))
+
+    # ---- 建立索引 ----
+    @staticmethod
+    def build_all(indexes, storage, progress=None, cancel_event=None, workers=None):
+        """
+        与日记库对齐：删除已不存在的日记，并行解密新增或修改过的日记，每篇只解密一次供所有索引使用
+
+        :param progress: 进度回调 progress(已完成数, 总数)
+        :param cancel_event: threading.Event，置位后尽快停止，已索引的部分保留
+        :return: 本次索引的日记数量
+        """
+        cancel_event = cancel_event or threading.Event()
+        files = storage.list_files()
+        existing = set(files)
+        for index in indexes:
+            for path in [path for path in index.paths() if path not in existing]:
+                index.remove(path)
+        # 路径 -> (当前签名, 各索引中的旧签名)
+        pending = {}
+        for path in files:
+            try:
+                signature = list(storage.stat(path))
+            except OSError:
+                continue
+            previous = [index.signature(path) for index in indexes]
+            if any(old != signature for old in previous):
+                pending[path] = (signature, previous)
+
+        total = len(pending)
+        if progress:
+            progress(0, total)
+        if not pending:
+            return 0
+        logger.info(f"建立索引：共 {len(files)} 篇，{total} 篇需要重新索引")
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 2)) as executor:
+            futures = {executor.submit(storage.read, path): path for path in pending}
+            for future in as_completed(futures):
+                if cancel_event.is_set():
+                    for remaining in futures:
+                        remaining.cancel()
+                    break
+                path = futures[future]
+                signature, previous = pending[path]
+                try:
+                    content = future.result()
+                    for index, old in zip(indexes, previous):
+                        with index._lock:
+                            # 期间保存过的日记已由保存流程更新，不用旧内容覆盖
+                            if old != signature and index.signature(path) == old:
+                                index.update(path, content, signature)
+                except Exception as e:
+                    logger.warning(f"索引日记失败：{path}, {str(e)}")
+                done += 1
+                if progress:
+                    progress(done, total)
+        return done
@@ -0,0 +1,189 @@
+import os
+import re
+from urllib.parse import quote, unquote
+
+from markdown_it.token import Token
+
+from src.const.fs_constants import FsConstants
+from src.search.encrypted_index import EncryptedIndex
+from src.util.common_util import CommonUtil
+from src.util.diary_file_util import DiaryFileUtil
+
+
+class LinkIndex(EncryptedIndex):
+    """
+    日记之间的 [[链接]] 和 #标签 索引
+
+    链接按标题（文件名去掉 .enc，不区分大小写）指向日记，标题到路径的对应关系只来自路径本身，
+    解析链接、查找反向链接和标签都不需要解密任何日记。
+    """
+    # [[标题]] 或 [[标题|显示文字]]
+    LINK_PATTERN = re.compile(r"\[\[([^\[\]|\n]+?)(?:\|([^\[\]\n]+))?\]\]")
+    # 日记中直接写的 HTML 链接
+    HTML_LINK_OPEN = re.compile(r"<a[\s>]", re.I)
+    HTML_LINK_CLOSE = re.compile(r"</a\s*>", re.I)
+    # 预览中链接和标签的地址，点击时由预览页面拦截，不会真正访问
+    LINK_URL = "https://fsdiary.invalid/link/"
+    TAG_URL = "https://fsdiary.invalid/tag/"
+
+    def __init__(self, key, index_file=None):
+        super().__init__(key, index_file or os.path.join(CommonUtil.get_cache_path(), FsConstants.LINK_INDEX_FILE))
+        # 小写标题 -> {路径}
+        self._titles = {}
+        # 小写链接目标 -> {链接到它的日记}
+        self._backlinks = {}
+        # 小写标签 -> {含该标签的日记}
+        self._tags = {}
+
+    @staticmethod
+    def title(path):
+        return os.path.splitext(os.path.basename(path))[0]
+
+    @staticmethod
+    def _map_text(content, func):
+        """只处理代码块和行内代码之外的文字"""
+        parts, last = [], 0
+        for code in DiaryFileUtil.CODE_PATTERN.finditer(content):
+            parts.append(func(content[last:code.start()]))
+            parts.append(code.group())
+            last = code.end()
+        parts.append(func(content[last:]))
+        return "".join(parts)
+
+    # ---- 索引结构 ----
+    def extract(self, content):
+        """{"links": [链接目标], "tags": [标签]}"""
+        text = DiaryFileUtil.CODE_PATTERN.sub("", content)
+        links = dict.fromkeys(match.group(1).strip() for match in self.LINK_PATTERN.finditer(text))
+        return {"links": list(links), "tags": DiaryFileUtil.extract_tags(content)}
+
+    def _add(self, path, data):
+        self._titles.setdefault(self.title(path).lower(), set()).add(path)
+        for link in data["links"]:
+            self._backlinks.setdefault(link.lower(), set()).add(path)
+        for tag in data["tags"]:
+            self._tags.setdefault(tag.lower(), set()).add(path)
+
+    def _discard(self, path, data):
+        for mapping, keys in ((self._titles, [self.title(path)]), (self._backlinks, data["links"]),
+                              (self._tags, data["tags"])):
+            for key in keys:
+                paths = mapping.get(key.lower())
+                if paths is not None:
+                    paths.discard(path)
+                    if not paths:
+                        del mapping[key.lower()]
+
+    def _clear(self):
+        self._titles.clear()
+        self._backlinks.clear()
+        self._tags.clear()
+
+    # ---- 查询 ----
+    def resolve(self, title):
+        """链接目标对应的日记，同名时取路径最短的一篇"""
+        with self._lock:
+            paths = self._titles.get(title.strip().lower())
+            return min(paths, key=lambda path: (len(path), path)) if paths else None
+
+    def backlinks(self, path):
+        """链接到该日记的其他日记"""
+        with self._lock:
+            return sorted(self._backlinks.get(self.title(path).lower(), set()) - {path})
+
+    def linking_to(self, title):
+        with self._lock:
+            return sorted(self._backlinks.get(title.lower(), ()))
+
+    def tagged(self, tag):
+        """含有标签的日记"""
+        with self._lock:
+            return sorted(self._tags.get(tag.lstrip("#").lower(), ()))
+
+    # ---- 正文处理 ----
+    @staticmethod
+    def rewrite_links(content, old_title, new_title):
+        """把指向 old_title 的链接改为 new_title，保留显示文字"""
+        def replace(match):
+            if match.group(1).strip().lower() != old_title.lower():
+                return match.group()
+            return f"[[{new_title}|{match.group(2)}]]" if match.group(2) else f"[[{new_title}]]"
+
+        return LinkIndex._map_text(content, lambda text: LinkIndex.LINK_PATTERN.sub(replace, text))
+
+    @staticmethod
+    def linkify(tokens):
+        """
+        预览时把行内 token 中的 [[链接]] 和 #标签 转成链接，返回新的 token 列表
+
+        在 markdown-it 行内解析之后、合并相邻文字之前调用，只处理链接之外的普通文字，
+        代码、HTML、链接文字和地址中的不处理，转义的 \\# 也不当作标签
+        """
+        # 连续的普通文字先合并，[[链接]] 可能被拆成了几段
+        merged = []
+        for token in tokens:
+            if token.type == "text" and merged and merged[-1].type == "text":
+                merged[-1].content += token.content
+            else:
+                merged.append(token)
+        result, depth = [], 0
+        for index, token in enumerate(merged):
+            # Markdown 链接和日记中直接写的 <a> 里面都不再生成链接
+            html = token.content if token.type == "html_inline" else ""
+            if token.type == "link_open" or LinkIndex.HTML_LINK_OPEN.match(html):
+                depth += 1
+            elif token.type == "link_close" or LinkIndex.HTML_LINK_CLOSE.match(html):
+                depth = max(depth - 1, 0)
+            if token.type != "text" or depth:
+                result.append(token)
+                continue
+            # 紧跟在强调、代码等之后的 # 不是标签
+            previous = merged[index - 1].type if index else "softbreak"
+            result.extend(LinkIndex._linkify_text(token.content, previous in ("softbreak", "hardbreak")))
+        return result
+
+    @staticmethod
+    def _linkify_text(text, line_start):
+        """把一段普通文字拆成 文字、链接 token"""
+        # [(开始, 结束, 显示文字, 地址)]
+        spans, last = [], 0
+        for match in LinkIndex.LINK_PATTERN.finditer(text):
+            spans += LinkIndex._tag_spans(text, last, match.start(), line_start)
+            target = match.group(1).strip()
+            spans.append((match.start(), match.end(), match.group(2) or target, LinkIndex.LINK_URL + quote(target)))
+            last = match.end()
+        spans += LinkIndex._tag_spans(text, last, len(text), line_start)
+        if not spans:
+            return [LinkIndex._token("text", "", 0, text)]
+        tokens, last = [], 0
+        for start, end, label, url in spans:
+            if start > last:
+                tokens.append(LinkIndex._token("text", "", 0, text[last:start]))
+            link_open = LinkIndex._token("link_open", "a", 1)
+            link_open.attrs = {"href": url}
+            tokens += [link_open, LinkIndex._token("text", "", 0, label), LinkIndex._token("link_close", "a", -1)]
+            last = end
+        if last < len(text):
+            tokens.append(LinkIndex._token("text", "", 0, text[last:]))
+        return tokens
+
+    @staticmethod
+    def _tag_spans(text, start, end, line_start):
+        # 紧跟在强调、代码等之后（文字开头且不在行首）的 # 不是标签
+        return [(match.start(), match.end(), f"#{match.group(1)}", LinkIndex.TAG_URL + quote(match.group(1)))
+                for match in DiaryFileUtil.TAG_PATTERN.finditer(text[:end], start)
+                if match.start() or line_start]
+
+    @staticmethod
+    def _token(token_type, tag, nesting, content=""):
+        token = Token(token_type, tag, nesting)
+        token.content = content
+        return token
+
+    @staticmethod
+    def parse_url(url):
+        """预览中点击的地址，返回 ("link"|"tag", 目标)，其他地址返回 None"""
+        for kind, prefix in (("link", LinkIndex.LINK_URL), ("tag", LinkIndex.TAG_URL)):
+            if url.startswith(prefix):
+                return kind, unquote(url[len(prefix):])
+        return None
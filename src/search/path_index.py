@@ -0,0 +1,178 @@
+import bisect
+import heapq
+import os
+import re
+import sys
+import threading
+import time
+
+
+class PathIndex:
+    """
+    日记路径索引，用于按标题快速打开
+
+    只保存路径和标题，不解密任何内容。模糊匹配时把所有条目拼成一个字符串，
+    先用正则（在 C 中执行）筛出按顺序包含全部查询字符的条目，再只对这些条目打分。
+    """
+    MAX_SCORED = 200
+
+    def __init__(self, root):
+        self.root = root
+        # 路径 -> 匹配用的小写相对路径（不含 .enc）
+        self._entries = {}
+        self._lock = threading.RLock()
+        # 拼接后的匹配文本及每行对应的路径、起始位置，条目变化后重新生成
+        self._text = None
+        self._paths = []
+        self._offsets = []
+
+    def key(self, path):
+        rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+        return rel[:-4].lower() if rel.endswith(".enc") else rel.lower()
+
+    @staticmethod
+    def title(path):
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def reset(self, paths):
+        with self._lock:
+            self._entries = {path: self.key(path) for path in paths}
+            self._text = None
+
+    def add(self, path):
+        with self._lock:
+            self._entries[path] = self.key(path)
+            self._text = None
+
+    def remove(self, path):
+        """删除日记，或删除文件夹下的所有日记"""
+        with self._lock:
+            for entry in self._entries_under(path):
+                del self._entries[entry]
+            self._text = None
+
+    def rename(self, old_path, new_path):
+        with self._lock:
+            for entry in self._entries_under(old_path):
+                moved = new_path + entry[len(old_path):]
+                del self._entries[entry]
+                self._entries[moved] = self.key(moved)
+            self._text = None
+
+    def sync_folder(self, folder, paths):
+        """用文件夹中当前的日记替换索引中该文件夹（不含子文件夹）下的条目"""
+        paths = set(paths)
+        with self._lock:
+            for entry in [entry for entry in self._entries if os.path.dirname(entry) == folder]:
+                if entry not in paths:
+                    del self._entries[entry]
+            for path in paths:
+                if path not in self._entries:
+                    self._entries[path] = self.key(path)
+            self._text = None
+
+    def _entries_under(self, path):
+        if path in self._entries:
+            return [path]
+        prefix = os.path.join(path, "")
+        return [entry for entry in self._entries if entry.startswith(prefix)]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def _ensure_text(self):
+        if self._text is None:
+            self._paths = list(self._entries)
+            keys = [self._entries[path] for path in self._paths]
+            self._offsets = []
+            offset = 0
+            for key in keys:
+                self._offsets.append(offset)
+                offset += len(key) + 1
+            self._text = "\n".join(keys)
+
+    def search(self, query, limit=50):
+        """
+        模糊匹配：查询中的字符按顺序出现即命中，忽略空格和大小写
+
+        连续命中、命中在标题中、命中在词首或标题开头的得分更高
+        :return: [路径]，按得分从高到低
+        """
+        chars = [char for char in query.lower() if not char.isspace()]
+        with self._lock:
+            self._ensure_text()
+            if not chars:
+                return heapq.nsmallest(limit, self._paths, key=self._entries.get)
+            # a[^\nb]*b[^\nc]*c：在同一行内依次找到每个字符，不需要回溯
+            pattern = re.compile(re.escape(chars[0]) + "".join(
+                f"[^\n{re.escape(char)}]*{re.escape(char)}" for char in chars[1:]))
+            offsets = self._offsets
+            candidates = [(match.end() - match.start(), match.start()) for match in pattern.finditer(self._text)]
+            heapq.heapify(candidates)
+            # 先按命中跨度粗排，只对最紧凑的一部分精确打分；同一行可能命中多次，每条路径只取最紧凑的一次
+            scored, seen = [], set()
+            while candidates and len(scored) < self.MAX_SCORED:
+                line = bisect.bisect_right(offsets, heapq.heappop(candidates)[1]) - 1
+                if line in seen:
+                    continue
+                seen.add(line)
+                path = self._paths[line]
+                scored.append((self._score(self._entries[path], chars), self._entries[path], path))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [path for _, _, path in scored[:limit]]
+
+    @staticmethod
+    def _score(key, chars):
+        """优先在标题部分匹配，计算连续、词首加分"""
+        title_start = key.rfind("/") + 1
+        best = None
+        for start in (title_start, 0):
+            score, position, previous = 0, start, -2
+            for char in chars:
+                found = key.find(char, position)
+                if found < 0:
+                    break
+                score += 1
+                if found == previous + 1:
+                    score += 5
+                if found == title_start or (found > 0 and key[found - 1] in "/ _-."):
+                    score += 3
+                if found >= title_start:
+                    score += 2
+                previous = found
+                position = found + 1
+            else:
+                score -= len(key) * 0.01
+                best = score if best is None else max(best, score)
+        return best if best is not None else 0
+
+
+def benchmark(entry_count=50000, query_count=200):
+    """生成模拟路径，测量模糊匹配耗时"""
+    import random
+
+    random.seed(0)
+    words = ["日记", "周记", "工作", "旅行", "读书", "meeting", "notes", "travel", "project", "idea", "生活", "计划"]
+    index = PathIndex("/diary")
+    paths = []
+    for entry in range(entry_count):
+        folder = "/".join(random.choices(words, k=random.randint(0, 2)))
+        year, month = random.randint(2015, 2026), random.randint(1, 12)
+        title = "".join(random.choices(words, k=random.randint(1, 3))) + str(entry)
+        paths.append(os.path.join("/diary", folder, f"{year}", f"{month:02d}", f"{title}.enc"))
+    index.reset(paths)
+    index.search("warm")
+    queries = ["旅行", "mtg", "读书计划", "proj12", "trv", "日记1", "ideanote", "生活3"]
+    start = time.perf_counter()
+    for i in range(query_count):
+        index.search(queries[i % len(queries)])
+    elapsed = (time.perf_counter() - start) / query_count * 1000
+    print(f"{entry_count} 个条目，平均每次匹配 {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    # python -m src.search.path_index [条目数]
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
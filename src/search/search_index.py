@@ -0,0 +1,237 @@
+import bisect
+import html
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from src.const.fs_constants import FsConstants
+from src.search.encrypted_index import EncryptedIndex
+from src.util.common_util import CommonUtil
+
+
+class SearchIndex(EncryptedIndex):
+    """
+    日记全文索引
+
+    倒排索引：词 -> {日记路径: 词频}，按 BM25 排序。
+    中文按相邻两字（bigram）切分，英文、数字按单词切分并转为小写。
+    保存日记时只更新该篇日记的词条。
+    """
+    # BM25 参数
+    K1 = 1.2
+    B = 0.75
+    CJK_CHARS = "㐀-䶿一-鿿豈-﫿"
+    TOKEN_PATTERN = re.compile(rf"[{CJK_CHARS}]+|[a-z0-9_]+")
+    CJK_RUN_PATTERN = re.compile(rf"[{CJK_CHARS}]+")
+
+    def __init__(self, key, index_file=None):
+        super().__init__(key, index_file or os.path.join(CommonUtil.get_cache_path(), FsConstants.SEARCH_INDEX_FILE))
+        # 词 -> {路径: 词频}
+        self._postings = {}
+        # 路径 -> 词数
+        self._lengths = {}
+        # 单字查询和前缀查询用：汉字 -> 含该字的词；排好序的英文词
+        self._char_terms = {}
+        self._latin_terms = []
+        self._total_length = 0
+        self._loading = False
+
+    # ---- 分词 ----
+    @staticmethod
+    def tokenize(text):
+        """返回词列表：中文连续片段切成 bigram（单字保留），其余按单词切分"""
+        tokens = []
+        for match in SearchIndex.TOKEN_PATTERN.finditer(text.lower()):
+            word = match.group()
+            if SearchIndex.CJK_RUN_PATTERN.fullmatch(word):
+                if len(word) == 1:
+                    tokens.append(word)
+                else:
+                    tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+            else:
+                tokens.append(word)
+        return tokens
+
+    # ---- 索引结构 ----
+    def extract(self, content):
+        """{词: 词频}"""
+        return dict(Counter(self.tokenize(content)))
+
+    def _add(self, path, terms):
+        length = sum(terms.values())
+        self._lengths[path] = length
+        self._total_length += length
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if not self._loading:
+                    self._add_term(term)
+            postings[path] = tf
+
+    def _discard(self, path, terms):
+        self._total_length -= self._lengths.pop(path, 0)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(path, None)
+                if not postings:
+                    del self._postings[term]
+                    self._remove_term(term)
+
+    def _clear(self):
+        self._postings.clear()
+        self._lengths.clear()
+        self._char_terms.clear()
+        self._latin_terms = []
+        self._total_length = 0
+        # 加载时最后一次性生成单字表和有序英文词表
+        self._loading = True
+
+    def _after_load(self):
+        self._loading = False
+        for term in self._postings:
+            self._add_term(term, sort=False)
+        self._latin_terms.sort()
+
+    def _add_term(self, term, sort=True):
+        if self.CJK_RUN_PATTERN.fullmatch(term):
+            for char in set(term):
+                self._char_terms.setdefault(char, set()).add(term)
+        elif sort:
+            bisect.insort(self._latin_terms, term)
+        else:
+            self._latin_terms.append(term)
+
+    def _remove_term(self, term):
+        if self.CJK_RUN_PATTERN.fullmatch(term):
+            for char in set(term):
+                terms = self._char_terms.get(char)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._char_terms[char]
+        else:
+            index = bisect.bisect_left(self._latin_terms, term)
+            if index < len(self._latin_terms) and self._latin_terms[index] == term:
+                del self._latin_terms[index]
+
+    # ---- 查询 ----
+    def search(self, query, limit=50):
+        """
+        查询日记，所有词都出现才算命中
+
+        最后一个英文单词按前缀匹配，单个汉字匹配所有含该字的词，方便边输入边搜索
+        :return: [(路径, 得分)]，按得分从高到低
+        """
+        query_tokens = self.tokenize(query)
+        if not query_tokens:
+            return []
+        with self._lock:
+            doc_count = len(self._docs)
+            if not doc_count:
+                return []
+            avg_length = self._total_length / doc_count
+            scores = None
+            unique_tokens = list(dict.fromkeys(query_tokens))
+            for index, token in enumerate(unique_tokens):
+                prefix = index == len(unique_tokens) - 1 and not self.CJK_RUN_PATTERN.fullmatch(token)
+                token_scores = {}
+                for term in self._expand(token, prefix):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for path, tf in postings.items():
+                        length = self._lengths[path]
+                        score = idf * tf * (self.K1 + 1) / (tf + self.K1 * (1 - self.B + self.B * length / avg_length))
+                        token_scores[path] = token_scores.get(path, 0) + score
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {path: score + token_scores[path] for path, score in scores.items() if path in token_scores}
+                if not scores:
+                    return []
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def _expand(self, token, prefix):
+        """查询词对应的索引词"""
+        if len(token) == 1 and self.CJK_RUN_PATTERN.fullmatch(token):
+            return list(self._char_terms.get(token, ()))
+        if prefix:
+            start = bisect.bisect_left(self._latin_terms, token)
+            end = bisect.bisect_left(self._latin_terms, token + "\uffff")
+            return self._latin_terms[start:end]
+        return [token] if token in self._postings else []
+
+    @staticmethod
+    def query_terms(query):
+        """用于高亮和定位的查询词：中文整段、英文单词"""
+        return [match.group() for match in SearchIndex.TOKEN_PATTERN.finditer(query.lower())]
+
+    @staticmethod
+    def find_match(content, query):
+        """正文中第一个命中的位置和长度，中文整段找不到时退回到 bigram"""
+        lower = content.lower()
+        best = None
+        for term in SearchIndex.query_terms(query):
+            candidates = [term]
+            if SearchIndex.CJK_RUN_PATTERN.fullmatch(term) and len(term) > 2:
+                candidates += [term[i:i + 2] for i in range(len(term) - 1)]
+            for candidate in candidates:
+                position = lower.find(candidate)
+                if position >= 0:
+                    if best is None or position < best[0]:
+                        best = (position, len(candidate))
+                    break
+        return best
+
+    @staticmethod
+    def snippet(content, query, width=30):
+        """命中位置附近的摘要（HTML），查询词加粗高亮"""
+        match = SearchIndex.find_match(content, query)
+        start = max(0, match[0] - width) if match else 0
+        end = min(len(content), (match[0] + match[1] + width * 2) if match else width * 3)
+        text = " ".join(content[start:end].split())
+        terms = sorted(SearchIndex.query_terms(query), key=len, reverse=True)
+        if terms:
+            pattern = re.compile("|".join(re.escape(term) for term in terms), re.I)
+            parts, last = [], 0
+            for found in pattern.finditer(text):
+                parts.append(html.escape(text[last:found.start()]))
+                parts.append(f"<b style='color:#d35400'>{html.escape(found.group())}</b>")
+                last = found.end()
+            parts.append(html.escape(text[last:]))
+            text = "".join(parts)
+        else:
+            text = html.escape(text)
+        return ("…" if start > 0 else "") + text + ("…" if end < len(content) else "")
+
+
+def benchmark(doc_count=10000, query_count=200):
+    """生成模拟日记库，测量查询耗时"""
+    import random
+
+    random.seed(0)
+    # 常用汉字约 3000 个，按近似齐普夫分布取字，词表规模接近真实日记库
+    chinese = [chr(code) for code in range(0x4E00, 0x4E00 + 3000)]
+    weights = [1 / (rank + 1) for rank in range(len(chinese))]
+    english = ["python", "diary", "meeting", "travel", "coffee", "project", "weekend", "music", "book", "code"]
+    index = SearchIndex(b"0" * 32, index_file=os.devnull)
+    for doc in range(doc_count):
+        words = ["".join(random.choices(chinese, weights, k=random.randint(2, 12))) for _ in range(40)]
+        words += random.choices(english, k=20)
+        random.shuffle(words)
+        index.update(f"/diary/{doc}.enc", " ".join(words))
+    queries = ["一丁", "七万 丈三", "上下", "python", "coffee 丁七", "不与", "pro", "丑"]
+    start = time.perf_counter()
+    for i in range(query_count):
+        index.search(queries[i % len(queries)])
+    elapsed = (time.perf_counter() - start) / query_count * 1000
+    print(f"{doc_count} 篇日记，{len(index._postings)} 个词，平均每次查询 {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    # python -m src.search.search_index [日记数]
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
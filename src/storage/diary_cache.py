@@ -0,0 +1,107 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class DiaryCache:
+    """
+    已解密日记的内存 LRU 缓存，按字节数限制大小
+
+    以 (路径, 签名) 为键，签名是存储返回的 (mtime_ns, size)，日记在外部被修改后自动失效。
+    正文以 UTF-8 的 bytearray 保存，淘汰、失效或清空时先用 0 覆盖再释放，缩短缓存副本在内存中停留的时间。
+    get 返回的 str、编辑器和解密过程中的副本不受控制，仍可能留在内存中直到被回收覆盖。
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        # 路径 -> [签名, 正文, 是否预读且尚未被使用]，按最近使用排序
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # 命中的是预读进来的日记
+        self.prefetch_hits = 0
+
+    @staticmethod
+    def _wipe(data):
+        data[:] = bytes(len(data))
+
+    def get(self, path, signature):
+        """返回缓存的正文，未缓存或日记已变化时返回 None"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == tuple(signature):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                if entry[2]:
+                    self.prefetch_hits += 1
+                    entry[2] = False
+                return entry[1].decode()
+            if entry:
+                self._pop(path)
+            self.misses += 1
+            return None
+
+    def put(self, path, content, signature, prefetched=False):
+        data = bytearray(content.encode())
+        with self._lock:
+            if prefetched and path in self._entries:
+                # 预读期间日记已被打开或保存，保留较新的内容
+                self._wipe(data)
+                return
+            self._pop(path)
+            if len(data) > self.max_bytes:
+                self._wipe(data)
+                return
+            self._entries[path] = [tuple(signature), data, prefetched]
+            self._size += len(data)
+            self._evict()
+
+    def contains(self, path, signature):
+        """是否已缓存且未变化，不影响命中统计和使用顺序"""
+        entry = self._entries.get(path)
+        return bool(entry) and entry[0] == tuple(signature)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def discard(self, path):
+        """删除日记，或删除文件夹下所有日记的缓存"""
+        prefix = os.path.join(path, "")
+        with self._lock:
+            for entry in [entry for entry in self._entries if entry == path or entry.startswith(prefix)]:
+                self._pop(entry)
+
+    def clear(self):
+        """清空缓存并覆盖所有明文"""
+        with self._lock:
+            for _, data, _ in self._entries.values():
+                self._wipe(data)
+            self._entries.clear()
+            self._size = 0
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _pop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry:
+            self._size -= len(entry[1])
+            self._wipe(entry[1])
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            _, (_, data, _) = self._entries.popitem(last=False)
+            self._size -= len(data)
+            self._wipe(data)
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
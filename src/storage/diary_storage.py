@@ -0,0 +1,129 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from src.util.shard_layout_util import ShardLayoutUtil
+
+
+class DiaryStorage(ABC):
+    """
+    日记存储后端
+
+    日记和文件夹统一用根目录下的路径表示（日记以 .enc 结尾），目录树、右键菜单等只通过这里读写，
+    不关心日记实际存放在文件夹中还是单个数据库文件里。
+    """
+    BACKEND = ""
+
+    def __init__(self, root, key):
+        self.root = root
+        self.key = key
+
+    # ---- 目录 ----
+    def list_entries(self, folder, flatten=False):
+        """
+        列出文件夹内容，返回 [(名称, 路径, 是否目录)]，目录在前，日记名称不含扩展名
+
+        flatten 为 True 时不显示 YYYY/MM 目录，直接列出其中的日记（按年月顺序）
+        """
+        dirs, files = self._list(folder)
+        entries = []
+        for name, path in dirs:
+            shard_files = self._shard_files(path) if flatten and ShardLayoutUtil.is_year_dir(path) else None
+            if shard_files is None:
+                entries.append((name, path, True))
+            else:
+                files.extend(shard_files)
+        entries.sort(key=lambda item: item[0])
+        files.sort(key=lambda item: (os.path.dirname(item[1]), item[0]))
+        return entries + [(name[:-4], path, False) for name, path in files]
+
+    def _shard_files(self, year_dir):
+        """年目录下各月份目录中的日记，含有其他内容（用户自建的同名文件夹）时返回 None"""
+        months, year_files = self._list(year_dir)
+        if year_files:
+            return None
+        files = []
+        for name, path in months:
+            if not ShardLayoutUtil.MONTH_PATTERN.match(name):
+                return None
+            files.extend(self._list(path)[1])
+        return files
+
+    @abstractmethod
+    def _list(self, folder):
+        """返回 ([(目录名, 路径)], [(日记文件名, 路径)])"""
+
+    def shard_dir(self, folder, timestamp=None):
+        """日记应存放的 YYYY/MM 目录，不存在则创建"""
+        path = ShardLayoutUtil.shard_path(folder, timestamp if timestamp is not None else time.time())
+        self.create_folder(path)
+        return path
+
+    @abstractmethod
+    def is_dir(self, path):
+        """是否为文件夹（根目录也是文件夹）"""
+
+    @abstractmethod
+    def exists(self, path):
+        """日记或文件夹是否存在"""
+
+    @abstractmethod
+    def create_folder(self, path):
+        """创建文件夹（包括不存在的上级文件夹）"""
+
+    @abstractmethod
+    def rename(self, old_path, new_path):
+        """重命名或移动日记、文件夹，目标已存在时抛出 FileExistsError"""
+
+    @abstractmethod
+    def delete(self, path):
+        """删除日记或文件夹（连同其中的内容）"""
+
+    @abstractmethod
+    def list_files(self):
+        """所有日记的路径"""
+
+    @abstractmethod
+    def list_folders(self):
+        """所有文件夹的路径（不含根目录）"""
+
+    @abstractmethod
+    def stat(self, path):
+        """返回 (修改时间 ns, 大小)，用于缓存失效判断"""
+
+    # ---- 日记 ----
+    @abstractmethod
+    def read(self, path):
+        """读取并解密日记正文"""
+
+    @abstractmethod
+    def read_meta(self, path):
+        """只读取日记的元数据"""
+
+    @abstractmethod
+    def write(self, path, content):
+        """加密保存日记，保留已有的创建时间"""
+
+    @abstractmethod
+    def read_raw(self, path):
+        """日记的加密内容（与 .enc 文件格式相同），用于完整性检查"""
+
+    @abstractmethod
+    def export_entry(self, path):
+        """返回 (元数据密文, 正文密文, 修改时间 ns)，旧格式日记的元数据密文为 None"""
+
+    @abstractmethod
+    def import_entry(self, path, meta, meta_token, body_token, mtime_ns):
+        """直接写入已加密的日记，用于后端之间迁移"""
+
+    @contextmanager
+    def batch(self):
+        """批量写入，支持事务的后端在结束时统一提交"""
+        yield
+
+    def release_thread(self):
+        """释放当前线程占用的资源（如数据库连接），后台线程结束前调用"""
+
+    def close(self):
+        pass
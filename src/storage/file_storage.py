@@ -0,0 +1,78 @@
+import os
+import shutil
+
+from src.storage.diary_storage import DiaryStorage
+from src.util.diary_file_util import DiaryFileUtil
+
+
+class FileDiaryStorage(DiaryStorage):
+    """每篇日记一个 .enc 文件，文件夹即目录"""
+    BACKEND = "file"
+
+    def _list(self, folder):
+        dirs, files = [], []
+        for entry in os.scandir(folder):
+            if entry.is_dir():
+                dirs.append((entry.name, entry.path))
+            elif entry.is_file() and entry.name.endswith(".enc"):
+                files.append((entry.name, entry.path))
+        return dirs, files
+
+    def is_dir(self, path):
+        return os.path.isdir(path)
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def create_folder(self, path):
+        os.makedirs(path, exist_ok=True)
+
+    def rename(self, old_path, new_path):
+        if os.path.exists(new_path):
+            raise FileExistsError(new_path)
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        os.rename(old_path, new_path)
+
+    def delete(self, path):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+    def list_files(self):
+        files = []
+        for dir_path, _, file_names in os.walk(self.root):
+            files.extend(os.path.join(dir_path, name) for name in file_names if name.endswith(".enc"))
+        return files
+
+    def list_folders(self):
+        folders = []
+        for dir_path, dir_names, _ in os.walk(self.root):
+            folders.extend(os.path.join(dir_path, name) for name in dir_names)
+        return folders
+
+    def stat(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self, path):
+        return DiaryFileUtil.read_diary(path, self.key)
+
+    def read_meta(self, path):
+        return DiaryFileUtil.read_meta(path, self.key)
+
+    def write(self, path, content):
+        DiaryFileUtil.write_diary(path, content, self.key)
+
+    def read_raw(self, path):
+        with open(path, "rb") as file:
+            return file.read()
+
+    def export_entry(self, path):
+        meta_token, body_token = DiaryFileUtil.split(self.read_raw(path))
+        return meta_token, body_token, os.stat(path).st_mtime_ns
+
+    def import_entry(self, path, meta, meta_token, body_token, mtime_ns):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        DiaryFileUtil.atomic_write(path, DiaryFileUtil.pack_tokens(meta_token, body_token))
+        os.utime(path, ns=(mtime_ns, mtime_ns))
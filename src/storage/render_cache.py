@@ -0,0 +1,141 @@
+import hashlib
+import hmac
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from loguru import logger
+
+from src.util.diary_file_util import DiaryFileUtil
+from src.util.encryption_util import EncryptionUtil
+
+
+class RenderCache:
+    """
+    渲染结果的磁盘缓存，按字节数限制大小，超出时淘汰最久未使用的
+
+    以 HMAC(日记密钥, 渲染器版本 + 正文) 为文件名，内容未变且渲染器未升级时直接取出各块的 HTML，
+    文件名不暴露正文的哈希。每个文件是压缩后加密的 [(块的键, HTML, 起始行)]，使用顺序记在文件的修改时间上，
+    重启后仍按最近使用淘汰。很短的日记渲染很快，不缓存。可以在后台线程中调用。
+    """
+    # 少于这么多字符的正文不缓存
+    MIN_CONTENT_CHARS = 4096
+
+    def __init__(self, key, cache_dir, version, max_bytes):
+        self.key = key
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_bytes = max_bytes
+        # 文件名 -> 文件大小，按最近使用排序；None 表示还没有扫描缓存目录
+        self._entries = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _name(self, content):
+        digest = hmac.new(self.key, self.version.encode() + b"\0" + content.encode(), hashlib.sha256)
+        return f"{digest.hexdigest()}.enc"
+
+    def get(self, content):
+        """返回缓存的渲染结果，未缓存时返回 None"""
+        if not self.max_bytes or len(content) < self.MIN_CONTENT_CHARS:
+            return None
+        name = self._name(content)
+        file_path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            self._scan()
+            if name not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+        try:
+            with open(file_path, "rb") as file:
+                blocks = json.loads(zlib.decompress(EncryptionUtil.decrypt(file.read(), self.key)))
+            os.utime(file_path)
+        except Exception as e:
+            logger.warning(f"读取渲染缓存失败：{name}, {str(e)}")
+            self.discard(name)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [tuple(block) for block in blocks]
+
+    def put(self, content, blocks):
+        if not self.max_bytes or len(content) < self.MIN_CONTENT_CHARS:
+            return
+        name = self._name(content)
+        data = EncryptionUtil.encrypt(zlib.compress(json.dumps(blocks, ensure_ascii=False).encode()), self.key)
+        if len(data) > self.max_bytes:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            DiaryFileUtil.atomic_write(os.path.join(self.cache_dir, name), data)
+        except OSError as e:
+            logger.warning(f"保存渲染缓存失败：{str(e)}")
+            return
+        with self._lock:
+            self._scan()
+            self._size -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._size += len(data)
+            self._evict()
+
+    def discard(self, name):
+        with self._lock:
+            self._scan()
+            self._remove(name)
+
+    def clear(self):
+        with self._lock:
+            self._scan()
+            for name in list(self._entries):
+                self._remove(name)
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._scan()
+            self._evict()
+
+    def _scan(self):
+        """第一次使用时读取缓存目录，按修改时间恢复使用顺序"""
+        if self._entries is not None:
+            return
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".enc") and entry.is_file():
+                        stat = entry.stat()
+                        files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"读取渲染缓存目录失败：{str(e)}")
+        self._entries = OrderedDict((name, size) for _, name, size in sorted(files))
+        self._size = sum(self._entries.values())
+        self._evict()
+
+    def _remove(self, name):
+        size = self._entries.pop(name, None)
+        if size is None:
+            return
+        self._size -= size
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries or ())
@@ -0,0 +1,245 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from loguru import logger
+
+from src.storage.diary_storage import DiaryStorage
+from src.util.diary_file_util import DiaryFileUtil
+from src.util.encryption_util import EncryptionUtil
+
+
+class SqliteDiaryStorage(DiaryStorage):
+    """
+    单文件 SQLite 数据库（WAL 模式）
+
+    每篇日记、每个文件夹一行，正文和元数据按行分别加密；
+    创建/修改时间、大小等不含明文内容的字段建索引，列出、打开、保存都是一次索引查询。
+    路径以根目录的相对路径（/ 分隔）保存，数据库可以复制到其他系统使用。
+    数据库放在同步目录之外，正在写入的数据库和 -wal/-shm 文件不会被同步工具复制，
+    因此使用这个后端时日记不参与 WebDAV 同步，首选项和切换时的确认框中会提示用户。
+    """
+    BACKEND = "sqlite"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            path     TEXT PRIMARY KEY,
+            parent   TEXT NOT NULL,
+            name     TEXT NOT NULL,
+            is_dir   INTEGER NOT NULL,
+            meta     BLOB,
+            body     BLOB,
+            created  INTEGER,
+            updated  INTEGER,
+            mtime_ns INTEGER,
+            size     INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_parent ON entries(parent, name);
+        CREATE INDEX IF NOT EXISTS idx_entries_created ON entries(is_dir, created);
+    """
+
+    def __init__(self, root, key, db_path):
+        super().__init__(root, key)
+        self.db_path = db_path
+        # 每个线程一个连接，后台任务可以并行读取；后台线程结束前调用 release_thread() 关闭自己的连接，
+        # 线程池中已退出的线程的连接在下次建立连接时关闭
+        self._local = threading.local()
+        # 线程 -> 连接
+        self._connections = {}
+        self._lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.batch = False
+            with self._lock:
+                self._close_dead()
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    def _close_dead(self):
+        for thread in [thread for thread in self._connections if not thread.is_alive()]:
+            self._close_conn(self._connections.pop(thread))
+
+    @staticmethod
+    def _close_conn(conn):
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"关闭数据库连接失败：{str(e)}")
+
+    @contextmanager
+    def _write(self):
+        """写事务，批量模式下由 batch() 统一提交"""
+        conn = self._conn()
+        if self._local.batch:
+            yield conn
+            return
+        with conn:
+            yield conn
+
+    @contextmanager
+    def batch(self):
+        conn = self._conn()
+        self._local.batch = True
+        try:
+            with conn:
+                yield
+        finally:
+            self._local.batch = False
+
+    # ---- 路径转换 ----
+    def _rel(self, path):
+        rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+        return "" if rel == "." else rel
+
+    def _abs(self, rel):
+        return os.path.join(self.root, *rel.split("/")) if rel else self.root
+
+    @staticmethod
+    def _parent(rel):
+        return rel.rpartition("/")[0]
+
+    @staticmethod
+    def _name(rel):
+        return rel.rpartition("/")[2]
+
+    @staticmethod
+    def _subtree(rel):
+        """rel 本身及其所有子项的查询条件（"0" 是 "/" 的下一个字符）"""
+        return "(path = ? OR (path >= ? AND path < ?))", (rel, rel + "/", rel + "0")
+
+    def _ensure_folder(self, conn, rel):
+        parts = rel.split("/") if rel else []
+        for index in range(len(parts)):
+            folder = "/".join(parts[:index + 1])
+            conn.execute("INSERT OR IGNORE INTO entries(path, parent, name, is_dir) VALUES (?, ?, ?, 1)",
+                         (folder, self._parent(folder), parts[index]))
+
+    # ---- 目录 ----
+    def _list(self, folder):
+        dirs, files = [], []
+        rows = self._conn().execute("SELECT name, path, is_dir FROM entries WHERE parent = ? ORDER BY name",
+                                    (self._rel(folder),))
+        for name, rel, is_dir in rows:
+            (dirs if is_dir else files).append((name, self._abs(rel)))
+        return dirs, files
+
+    def is_dir(self, path):
+        rel = self._rel(path)
+        if not rel:
+            return True
+        row = self._conn().execute("SELECT is_dir FROM entries WHERE path = ?", (rel,)).fetchone()
+        return bool(row and row[0])
+
+    def exists(self, path):
+        rel = self._rel(path)
+        return not rel or self._conn().execute("SELECT 1 FROM entries WHERE path = ?", (rel,)).fetchone() is not None
+
+    def create_folder(self, path):
+        with self._write() as conn:
+            self._ensure_folder(conn, self._rel(path))
+
+    def rename(self, old_path, new_path):
+        old_rel, new_rel = self._rel(old_path), self._rel(new_path)
+        if self.exists(new_path):
+            raise FileExistsError(new_path)
+        condition, params = self._subtree(old_rel)
+        with self._write() as conn:
+            rows = conn.execute(f"SELECT path FROM entries WHERE {condition}", params).fetchall()
+            if not rows:
+                raise FileNotFoundError(old_path)
+            self._ensure_folder(conn, self._parent(new_rel))
+            for (rel,) in rows:
+                moved = new_rel + rel[len(old_rel):]
+                conn.execute("UPDATE entries SET path = ?, parent = ?, name = ? WHERE path = ?",
+                             (moved, self._parent(moved), self._name(moved), rel))
+
+    def delete(self, path):
+        condition, params = self._subtree(self._rel(path))
+        with self._write() as conn:
+            conn.execute(f"DELETE FROM entries WHERE {condition}", params)
+
+    def list_files(self):
+        return [self._abs(rel) for (rel,) in self._conn().execute("SELECT path FROM entries WHERE is_dir = 0")]
+
+    def list_folders(self):
+        return [self._abs(rel) for (rel,) in self._conn().execute("SELECT path FROM entries WHERE is_dir = 1")]
+
+    def stat(self, path):
+        row = self._conn().execute("SELECT mtime_ns, size FROM entries WHERE path = ? AND is_dir = 0",
+                                   (self._rel(path),)).fetchone()
+        if not row:
+            raise FileNotFoundError(path)
+        return row
+
+    # ---- 日记 ----
+    def _row(self, path, columns):
+        row = self._conn().execute(f"SELECT {columns} FROM entries WHERE path = ? AND is_dir = 0",
+                                   (self._rel(path),)).fetchone()
+        if not row:
+            raise FileNotFoundError(path)
+        return row
+
+    def read(self, path):
+        return EncryptionUtil.decrypt(self._row(path, "body")[0], self.key).decode()
+
+    def read_meta(self, path):
+        try:
+            return DiaryFileUtil.decrypt_meta(self._row(path, "meta")[0], self.key)
+        except Exception as e:
+            logger.warning(f"读取日记元数据失败：{path}, {str(e)}")
+            return None
+
+    def write(self, path, content):
+        row = self._conn().execute("SELECT created FROM entries WHERE path = ? AND is_dir = 0",
+                                   (self._rel(path),)).fetchone()
+        meta = DiaryFileUtil.build_meta(content, row[0] if row else None)
+        self._put(path, meta, DiaryFileUtil.encrypt_meta(meta, self.key),
+                  EncryptionUtil.encrypt(content.encode(), self.key), time.time_ns())
+
+    def read_raw(self, path):
+        meta_token, body_token = self._row(path, "meta, body")
+        return DiaryFileUtil.pack_tokens(meta_token, body_token)
+
+    def export_entry(self, path):
+        return self._row(path, "meta, body, mtime_ns")
+
+    def import_entry(self, path, meta, meta_token, body_token, mtime_ns):
+        self._put(path, meta, meta_token, body_token, mtime_ns)
+
+    def _put(self, path, meta, meta_token, body_token, mtime_ns):
+        rel = self._rel(path)
+        with self._write() as conn:
+            self._ensure_folder(conn, self._parent(rel))
+            conn.execute("""
+                INSERT INTO entries(path, parent, name, is_dir, meta, body, created, updated, mtime_ns, size)
+                VALUES (?, ?, ?, 0, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    meta = excluded.meta, body = excluded.body, created = excluded.created,
+                    updated = excluded.updated, mtime_ns = excluded.mtime_ns, size = excluded.size
+            """, (rel, self._parent(rel), self._name(rel), meta_token, body_token,
+                  meta.get("created"), meta.get("updated"), mtime_ns, len(body_token)))
+
+    def release_thread(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.current_thread(), None)
+        self._close_conn(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections.values():
+                self._close_conn(conn)
+            self._connections.clear()
+        self._local = threading.local()
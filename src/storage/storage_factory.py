@@ -0,0 +1,55 @@
+import os
+import shutil
+import sqlite3
+
+from fs_base.config_manager import ConfigManager
+from loguru import logger
+
+from src.const.fs_constants import FsConstants
+from src.storage.file_storage import FileDiaryStorage
+from src.storage.sqlite_storage import SqliteDiaryStorage
+from src.util.common_util import CommonUtil
+
+
+class StorageFactory:
+    """根据配置创建日记存储后端"""
+    BACKENDS = (FileDiaryStorage.BACKEND, SqliteDiaryStorage.BACKEND)
+
+    @staticmethod
+    def create(backend, key, root=None):
+        root = root or CommonUtil.get_diary_article_path()
+        if backend == SqliteDiaryStorage.BACKEND:
+            db_path = os.path.join(CommonUtil.get_database_path(), FsConstants.SQLITE_VAULT_FILE)
+            return SqliteDiaryStorage(root, key, StorageFactory._move_legacy_database(db_path))
+        return FileDiaryStorage(root, key)
+
+    @staticmethod
+    def _move_legacy_database(db_path):
+        """
+        旧版本把数据库放在同步目录中，先把 WAL 合并回数据库文件，再移到数据库目录
+
+        :return: 要使用的数据库路径，移动失败时继续使用原来的位置
+        """
+        legacy_path = os.path.join(CommonUtil.get_diary_enc_path(), FsConstants.SQLITE_VAULT_FILE)
+        if os.path.exists(db_path) or not os.path.exists(legacy_path):
+            return db_path
+        try:
+            conn = sqlite3.connect(legacy_path)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+            shutil.move(legacy_path, db_path)
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(legacy_path + suffix):
+                    os.remove(legacy_path + suffix)
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"移动数据库失败，继续使用同步目录中的数据库：{str(e)}")
+            return legacy_path if os.path.exists(legacy_path) else db_path
+        logger.info(f"数据库已移出同步目录：{db_path}")
+        return db_path
+
+    @staticmethod
+    def create_default(key):
+        """使用首选项中配置的后端"""
+        return StorageFactory.create(ConfigManager().get_config(FsConstants.STORAGE_BACKEND_KEY), key)
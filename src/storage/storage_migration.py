@@ -0,0 +1,57 @@
+import sys
+
+from loguru import logger
+
+from src.storage.storage_factory import StorageFactory
+from src.util.common_util import CommonUtil
+from src.util.diary_file_util import DiaryFileUtil
+from src.util.encryption_util import EncryptionUtil
+
+
+class StorageMigration:
+    """在不同存储后端之间迁移日记，密文原样复制，不重新加密"""
+
+    @staticmethod
+    def migrate(source, target, progress=None):
+        """
+        将 source 中的文件夹和日记全部写入 target，同名日记以 source 为准
+
+        :return: 迁移的日记数量
+        """
+        files = source.list_files()
+        with target.batch():
+            for folder in source.list_folders():
+                target.create_folder(folder)
+            for index, path in enumerate(files):
+                meta_token, body_token, mtime_ns = source.export_entry(path)
+                if meta_token is None:
+                    # 旧格式日记没有元数据块，迁移时顺便补齐
+                    content = EncryptionUtil.decrypt(body_token, source.key).decode()
+                    meta = DiaryFileUtil.build_meta(content, created=mtime_ns / 1e9)
+                    meta["updated"] = int(mtime_ns / 1e9)
+                    meta_token = DiaryFileUtil.encrypt_meta(meta, source.key)
+                else:
+                    meta = DiaryFileUtil.decrypt_meta(meta_token, source.key)
+                target.import_entry(path, meta, meta_token, body_token, mtime_ns)
+                if progress:
+                    progress(index + 1, len(files))
+        logger.info(f"已从 {source.BACKEND} 迁移 {len(files)} 篇日记到 {target.BACKEND}")
+        return len(files)
+
+
+if __name__ == "__main__":
+    # 命令行迁移：python -m src.storage.storage_migration file sqlite
+    if len(sys.argv) != 3 or not set(sys.argv[1:]) <= set(StorageFactory.BACKENDS):
+        print(f"用法：python -m src.storage.storage_migration <源后端> <目标后端>，后端：{' / '.join(StorageFactory.BACKENDS)}")
+        sys.exit(2)
+    with open(CommonUtil.get_diary_key_path(), "rb") as key_file:
+        migrate_key = key_file.read()
+    source_storage = StorageFactory.create(sys.argv[1], migrate_key)
+    target_storage = StorageFactory.create(sys.argv[2], migrate_key)
+    try:
+        StorageMigration.migrate(source_storage, target_storage,
+                                 progress=lambda done, total: print(f"\r{done}/{total}", end="", file=sys.stderr))
+        print(file=sys.stderr)
+    finally:
+        source_storage.close()
+        target_storage.close()
@@ -0,0 +1,108 @@
+import json
+import os
+
+from loguru import logger
+
+
+class TreeSnapshot:
+    """
+    目录树快照：各文件夹的内容列表和展开状态，保存在缓存目录中
+
+    启动时直接用快照恢复目录树，再在后台与实际存储核对。快照只在同一根目录、
+    存储后端和平铺设置下有效，条件变化时丢弃文件夹列表，只保留展开状态。
+    """
+    VERSION = 1
+
+    def __init__(self, snapshot_file, root):
+        self.snapshot_file = snapshot_file
+        self.root = root
+        # 文件夹路径 -> [[名称, 路径, 是否目录]]，与 DiaryStorage.list_entries 的结果一致
+        self._folders = {}
+        self._expanded = set()
+        self._layout = None
+        self.dirty = False
+
+    def load(self, backend, flat):
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") != self.VERSION or data.get("root") != self.root:
+            data = {}
+        self._expanded = set(data.get("expanded", []))
+        self._folders = data.get("folders", {}) if data.get("layout") == [backend, flat] else {}
+        self._layout = [backend, flat]
+        self.dirty = False
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = {"version": self.VERSION, "root": self.root, "layout": self._layout,
+                "folders": self._folders, "expanded": sorted(self._expanded)}
+        try:
+            tmp_path = f"{self.snapshot_file}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_file)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"保存目录树快照失败：{str(e)}")
+
+    def reset(self, backend, flat):
+        """存储后端或平铺设置改变后丢弃文件夹列表"""
+        self._folders = {}
+        self._layout = [backend, flat]
+        self.dirty = True
+
+    # ---- 文件夹内容 ----
+    def get(self, folder):
+        return self._folders.get(folder)
+
+    def set(self, folder, entries):
+        """记录文件夹内容，内容有变化时返回 True"""
+        entries = [list(entry) for entry in entries]
+        if self._folders.get(folder) == entries:
+            return False
+        self._folders[folder] = entries
+        self.dirty = True
+        return True
+
+    def folders(self):
+        return list(self._folders)
+
+    def invalidate(self, path):
+        """路径所在的各级文件夹需要重新读取"""
+        folder = os.path.dirname(path)
+        while folder.startswith(self.root):
+            if self._folders.pop(folder, None) is not None:
+                self.dirty = True
+            if folder == self.root:
+                break
+            folder = os.path.dirname(folder)
+
+    def remove(self, path):
+        """删除文件夹及其子文件夹的快照"""
+        prefix = os.path.join(path, "")
+        for folder in [folder for folder in self._folders if folder == path or folder.startswith(prefix)]:
+            del self._folders[folder]
+        self._expanded = {folder for folder in self._expanded if folder != path and not folder.startswith(prefix)}
+        self.invalidate(path)
+        self.dirty = True
+
+    def rename(self, old_path, new_path):
+        """文件夹改名后保留其中子文件夹的展开状态"""
+        prefix = os.path.join(old_path, "")
+        self._expanded = {new_path + folder[len(old_path):] if folder == old_path or folder.startswith(prefix)
+                          else folder for folder in self._expanded}
+        self.remove(old_path)
+        self.invalidate(new_path)
+
+    # ---- 展开状态 ----
+    def is_expanded(self, folder):
+        return folder in self._expanded
+
+    def set_expanded(self, folder, expanded):
+        if expanded != (folder in self._expanded):
+            (self._expanded.add if expanded else self._expanded.discard)(folder)
+            self.dirty = True
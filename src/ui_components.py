@@ -1,4 +1,7 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QListWidget, QSplitter, QAbstractItemView, QTreeWidget
+import html
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QSplitter, QAbstractItemView, \
+    QTreeView, QLineEdit, QProgressBar, QLabel
 from PySide6.QtCore import Qt
 from src.widget.markdown_editor import MarkdownEditor
 
@@ -18,14 +21,48 @@ class UiComponents(QWidget):
         self.add_button = QPushButton("新建日记")
         left_layout.addWidget(self.add_button)
 
+        # 搜索框
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索日记...")
+        self.search_edit.setClearButtonEnabled(True)
+        left_layout.addWidget(self.search_edit)
+
+        # 首次建立索引的进度（建立完成后隐藏）
+        self.index_progress_widget = QWidget()
+        index_progress_layout = QHBoxLayout(self.index_progress_widget)
+        index_progress_layout.setContentsMargins(0, 0, 0, 0)
+        self.index_progress_bar = QProgressBar()
+        self.index_progress_bar.setFormat("正在建立索引 %v/%m")
+        self.index_progress_bar.setMaximumHeight(18)
+        self.index_cancel_button = QPushButton("取消")
+        index_progress_layout.addWidget(self.index_progress_bar)
+        index_progress_layout.addWidget(self.index_cancel_button)
+        self.index_progress_widget.setVisible(False)
+        left_layout.addWidget(self.index_progress_widget)
+
+        # 搜索结果（有搜索内容时代替目录树显示）
+        self.search_result_list = QListWidget()
+        self.search_result_list.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.search_result_list.setVisible(False)
+        left_layout.addWidget(self.search_result_list)
+
         # 左侧列表
         # 左侧树形结构
-        self.diary_tree = QTreeWidget()
+        self.diary_tree = QTreeView()
         self.diary_tree.setHeaderHidden(True)  # 隐藏标题栏
+        # 行高一致，视图不必逐行计算高度
+        self.diary_tree.setUniformRowHeights(True)
         self.diary_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.diary_tree.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
         left_layout.addWidget(self.diary_tree)
 
+        # 反向链接：链接到当前日记的其他日记
+        self.backlink_label = QLabel("反向链接")
+        left_layout.addWidget(self.backlink_label)
+        self.backlink_list = QListWidget()
+        self.backlink_list.setMaximumHeight(150)
+        left_layout.addWidget(self.backlink_list)
+
         # 将左侧布局添加到分割器
         self.splitter.addWidget(left_widget)
 
@@ -41,3 +78,41 @@ class UiComponents(QWidget):
         layout = QVBoxLayout(self)
         layout.addWidget(self.splitter)
         self.setLayout(layout)
+
+    def show_search_results(self, visible):
+        """有搜索内容时显示结果列表，否则显示目录树"""
+        self.search_result_list.setVisible(visible)
+        self.diary_tree.setVisible(not visible)
+
+    def set_backlinks(self, paths, title_func):
+        """显示链接到当前日记的日记"""
+        self.backlink_list.clear()
+        for path in paths:
+            self.backlink_list.addItem(title_func(path))
+            self.backlink_list.item(self.backlink_list.count() - 1).setData(Qt.ItemDataRole.UserRole, path)
+        self.backlink_label.setText(f"反向链接（{len(paths)}）" if paths else "反向链接")
+
+    @staticmethod
+    def _search_result_text(title, snippet):
+        return f"<b>{html.escape(title)}</b><br><span style='color:gray'>{snippet}</span>"
+
+    def add_search_result(self, title, snippet, path):
+        """添加一条搜索结果，摘要为带高亮的 HTML"""
+        label = QLabel(self._search_result_text(title, snippet))
+        label.setTextFormat(Qt.TextFormat.RichText)
+        label.setWordWrap(True)
+        label.setContentsMargins(4, 4, 4, 4)
+        label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.search_result_list.addItem("")
+        item = self.search_result_list.item(self.search_result_list.count() - 1)
+        item.setData(Qt.ItemDataRole.UserRole, path)
+        item.setSizeHint(label.sizeHint())
+        self.search_result_list.setItemWidget(item, label)
+
+    def set_search_snippet(self, row, title, snippet):
+        """摘要在后台生成后填入第 row 条搜索结果"""
+        item = self.search_result_list.item(row)
+        label = self.search_result_list.itemWidget(item) if item else None
+        if label:
+            label.setText(self._search_result_text(title, snippet))
+            item.setSizeHint(label.sizeHint())
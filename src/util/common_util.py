@@ -34,4 +34,18 @@ class CommonUtil(BaseUtil):
 
         # 优先使用外部配置文件
         data_path = CommonUtil.get_external_path()
-        return os.path.join(data_path, FsConstants.DIARY_KEY_PATH)
\ No newline at end of file
+        return os.path.join(data_path, FsConstants.DIARY_KEY_PATH)
+
+    @staticmethod
+    def get_cache_path():
+        """缓存目录，不在同步目录内"""
+        cache_path = os.path.join(CommonUtil.get_external_path(), FsConstants.CACHE_PATH)
+        os.makedirs(cache_path, exist_ok=True)
+        return cache_path
+
+    @staticmethod
+    def get_database_path():
+        """SQLite 数据库目录，不在同步目录内，避免同步工具复制正在写入的数据库和 -wal/-shm 文件"""
+        database_path = os.path.join(CommonUtil.get_external_path(), FsConstants.DATABASE_PATH)
+        os.makedirs(database_path, exist_ok=True)
+        return database_path
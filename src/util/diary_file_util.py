@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import struct
+import time
+
+from loguru import logger
+
+from src.util.encryption_util import EncryptionUtil
+
+
+class DiaryFileUtil:
+    """
+    日记文件读写
+
+    文件格式：
+        MAGIC(4) | VERSION(1) | META_LEN(4, 大端) | 元数据密文(META_LEN) | 正文密文
+    元数据和正文分别加密，列表、提示、排序、统计只需读取并解密文件头部的元数据块。
+    不以 MAGIC 开头的旧文件整体即为正文密文，没有元数据，下次保存时才写成新格式；
+    读取元数据不会改写文件。新格式是单向的，旧版本的客户端无法读取保存过的日记。
+    """
+    MAGIC = b"FSDM"
+    VERSION = 1
+    # MAGIC + VERSION + META_LEN
+    HEADER_SIZE = 9
+    FIRST_LINE_LENGTH = 50
+
+    # 标签：前面是空白或行首的 #xxx，排除 Markdown 标题（# 后有空格）
+    TAG_PATTERN = re.compile(r"(?<!\S)#([\w/\-]+)")
+    # 代码块（``` 或 ~~~ 围栏，未闭合时到文末）和行内代码
+    CODE_PATTERN = re.compile(r"^ {0,3}(`{3,})[^\n]*(?:\n.*?^ {0,3}\1`*[ \t]*$|.*\Z)"
+                              r"|^ {0,3}(~{3,})[^\n]*(?:\n.*?^ {0,3}\2~*[ \t]*$|.*\Z)"
+                              r"|`[^`\n]*`", re.S | re.M)
+    HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+    CJK_PATTERN = re.compile(r"[㐀-䶿一-鿿豈-﫿]")
+    WORD_PATTERN = re.compile(r"[A-Za-z0-9_']+")
+
+    @staticmethod
+    def build_meta(content, created=None):
+        """根据正文生成元数据"""
+        now = int(time.time())
+        text = DiaryFileUtil.HTML_TAG_PATTERN.sub("", DiaryFileUtil.CODE_PATTERN.sub("", content))
+        first_line = ""
+        for line in content.splitlines():
+            line = line.strip().lstrip("#>-*+ ").strip()
+            if line:
+                first_line = line[:DiaryFileUtil.FIRST_LINE_LENGTH]
+                break
+        return {
+            "created": int(created) if created else now,
+            "updated": now,
+            "words": len(DiaryFileUtil.CJK_PATTERN.findall(text)) + len(DiaryFileUtil.WORD_PATTERN.findall(text)),
+            "chars": len(content),
+            "first_line": first_line,
+            "tags": DiaryFileUtil.extract_tags(content),
+        }
+
+    @staticmethod
+    def extract_tags(content):
+        """提取 #标签（忽略代码块和 HTML 标签中的内容）"""
+        text = DiaryFileUtil.HTML_TAG_PATTERN.sub("", DiaryFileUtil.CODE_PATTERN.sub("", content))
+        tags = []
+        for tag in DiaryFileUtil.TAG_PATTERN.findall(text):
+            if tag not in tags:
+                tags.append(tag)
+        return tags
+
+    @staticmethod
+    def pack(content, meta, key):
+        """将正文和元数据打包成文件内容"""
+        return DiaryFileUtil.pack_tokens(DiaryFileUtil.encrypt_meta(meta, key),
+                                         EncryptionUtil.encrypt(content.encode(), key))
+
+    @staticmethod
+    def pack_tokens(meta_token, body_token):
+        """将已加密的元数据和正文拼成文件内容，元数据为空时为旧格式"""
+        if meta_token is None:
+            return body_token
+        header = DiaryFileUtil.MAGIC + struct.pack(">BI", DiaryFileUtil.VERSION, len(meta_token))
+        return header + meta_token + body_token
+
+    @staticmethod
+    def encrypt_meta(meta, key):
+        return EncryptionUtil.encrypt(json.dumps(meta, ensure_ascii=False).encode(), key)
+
+    @staticmethod
+    def decrypt_meta(meta_token, key):
+        return json.loads(EncryptionUtil.decrypt(meta_token, key).decode())
+
+    @staticmethod
+    def split(data):
+        """拆分文件内容，返回 (元数据密文, 正文密文)，旧格式的元数据密文为 None"""
+        if not data.startswith(DiaryFileUtil.MAGIC):
+            return None, data
+        if len(data) < DiaryFileUtil.HEADER_SIZE:
+            raise ValueError("文件头不完整")
+        version, meta_len = struct.unpack(">BI", data[4:DiaryFileUtil.HEADER_SIZE])
+        if version != DiaryFileUtil.VERSION:
+            raise ValueError(f"不支持的文件版本：{version}")
+        meta_end = DiaryFileUtil.HEADER_SIZE + meta_len
+        if len(data) < meta_end:
+            raise ValueError("元数据块不完整")
+        return data[DiaryFileUtil.HEADER_SIZE:meta_end], data[meta_end:]
+
+    @staticmethod
+    def unpack(data, key):
+        """解密文件内容中的正文"""
+        _, body_token = DiaryFileUtil.split(data)
+        return EncryptionUtil.decrypt(body_token, key).decode()
+
+    @staticmethod
+    def read_diary(file_path, key):
+        """读取并解密日记正文"""
+        with open(file_path, "rb") as file:
+            return DiaryFileUtil.unpack(file.read(), key)
+
+    @staticmethod
+    def write_diary(file_path, content, key, created=None):
+        """加密写入日记，保留已有的创建时间"""
+        if created is None and os.path.exists(file_path):
+            meta = DiaryFileUtil.read_meta(file_path, key)
+            # 旧格式文件第一次保存时写入元数据，创建时间取原来的修改时间
+            created = meta.get("created") if meta else os.path.getmtime(file_path)
+        data = DiaryFileUtil.pack(content, DiaryFileUtil.build_meta(content, created), key)
+        DiaryFileUtil.atomic_write(file_path, data)
+
+    @staticmethod
+    def read_meta(file_path, key):
+        """只读取文件头部的元数据，不改写文件；旧格式文件没有元数据，返回 None"""
+        try:
+            with open(file_path, "rb") as file:
+                header = file.read(DiaryFileUtil.HEADER_SIZE)
+                if not header.startswith(DiaryFileUtil.MAGIC):
+                    return None
+                if len(header) < DiaryFileUtil.HEADER_SIZE:
+                    raise ValueError("文件头不完整")
+                version, meta_len = struct.unpack(">BI", header[4:])
+                if version != DiaryFileUtil.VERSION:
+                    raise ValueError(f"不支持的文件版本：{version}")
+                meta_token = file.read(meta_len)
+                if len(meta_token) < meta_len:
+                    raise ValueError("元数据块不完整")
+                return DiaryFileUtil.decrypt_meta(meta_token, key)
+        except Exception as e:
+            logger.warning(f"读取日记元数据失败：{file_path}, {str(e)}")
+            return None
+
+    @staticmethod
+    def format_meta(meta):
+        """元数据的提示文本"""
+        if not meta:
+            return ""
+        lines = [
+            f"创建：{time.strftime('%Y-%m-%d %H:%M', time.localtime(meta.get('created', 0)))}",
+            f"修改：{time.strftime('%Y-%m-%d %H:%M', time.localtime(meta.get('updated', 0)))}",
+            f"字数：{meta.get('words', 0)}",
+        ]
+        if meta.get("tags"):
+            lines.append("标签：" + " ".join(f"#{tag}" for tag in meta["tags"]))
+        if meta.get("first_line"):
+            lines.append(meta["first_line"])
+        return "\n".join(lines)
+
+    @staticmethod
+    def atomic_write(file_path, data):
+        """先写临时文件再替换，避免写入中断导致日记损坏"""
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, file_path)
@@ -1,14 +1,57 @@
+import base64
+import os
+import struct
+import time
+from functools import lru_cache
+
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
 
 class EncryptionUtil:
+    """
+    加解密工具
+
+    支持两种密文格式，解密时按文件头自动识别：
+        fernet：Fernet 令牌（AES-128-CBC + HMAC，Base64 编码），默认格式
+        aesgcm：MAGIC(4) | VERSION(1) | NONCE(12) | 密文 + 认证标签(16)，原始二进制，更快、更小，需要显式开启
+    日记文件外层还有元数据文件头（见 DiaryFileUtil），保存过的日记无论使用哪种算法，旧版本的客户端都无法读取，
+    文件格式的升级是单向的；选择算法只影响速度和文件大小，不影响兼容性。
+    """
+    ALGORITHM_FERNET = "fernet"
+    ALGORITHM_AESGCM = "aesgcm"
+    GCM_MAGIC = b"FSEG"
+    GCM_VERSION = 1
+    GCM_NONCE_SIZE = 12
+    GCM_TAG_SIZE = 16
+    GCM_HEADER_SIZE = 4 + 1 + GCM_NONCE_SIZE
+    # 新写入数据使用的算法
+    algorithm = ALGORITHM_FERNET
+
     @staticmethod
     def generate_key(file_path):
         key = Fernet.generate_key()
         with open(file_path, "wb") as file:
             file.write(key)
+
+    @staticmethod
+    def set_algorithm(algorithm):
+        """设置新写入数据使用的算法"""
+        if algorithm not in (EncryptionUtil.ALGORITHM_FERNET, EncryptionUtil.ALGORITHM_AESGCM):
+            raise ValueError(f"不支持的加密算法：{algorithm}")
+        EncryptionUtil.algorithm = algorithm
+
     # 加密
     @staticmethod
-    def encrypt(data, key):
+    def encrypt(data, key, algorithm=None):
+        algorithm = algorithm or EncryptionUtil.algorithm
+        if algorithm == EncryptionUtil.ALGORITHM_AESGCM:
+            nonce = os.urandom(EncryptionUtil.GCM_NONCE_SIZE)
+            header = EncryptionUtil.GCM_MAGIC + struct.pack(">B", EncryptionUtil.GCM_VERSION) + nonce
+            # 文件头作为附加认证数据，篡改版本号也会校验失败
+            return header + EncryptionUtil._aesgcm(key).encrypt(nonce, data, header)
         fernet = Fernet(key)
         return fernet.encrypt(data)
 
@@ -16,5 +59,59 @@ class EncryptionUtil:
     # 解密
     @staticmethod
     def decrypt(data, key):
+        if EncryptionUtil.is_aesgcm(data):
+            if len(data) < EncryptionUtil.GCM_HEADER_SIZE + EncryptionUtil.GCM_TAG_SIZE:
+                raise ValueError("密文长度不足")
+            version = data[4]
+            if version != EncryptionUtil.GCM_VERSION:
+                raise ValueError(f"不支持的密文版本：{version}")
+            header = bytes(data[:EncryptionUtil.GCM_HEADER_SIZE])
+            nonce = header[5:]
+            return EncryptionUtil._aesgcm(key).decrypt(nonce, bytes(data[EncryptionUtil.GCM_HEADER_SIZE:]), header)
         fernet = Fernet(key)
         return fernet.decrypt(data)
+
+    @staticmethod
+    def is_aesgcm(data):
+        """是否为 AES-GCM 二进制格式"""
+        return data[:4] == EncryptionUtil.GCM_MAGIC
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _aesgcm(key):
+        """由 Fernet 密钥派生 AES-256-GCM 密钥，同一密钥只派生一次"""
+        raw_key = base64.urlsafe_b64decode(key)
+        derived = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"fsdiary-aesgcm-v1").derive(raw_key)
+        return AESGCM(derived)
+
+    @staticmethod
+    def benchmark(sizes=None, rounds=3):
+        """对比 Fernet 和 AES-GCM 的吞吐量与密文大小"""
+        sizes = sizes or [1 << 10, 64 << 10, 1 << 20, 10 << 20, 50 << 20]
+        key = Fernet.generate_key()
+        print(f"{'大小':>10} {'算法':>8} {'加密MB/s':>10} {'解密MB/s':>10} {'密文/明文':>10}")
+        for size in sizes:
+            data = os.urandom(size)
+            for algorithm in (EncryptionUtil.ALGORITHM_FERNET, EncryptionUtil.ALGORITHM_AESGCM):
+                # 小数据多跑几轮，保证计时可靠
+                repeat = max(rounds, (1 << 20) // size)
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    token = EncryptionUtil.encrypt(data, key, algorithm)
+                encrypt_time = (time.perf_counter() - start) / repeat
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    EncryptionUtil.decrypt(token, key)
+                decrypt_time = (time.perf_counter() - start) / repeat
+                mb = size / (1 << 20)
+                print(f"{EncryptionUtil._format_size(size):>10} {algorithm:>8} {mb / encrypt_time:>10.1f} "
+                      f"{mb / decrypt_time:>10.1f} {len(token) / size:>10.3f}")
+
+    @staticmethod
+    def _format_size(size):
+        return f"{size >> 20} MB" if size >= 1 << 20 else f"{size >> 10} KB"
+
+
+if __name__ == "__main__":
+    # python -m src.util.encryption_util
+    EncryptionUtil.benchmark()
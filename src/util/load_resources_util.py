@@ -1,25 +1,15 @@
+from PySide6.QtCore import QUrl
 
 
 class LoadResourcesUtil:
-    # 静态资源定义
+    """
+    预览页面使用的资源
+
+    样式和代码高亮都内联在页面中，页面不加载任何本地文件或网络资源。
+    日记中可以直接写 HTML，页面以 about:blank 为 base URL，不给这些内容 file:// 来源的权限。
+    """
+
     @staticmethod
-    def static_resources():
-        static_resources = """
-        <html>
-        <head>
-            <link href="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/themes/prism-coy.min.css" rel="stylesheet">
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/prism.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/plugins/autoloader/prism-autoloader.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/prism-python.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/prism-java.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/prism-php.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/prism-bash.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/prism-javascript.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/prism-docker.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/prism-json.min.js" async></script>
-            <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/prism-css.min.js" async></script>
-        </head>
-        <body></body>
-        </html>
-        """
-        return static_resources
+    def base_url():
+        """预览页面的 base URL"""
+        return QUrl("about:blank")
@@ -5,7 +5,7 @@ from fs_base.base_menu_bar import BaseMenuBar
 from src.about_window import AboutWindow
 from src.log_window import LogWindow
 from src.option_tab import OptionTab
-
+from src.vault_scan_window import VaultScanWindow
 
 
 class MenuBar(BaseMenuBar):
@@ -14,6 +14,17 @@ class MenuBar(BaseMenuBar):
         self.log_window = LogWindow()
         self.option_tab = OptionTab()
         self.about_window = AboutWindow()
+        self.vault_scan_window = None
+
+    def _extend_menus(self):
+        """添加工具菜单"""
+        tool_menu = QMenu("工具", self.parent)
+
+        vault_scan_action = QAction("检查日记库", self.parent)
+        vault_scan_action.triggered.connect(self.show_vault_scan_window)
+        tool_menu.addAction(vault_scan_action)
+
+        self._menus['tool'] = tool_menu
 
     def show_log_window(self):
         """显示日志窗口"""
@@ -26,3 +37,8 @@ class MenuBar(BaseMenuBar):
     def show_about_window(self):
         self.about_window.show()
 
+    def show_vault_scan_window(self):
+        """显示日记库检查窗口"""
+        if not self.vault_scan_window:
+            self.vault_scan_window = VaultScanWindow()
+        self.vault_scan_window.show()
@@ -0,0 +1,107 @@
+import os
+import re
+import time
+
+from loguru import logger
+
+
+class ShardLayoutUtil:
+    """
+    年/月分目录存放日记
+
+    日记放在所属文件夹下的 YYYY/MM 子目录中，例如 Diary/2026/10/xxx.enc，
+    无论积累多少年，每个目录里的条目数都保持在一个月的量级。
+    """
+    YEAR_PATTERN = re.compile(r"^\d{4}$")
+    MONTH_PATTERN = re.compile(r"^(0[1-9]|1[0-2])$")
+
+    @staticmethod
+    def is_year_dir(path):
+        return bool(ShardLayoutUtil.YEAR_PATTERN.match(os.path.basename(path)))
+
+    @staticmethod
+    def is_month_dir(path):
+        return bool(ShardLayoutUtil.MONTH_PATTERN.match(os.path.basename(path))) \
+            and ShardLayoutUtil.is_year_dir(os.path.dirname(path))
+
+    @staticmethod
+    def base_dir(folder):
+        """去掉末尾的 YYYY/MM 部分，得到日记所属的文件夹"""
+        if ShardLayoutUtil.is_month_dir(folder):
+            return os.path.dirname(os.path.dirname(folder))
+        if ShardLayoutUtil.is_year_dir(folder):
+            return os.path.dirname(folder)
+        return folder
+
+    @staticmethod
+    def shard_path(folder, timestamp):
+        """日记应存放的 YYYY/MM 目录"""
+        date = time.localtime(timestamp)
+        return os.path.join(ShardLayoutUtil.base_dir(folder), f"{date.tm_year:04d}", f"{date.tm_mon:02d}")
+
+    @staticmethod
+    def plan_migration(storage, to_sharded=True):
+        """
+        计算需要移动的日记，返回 [(原路径, 新目录)]
+
+        按元数据中的创建时间分到 YYYY/MM，没有元数据时用修改时间
+        """
+        plan = []
+        for path in storage.list_files():
+            dir_path = os.path.dirname(path)
+            in_shard = ShardLayoutUtil.is_month_dir(dir_path)
+            if to_sharded and not in_shard:
+                meta = storage.read_meta(path)
+                created = meta.get("created") if meta else storage.stat(path)[0] / 1e9
+                date = time.localtime(created)
+                plan.append((path, os.path.join(dir_path, f"{date.tm_year:04d}", f"{date.tm_mon:02d}")))
+            elif not to_sharded and in_shard:
+                plan.append((path, ShardLayoutUtil.base_dir(dir_path)))
+        return plan
+
+    @staticmethod
+    def migrate(storage, to_sharded=True, progress=None):
+        """
+        批量移动日记到 YYYY/MM 目录（to_sharded=False 时移回所属文件夹）
+
+        :return: {原路径: 新路径}
+        """
+        plan = ShardLayoutUtil.plan_migration(storage, to_sharded)
+        moved = {}
+        with storage.batch():
+            for index, (path, target_dir) in enumerate(plan):
+                target = ShardLayoutUtil._unique_path(storage, target_dir, os.path.basename(path))
+                try:
+                    storage.rename(path, target)
+                    moved[path] = target
+                except OSError as e:
+                    logger.error(f"移动日记失败：{path} -> {target}, {str(e)}")
+                if progress:
+                    progress(index + 1, len(plan))
+            if not to_sharded:
+                ShardLayoutUtil._remove_empty_shards(storage, {os.path.dirname(path) for path in moved})
+        logger.info(f"已整理 {len(moved)} 篇日记")
+        return moved
+
+    @staticmethod
+    def _unique_path(storage, folder, file_name):
+        """目标已存在同名日记时追加序号"""
+        name, ext = os.path.splitext(file_name)
+        path = os.path.join(folder, file_name)
+        index = 2
+        while storage.exists(path):
+            path = os.path.join(folder, f"{name} ({index}){ext}")
+            index += 1
+        return path
+
+    @staticmethod
+    def _remove_empty_shards(storage, month_dirs):
+        """
+        删除移走日记后变空的 YYYY/MM 目录及其年份目录（先删月份再删年份）
+
+        只处理这次移出过日记的目录，用户自己建的同名空文件夹不动
+        """
+        year_dirs = {os.path.dirname(folder) for folder in month_dirs}
+        for folder in sorted(month_dirs, reverse=True) + sorted(year_dirs, reverse=True):
+            if storage.exists(folder) and not storage.list_entries(folder):
+                storage.delete(folder)
@@ -0,0 +1,207 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import InvalidToken
+from loguru import logger
+
+from src.const.fs_constants import FsConstants
+from src.util.common_util import CommonUtil
+from src.util.diary_file_util import DiaryFileUtil
+from src.util.encryption_util import EncryptionUtil
+
+
+class VaultScanUtil:
+    """
+    日记库完整性检查
+
+    并行校验每篇日记的认证标签，结果按 (mtime, size) 缓存，重新检查时只校验变化过的文件。
+    """
+    STATUS_OK = "ok"
+    STATUS_EMPTY = "empty"
+    STATUS_TRUNCATED = "truncated"
+    STATUS_CORRUPT = "corrupt"
+    STATUS_WRONG_KEY = "wrong_key"
+    STATUS_LABELS = {
+        STATUS_OK: "正常",
+        STATUS_EMPTY: "空文件",
+        STATUS_TRUNCATED: "文件不完整",
+        STATUS_CORRUPT: "文件已损坏",
+        STATUS_WRONG_KEY: "密钥不匹配",
+    }
+    # Fernet 令牌：版本(1) + 时间戳(8) + IV(16) + 密文(16 的倍数) + HMAC(32)
+    FERNET_MIN_SIZE = 1 + 8 + 16 + 16 + 32
+    # 认证失败（由旧格式单个令牌引起，无法区分损坏还是密钥不对，扫描结束后统一判断）
+    _AUTH_FAILED = "auth_failed"
+
+    @staticmethod
+    def key_fingerprint(key):
+        """密钥指纹，换了密钥后缓存失效"""
+        return hashlib.sha256(key).hexdigest()[:16]
+
+    @staticmethod
+    def check_entry(storage, path):
+        """校验单篇日记，返回 (状态, 说明)"""
+        try:
+            data = storage.read_raw(path)
+        except Exception as e:
+            return VaultScanUtil.STATUS_CORRUPT, f"无法读取：{str(e)}"
+        return VaultScanUtil.check_data(data, storage.key)
+
+    @staticmethod
+    def check_data(data, key):
+        """校验日记的加密内容，返回 (状态, 说明)"""
+        if not data:
+            return VaultScanUtil.STATUS_EMPTY, "文件大小为 0"
+        try:
+            meta_token, body_token = DiaryFileUtil.split(data)
+        except ValueError as e:
+            return VaultScanUtil.STATUS_TRUNCATED, str(e)
+
+        tokens = [token for token in (meta_token, body_token) if token is not None]
+        failed = 0
+        for token in tokens:
+            status, message = VaultScanUtil._check_structure(token)
+            if status:
+                return status, message
+            try:
+                EncryptionUtil.decrypt(token, key)
+            except (InvalidToken, InvalidTag):
+                failed += 1
+            except ValueError as e:
+                return VaultScanUtil.STATUS_CORRUPT, str(e)
+        if not failed:
+            return VaultScanUtil.STATUS_OK, ""
+        if failed < len(tokens):
+            # 同一个文件里有的块能解开，有的不能，说明密钥正确而内容被篡改
+            return VaultScanUtil.STATUS_CORRUPT, "认证标签校验失败"
+        if len(tokens) > 1:
+            return VaultScanUtil.STATUS_WRONG_KEY, "元数据和正文均无法用当前密钥解密"
+        return VaultScanUtil._AUTH_FAILED, "认证标签校验失败"
+
+    @staticmethod
+    def _check_structure(token):
+        """不解密，只检查密文结构是否完整"""
+        if EncryptionUtil.is_aesgcm(token):
+            if len(token) < EncryptionUtil.GCM_HEADER_SIZE + EncryptionUtil.GCM_TAG_SIZE:
+                return VaultScanUtil.STATUS_TRUNCATED, "AES-GCM 密文长度不足"
+            return None, ""
+        try:
+            raw = base64.urlsafe_b64decode(token)
+        except (binascii.Error, ValueError):
+            if len(token.rstrip(b"=")) % 4 == 1 or len(token) % 4:
+                return VaultScanUtil.STATUS_TRUNCATED, "Fernet 令牌长度不完整"
+            return VaultScanUtil.STATUS_CORRUPT, "Fernet 令牌不是有效的 Base64"
+        if not raw or raw[0] != 0x80:
+            return VaultScanUtil.STATUS_CORRUPT, "无法识别的密文格式"
+        if len(raw) < VaultScanUtil.FERNET_MIN_SIZE or (len(raw) - VaultScanUtil.FERNET_MIN_SIZE) % 16:
+            return VaultScanUtil.STATUS_TRUNCATED, "Fernet 令牌长度不完整"
+        return None, ""
+
+    @staticmethod
+    def scan(storage, progress=None, cancel_event=None, workers=None):
+        """
+        检查整个日记库
+
+        :param progress: 进度回调 progress(已完成数, 总数)
+        :param cancel_event: threading.Event，置位后尽快停止
+        :return: [(路径, 状态, 说明)]，取消时只包含已完成的部分
+        """
+        cancel_event = cancel_event or threading.Event()
+        fingerprint = VaultScanUtil.key_fingerprint(storage.key)
+        cache = VaultScanUtil._load_cache(f"{storage.BACKEND}:{fingerprint}")
+        files = storage.list_files()
+        total = len(files)
+        results = {}
+        pending = {}
+        for file_path in files:
+            try:
+                signature = list(storage.stat(file_path))
+            except OSError:
+                continue
+            cached = cache.get(file_path)
+            if cached and cached[:2] == signature:
+                results[file_path] = (cached[2], cached[3])
+            else:
+                pending[file_path] = signature
+
+        done = len(results)
+        if progress:
+            progress(done, total)
+        if pending:
+            logger.info(f"日记库检查：共 {total} 篇，{len(pending)} 篇需要重新校验")
+        with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 2)) as executor:
+            futures = {executor.submit(VaultScanUtil.check_entry, storage, path): path for path in pending}
+            for future in as_completed(futures):
+                if cancel_event.is_set():
+                    for remaining in futures:
+                        remaining.cancel()
+                    break
+                path = futures[future]
+                results[path] = future.result()
+                done += 1
+                if progress:
+                    progress(done, total)
+
+        VaultScanUtil._resolve_auth_failures(results)
+        # 只缓存本次得到结果且仍然存在的文件
+        new_cache = {}
+        for path, (status, message) in results.items():
+            signature = pending.get(path) or cache.get(path, [None, None])[:2]
+            new_cache[path] = signature + [status, message]
+        VaultScanUtil._save_cache(f"{storage.BACKEND}:{fingerprint}", new_cache)
+        return sorted((path, status, message) for path, (status, message) in results.items())
+
+    @staticmethod
+    def _resolve_auth_failures(results):
+        """旧格式文件认证失败时：库里没有任何文件能解开则判定为密钥不对，否则为文件损坏"""
+        any_ok = any(status == VaultScanUtil.STATUS_OK for status, _ in results.values())
+        for path, (status, message) in results.items():
+            if status == VaultScanUtil._AUTH_FAILED:
+                results[path] = (VaultScanUtil.STATUS_CORRUPT, message) if any_ok \
+                    else (VaultScanUtil.STATUS_WRONG_KEY, "无法用当前密钥解密")
+
+    @staticmethod
+    def _cache_file():
+        return os.path.join(CommonUtil.get_cache_path(), FsConstants.VAULT_SCAN_CACHE_FILE)
+
+    @staticmethod
+    def _load_cache(fingerprint):
+        try:
+            with open(VaultScanUtil._cache_file(), "r", encoding="utf-8") as file:
+                data = json.load(file)
+            return data.get("files", {}) if data.get("key") == fingerprint else {}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_cache(fingerprint, files):
+        try:
+            with open(VaultScanUtil._cache_file(), "w", encoding="utf-8") as file:
+                json.dump({"key": fingerprint, "files": files}, file, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"保存检查结果缓存失败：{str(e)}")
+
+
+if __name__ == "__main__":
+    # 命令行检查：python -m src.util.vault_scan_util [file|sqlite]
+    from src.storage.storage_factory import StorageFactory
+
+    with open(CommonUtil.get_diary_key_path(), "rb") as key_file:
+        scan_key = key_file.read()
+    scan_storage = StorageFactory.create(sys.argv[1], scan_key) if len(sys.argv) > 1 \
+        else StorageFactory.create_default(scan_key)
+    scan_results = VaultScanUtil.scan(
+        scan_storage, progress=lambda done, total: print(f"\r{done}/{total}", end="", file=sys.stderr))
+    print(file=sys.stderr)
+    problems = [result for result in scan_results if result[1] != VaultScanUtil.STATUS_OK]
+    for problem_path, problem_status, problem_message in problems:
+        print(f"{VaultScanUtil.STATUS_LABELS[problem_status]}\t{problem_path}\t{problem_message}")
+    print(f"共检查 {len(scan_results)} 篇日记，发现 {len(problems)} 个问题")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,136 @@
+import threading
+
+from PySide6.QtCore import QThread, Signal, Qt
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTableWidget, QTableWidgetItem, \
+    QHeaderView, QAbstractItemView
+from fs_base.message_util import MessageUtil
+from fs_base.widget import MenuWindow
+from fs_base.widget.custom_progress_widget import CustomProgressBar
+from loguru import logger
+
+from src.storage.storage_factory import StorageFactory
+from src.util.common_util import CommonUtil
+from src.util.vault_scan_util import VaultScanUtil
+
+
+class VaultScanThread(QThread):
+    """后台检查日记库"""
+    progress_signal = Signal(int, int)
+    finished_signal = Signal(list)
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        storage = None
+        try:
+            storage = StorageFactory.create_default(self.key)
+            results = VaultScanUtil.scan(storage, progress=self.progress_signal.emit,
+                                         cancel_event=self.cancel_event)
+        except Exception as e:
+            logger.error(f"日记库检查失败：{str(e)}")
+            results = []
+        finally:
+            if storage:
+                storage.close()
+        self.finished_signal.emit(results)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class VaultScanWindow(MenuWindow):
+    """日记库检查窗口"""
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("检查日记库")
+        self.setWindowIcon(QIcon(CommonUtil.get_ico_full_path()))
+        self.setMinimumSize(700, 400)
+        self.scan_thread = None
+
+        layout = QVBoxLayout(self)
+        self.status_label = QLabel("校验所有日记文件的完整性，只重新检查修改过的文件")
+        layout.addWidget(self.status_label)
+
+        self.progress_bar = CustomProgressBar()
+        layout.addWidget(self.progress_bar)
+
+        # 问题文件列表
+        self.result_table = QTableWidget(0, 3)
+        self.result_table.setHorizontalHeaderLabels(["问题", "文件", "说明"])
+        self.result_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.result_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.result_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.result_table)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.start_button = QPushButton("开始检查")
+        self.start_button.clicked.connect(self.start_scan)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_scan)
+        button_layout.addWidget(self.start_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def start_scan(self):
+        """开始检查"""
+        try:
+            with open(CommonUtil.get_diary_key_path(), "rb") as file:
+                key = file.read()
+        except OSError as e:
+            logger.error(f"读取密钥失败：{str(e)}")
+            MessageUtil.show_error_message("读取密钥失败，无法检查")
+            return
+
+        self.result_table.setRowCount(0)
+        self.progress_bar.reset_progress()
+        self.status_label.setText("正在检查...")
+        self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+        self.scan_thread = VaultScanThread(key)
+        self.scan_thread.progress_signal.connect(self.update_progress)
+        self.scan_thread.finished_signal.connect(self.show_results)
+        self.scan_thread.start()
+
+    def cancel_scan(self):
+        """取消检查，已完成的结果仍会显示"""
+        if self.scan_thread:
+            self.scan_thread.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("正在取消...")
+
+    def update_progress(self, done, total):
+        self.progress_bar.update_progress(int(done * 100 / total) if total else 100)
+        self.status_label.setText(f"正在检查 {done}/{total}")
+
+    def show_results(self, results):
+        """显示有问题的文件"""
+        problems = [result for result in results if result[1] != VaultScanUtil.STATUS_OK]
+        self.result_table.setRowCount(len(problems))
+        for row, (path, status, message) in enumerate(problems):
+            status_item = QTableWidgetItem(VaultScanUtil.STATUS_LABELS.get(status, status))
+            status_item.setForeground(Qt.GlobalColor.red)
+            self.result_table.setItem(row, 0, status_item)
+            self.result_table.setItem(row, 1, QTableWidgetItem(path))
+            self.result_table.setItem(row, 2, QTableWidgetItem(message))
+
+        cancelled = self.scan_thread.cancel_event.is_set()
+        summary = f"共检查 {len(results)} 篇日记，发现 {len(problems)} 个问题"
+        self.status_label.setText(f"已取消，{summary}" if cancelled else summary)
+        logger.info(summary)
+        self.start_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.scan_thread.wait()
+        self.scan_thread = None
+
+    def closeEvent(self, event):
+        self.cancel_scan()
+        super().closeEvent(event)
@@ -0,0 +1,349 @@
+import os
+
+from loguru import logger
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+
+class TreeNode:
+    """目录树节点，只保存显示和定位需要的数据"""
+    __slots__ = ("name", "path", "is_dir", "parent", "children", "fetched", "tooltip")
+
+    def __init__(self, name, path, is_dir, parent=None):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.parent = parent
+        # 子节点列表（已排序），None 表示文件夹还没有读取
+        self.children = None
+        # 已经提供给视图的子节点数量，滚动到末尾时再分批加入
+        self.fetched = 0
+        # 悬停提示，None 表示还没有读取元数据
+        self.tooltip = None
+
+    @property
+    def loaded(self):
+        return self.children is not None
+
+
+class DiaryTreeModel(QAbstractItemModel):
+    """
+    日记目录树模型
+
+    文件夹第一次展开时通过 loader(路径) 读取内容，子节点按 PAGE_SIZE 分批交给视图（canFetchMore / fetchMore），
+    上万篇日记的文件夹也只创建可见部分的行。图标由所有节点共用，排序在模型中完成。
+
+    模型维护 路径 -> 节点 的索引，新建、改名、移动和删除只修改单个节点并插入到排序位置，
+    不重新读取整个文件夹。
+    """
+    PATH_ROLE = Qt.ItemDataRole.UserRole
+    PAGE_SIZE = 500
+
+    def __init__(self, icons, loader, tooltip_provider=None, parent=None):
+        """
+        :param icons: {"root": QIcon, "folder": QIcon, "diary": QIcon}
+        :param loader: loader(文件夹路径) -> [(名称, 路径, 是否目录)]
+        :param tooltip_provider: tooltip_provider(日记路径) -> 悬停提示文字
+        """
+        super().__init__(parent)
+        self.icons = icons
+        self.loader = loader
+        self.tooltip_provider = tooltip_provider
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        # 不可见的根节点，唯一的子节点是日记根目录
+        self._invisible = TreeNode("", "", True)
+        self._invisible.children = []
+        # 路径 -> 已创建的节点
+        self._nodes = {}
+
+    # ---- 节点 ----
+    @property
+    def root_node(self):
+        return self._invisible.children[0] if self._invisible.children else None
+
+    def set_root(self, name, path):
+        self.beginResetModel()
+        root = TreeNode(name, path, True)
+        self._invisible.children = [root]
+        self._invisible.fetched = 1
+        self._nodes = {path: root}
+        self.endResetModel()
+        return root
+
+    def find(self, path):
+        """路径对应的节点，所在文件夹还没有读取时返回 None"""
+        return self._nodes.get(path)
+
+    def entries(self, node):
+        """子节点列表，格式与 DiaryStorage.list_entries 一致"""
+        return [(child.name, child.path, child.is_dir) for child in sorted(node.children or [], key=self.sort_key)]
+
+    def node(self, index):
+        """索引对应的节点，无效索引返回 None"""
+        return index.internalPointer() if index.isValid() else None
+
+    def index_of(self, node):
+        """节点的索引，节点还没有分批加入视图时先加入"""
+        if node is None or node.parent is None and node is not self.root_node:
+            return QModelIndex()
+        parent = node.parent or self._invisible
+        row = parent.children.index(node)
+        if row >= parent.fetched:
+            self._fetch(parent, row + 1 - parent.fetched)
+        return self.createIndex(row, 0, node)
+
+    def sort_key(self, node):
+        """文件夹在前；日记按所在目录、名称排序（平铺模式下按年月排列）"""
+        return (not node.is_dir, "" if node.is_dir else os.path.dirname(node.path), node.name)
+
+    def set_children(self, node, entries):
+        """用新的文件夹内容替换节点的子节点"""
+        parent_index = self.index_of(node)
+        if node.fetched:
+            self.beginRemoveRows(parent_index, 0, node.fetched - 1)
+            node.fetched = 0
+            self._unregister_children(node)
+            node.children = []
+            self.endRemoveRows()
+        self._unregister_children(node)
+        node.children = self._create_children(node, entries)
+        self._fetch(node, self.PAGE_SIZE)
+
+    def load_children(self, node):
+        """读取文件夹内容（已读取时不重复读取）"""
+        if node.is_dir and node.children is None:
+            try:
+                entries = self.loader(node.path)
+            except Exception as e:
+                logger.error(f"加载目录失败：{str(e)}")
+                entries = []
+            node.children = self._create_children(node, entries)
+        return node.children or []
+
+    def _create_children(self, node, entries):
+        children = self._sorted([TreeNode(name, path, is_dir, node) for name, path, is_dir in entries])
+        for child in children:
+            self._nodes[child.path] = child
+        return children
+
+    def _unregister_children(self, node):
+        for child in node.children or []:
+            self._unregister(child)
+
+    def _unregister(self, node):
+        if self._nodes.get(node.path) is node:
+            del self._nodes[node.path]
+        self._unregister_children(node)
+
+    # ---- 单个节点的修改 ----
+    def insert_node(self, parent, name, path, is_dir):
+        """在已读取的文件夹中按排序位置加入节点，文件夹还没有读取时返回 None（读取时自然包含）"""
+        if path in self._nodes:
+            return self._nodes[path]
+        if not parent.loaded:
+            return None
+        node = TreeNode(name, path, is_dir, parent)
+        self._insert_row(parent, node)
+        self._nodes[path] = node
+        return node
+
+    def remove_node(self, node):
+        parent = node.parent
+        if parent is None or node not in parent.children:
+            return
+        self._take_row(parent, parent.children.index(node))
+        self._unregister(node)
+
+    def move_node(self, node, parent, name, path):
+        """
+        改名或移动节点（文件夹的子节点路径随之更新），放到新文件夹中的排序位置
+
+        目标文件夹还没有读取时只从原位置移除，返回 None
+        """
+        old_parent = node.parent
+        if old_parent is None:
+            return None
+        if not parent.loaded:
+            self.remove_node(node)
+            return None
+        row = old_parent.children.index(node)
+        self._unregister(node)
+        self._set_path(node, name, path)
+        # 不在原位置时的目标行号
+        old_parent.children.pop(row)
+        new_row = self._sorted_row(parent.children, node)
+        old_parent.children.insert(row, node)
+        visible = row < old_parent.fetched
+        if visible and self._is_visible_row(parent, new_row, old_parent is parent):
+            # 两端都已显示时移动行，视图保留选中和展开状态
+            dest_row = new_row + 1 if old_parent is parent and new_row >= row else new_row
+            if old_parent is not parent or dest_row not in (row, row + 1):
+                self.beginMoveRows(self.index_of(old_parent), row, row, self.index_of(parent), dest_row)
+                old_parent.children.pop(row)
+                parent.children.insert(new_row, node)
+                node.parent = parent
+                if old_parent is not parent:
+                    old_parent.fetched -= 1
+                    parent.fetched += 1
+                self.endMoveRows()
+            index = self.index_of(node)
+            self.dataChanged.emit(index, index)
+        else:
+            self._take_row(old_parent, row)
+            node.parent = parent
+            self._insert_row(parent, node)
+        self._register(node)
+        return node
+
+    def _set_path(self, node, name, path):
+        old_path = node.path
+        node.name, node.path = name, path
+        node.tooltip = None
+        stack = list(node.children or [])
+        while stack:
+            child = stack.pop()
+            child.path = path + child.path[len(old_path):]
+            stack.extend(child.children or [])
+
+    def _register(self, node):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            self._nodes[node.path] = node
+            stack.extend(node.children or [])
+
+    def _sorted_row(self, children, node):
+        """二分查找节点在已排序子节点中的位置"""
+        descending = self.sort_order == Qt.SortOrder.DescendingOrder
+        key = self._order_key(node)
+        low, high = 0, len(children)
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = self._order_key(children[middle])
+            if middle_key > key if descending else middle_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    @staticmethod
+    def _is_visible_row(parent, row, excluding_one=False):
+        """插入到该行时是否在已显示的范围内（已全部显示时追加到末尾也算）"""
+        fetched = parent.fetched - 1 if excluding_one else parent.fetched
+        count = len(parent.children) - 1 if excluding_one else len(parent.children)
+        return row < fetched or fetched == count
+
+    def _insert_row(self, parent, node):
+        row = self._sorted_row(parent.children, node)
+        if self._is_visible_row(parent, row):
+            self.beginInsertRows(self.index_of(parent), row, row)
+            parent.children.insert(row, node)
+            parent.fetched += 1
+            self.endInsertRows()
+        else:
+            parent.children.insert(row, node)
+
+    def _take_row(self, parent, row):
+        if row < parent.fetched:
+            self.beginRemoveRows(self.index_of(parent), row, row)
+            parent.children.pop(row)
+            parent.fetched -= 1
+            self.endRemoveRows()
+        else:
+            parent.children.pop(row)
+
+    def clear_tooltip(self, node):
+        node.tooltip = None
+
+    # ---- 分批加载 ----
+    def _fetch(self, node, count):
+        children = self.load_children(node) if node is not self._invisible else node.children
+        count = min(count, len(children) - node.fetched)
+        if count <= 0:
+            return
+        parent_index = QModelIndex() if node is self._invisible else self.createIndex(
+            (node.parent or self._invisible).children.index(node), 0, node)
+        self.beginInsertRows(parent_index, node.fetched, node.fetched + count - 1)
+        node.fetched += count
+        self.endInsertRows()
+
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return bool(node) and node.is_dir and (node.children is None or node.fetched < len(node.children))
+
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        if node:
+            self._fetch(node, self.PAGE_SIZE)
+
+    # ---- 排序 ----
+    def _order_key(self, node):
+        # 文件夹始终在前，倒序时只反转各组内部的顺序
+        descending = self.sort_order == Qt.SortOrder.DescendingOrder
+        return (node.is_dir if descending else not node.is_dir, self.sort_key(node)[1:])
+
+    def _sorted(self, nodes):
+        return sorted(nodes, key=self._order_key, reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """对已读取的所有文件夹重新排序，已显示的行数不变"""
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        nodes = [self.node(index) for index in old_indexes]
+        stack = [self.root_node] if self.root_node else []
+        while stack:
+            node = stack.pop()
+            if node.children:
+                node.children = self._sorted(node.children)
+                stack.extend(child for child in node.children if child.is_dir)
+        new_indexes = []
+        for node in nodes:
+            parent = node.parent or self._invisible
+            row = parent.children.index(node)
+            # 排序后落在尚未加入视图部分的节点，索引失效
+            new_indexes.append(self.createIndex(row, 0, node) if row < parent.fetched else QModelIndex())
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    # ---- QAbstractItemModel ----
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node(parent) or self._invisible
+        if column != 0 or row < 0 or row >= node.fetched:
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index):
+        node = self.node(index)
+        if node is None or node.parent is None:
+            return QModelIndex()
+        parent = node.parent
+        return self.createIndex((parent.parent or self._invisible).children.index(parent), 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        node = self.node(parent) or self._invisible
+        return node.fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node(parent) or self._invisible
+        # 没读取过的文件夹也显示展开箭头
+        return node.is_dir and (node.children is None or bool(node.children))
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        node = self.node(index)
+        if node is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.icons["root" if node.parent is None else "folder" if node.is_dir else "diary"]
+        if role == self.PATH_ROLE:
+            return node.path
+        if role == Qt.ItemDataRole.ToolTipRole and not node.is_dir and self.tooltip_provider:
+            # 悬停时才读取元数据
+            if node.tooltip is None:
+                node.tooltip = self.tooltip_provider(node.path) or ""
+            return node.tooltip or None
+        return None
@@ -1,36 +1,151 @@
+import json
 import os
+import threading
+import time
+from bisect import bisect_right
 
 from PySide6 import QtCore
-from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEngineSettings
-
-from PySide6.QtWidgets import QPlainTextEdit, QVBoxLayout, QWidget, QSizePolicy, QColorDialog
-from PySide6.QtGui import QIcon, QAction
-from PySide6.QtCore import Signal, QUrl
-from PySide6.QtWidgets import QInputDialog
+from PySide6.QtWidgets import QPlainTextEdit, QVBoxLayout, QWidget, QSizePolicy, QColorDialog, QSplitter
+from PySide6.QtGui import QIcon, QAction, QTextCursor
+from PySide6.QtCore import Signal, QUrl, QThread, QTimer, Qt
+from PySide6.QtWidgets import QInputDialog, QApplication
 
 from src.const.fs_constants import FsConstants
 from src.util.common_util import CommonUtil
-from markdown_it import MarkdownIt
 from datetime import datetime  # 用于插入时间
 from loguru import  logger
 from PySide6.QtWidgets import QToolBar
 
 from src.util.load_resources_util import LoadResourcesUtil
+from src.widget.markdown_highlighter import MarkdownHighlighter
+from src.widget.markdown_renderer import MarkdownRenderer
 
 
 # 设置环境变量 Remote debugging server
 #os.environ["QTWEBENGINE_REMOTE_DEBUGGING"] = "9222"
 
+class PreviewRenderThread(QThread):
+    """在后台渲染 Markdown：分屏预览、长文档预览时第一屏之后的部分，以及导出；给出渲染缓存时先查缓存"""
+    finished_signal = Signal(int, object)
+
+    def __init__(self, renderer, revision, content, render_cache=None):
+        super().__init__()
+        self.renderer = renderer
+        self.revision = revision
+        self.content = content
+        self.render_cache = render_cache
+
+    def run(self):
+        try:
+            blocks = self.render_cache.get(self.content) if self.render_cache is not None else None
+            if blocks is None:
+                blocks = self.renderer.render_blocks(self.content)
+                if self.render_cache is not None:
+                    self.render_cache.put(self.content, blocks)
+        except Exception as e:
+            logger.error(f"渲染预览失败：{str(e)}")
+            blocks = None
+        self.finished_signal.emit(self.revision, blocks)
+
+
+class PrerenderThread(QThread):
+    """打开日记后以最低优先级预先渲染，切换到预览时直接显示；内容变化后取消"""
+    finished_signal = Signal(int, object)
+
+    def __init__(self, renderer, revision, content, render_cache=None):
+        super().__init__()
+        self.renderer = renderer
+        self.revision = revision
+        self.content = content
+        self.render_cache = render_cache
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            blocks = self.render_cache.get(self.content) if self.render_cache is not None else None
+            if blocks is None:
+                blocks = self.renderer.render_blocks(self.content, self.cancel_event)
+                # 取消时 blocks 为 None，不缓存不完整的结果
+                if blocks is not None and self.render_cache is not None:
+                    self.render_cache.put(self.content, blocks)
+        except Exception as e:
+            logger.error(f"预渲染失败：{str(e)}")
+            blocks = None
+        self.finished_signal.emit(self.revision, blocks)
+
+
 class MarkdownEditor(QWidget):
     # 定义一个自定义信号
     textChangedSignal = Signal()
+    # 预览中点击了 [[链接]]（参数为链接目标）或 #标签
+    wikiLinkClicked = Signal(str)
+    tagClicked = Signal(str)
+    EDITOR_PLACEHOLDER = "在这里编写您的 Markdown 日记..."
+    # 分屏预览在停止输入多久后渲染（毫秒）
+    LIVE_PREVIEW_DELAY = 150
+    # 预览框隐藏多久后删除，释放 Chromium 渲染进程的内存（毫秒）
+    PREVIEW_RELEASE_DELAY = 2 * 60 * 1000
+    # 预览专用 profile 的内存 HTTP 缓存上限
+    PREVIEW_HTTP_CACHE_BYTES = 8 * 1024 * 1024
+    # 预览专用的 off-the-record profile，所有预览框共用，随程序退出释放
+    _preview_profile = None
+    # 长文档先同步渲染开头这么多字符（第一屏），其余部分在后台渲染
+    PREVIEW_FIRST_CHARS = 8 * 1024
+    # 每次事件循环最多向页面发送的 HTML 字节数，其余的块分批送入
+    PREVIEW_CHUNK_BYTES = 256 * 1024
+    # 估算块高度时每行源文本的像素数
+    BLOCK_LINE_HEIGHT = 26
+    # 超过这么多行的日记载入时不高亮，之后从可见部分开始分批高亮，全文高亮的耗时与行数成正比
+    HIGHLIGHT_SYNC_LINES = 2000
 
     def __init__(self):
         super().__init__()
         self._is_preview = False
-        # 使用 markdown-it-py 进行 Markdown 渲染
-        self.md_parser = MarkdownIt("commonmark").enable("table")
+        self._is_split = False
+        # 按顶层块渲染 Markdown，预览页面加载后只替换有变化的块；只在界面线程中使用
+        self.renderer = MarkdownRenderer()
+        # 后台线程（分屏渲染、完整预览、预渲染）共用的渲染器，界面线程不会等待它的锁，第一次用到时创建
+        self._worker_renderer = None
+        # 渲染结果的磁盘缓存（RenderCache），由主窗口设置，预览和导出 PDF 共用
+        self.render_cache = None
+        # 编辑器内容的版本，内容变化时加一
+        self.content_revision = 0
+        # 打开日记后的预渲染：取消后仍在运行的线程保留引用，结束后再释放
+        self.prerender_threads = []
+        # (内容版本, 渲染结果)
+        self._prerendered = None
+        # 导出时在后台渲染（查询渲染缓存）的线程，结束后释放
+        self.export_threads = []
+        # 预览页面中各块的键，None 表示页面还没有生成
+        self._preview_keys = None
+        self._preview_loading = False
+        # 要显示的渲染结果 [(键, HTML, 起始行)]，页面中的块分批向它靠拢
+        self._preview_target = []
+        # 源文本的行数，用来估算还没有送入页面部分的高度
+        self._preview_line_count = 0
+        # 各块在源文本中的起始行，用于同步滚动位置
+        self._preview_lines = []
+        self._synced_block = None
+        self.stream_timer = QTimer(self)
+        self.stream_timer.setSingleShot(True)
+        self.stream_timer.setInterval(0)
+        self.stream_timer.timeout.connect(self._stream_step)
+
+        # 分屏预览：输入停顿后在后台渲染，渲染期间的修改合并到下一次
+        self.live_revision = 0
+        self.render_thread = None
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(self.LIVE_PREVIEW_DELAY)
+        self.live_timer.timeout.connect(self._start_live_render)
+        # 预览框隐藏一段时间后释放
+        self.release_timer = QTimer(self)
+        self.release_timer.setSingleShot(True)
+        self.release_timer.setInterval(self.PREVIEW_RELEASE_DELAY)
+        self.release_timer.timeout.connect(self.release_preview)
 
         # 创建一个垂直布局
         main_layout = QVBoxLayout(self)
@@ -40,25 +155,22 @@ class MarkdownEditor(QWidget):
 
         # 编辑框
         self.diary_editor = QPlainTextEdit(self)
-        self.diary_editor.setPlaceholderText("在这里编写您的 Markdown 日记...")
+        self.diary_editor.setPlaceholderText(self.EDITOR_PLACEHOLDER)
         self.diary_editor.textChanged.connect(self.emit_text_changed)
-        main_layout.addWidget(self.diary_editor)
-
-        # 预览框
-        self.preview = QWebEngineView(self)
-        self.preview.setUrl(QUrl("about:blank"))  # 设置初始空白页面
-        self.preview.setVisible(False)
-        main_layout.addWidget(self.preview)
+        self.diary_editor.textChanged.connect(self.schedule_live_preview)
+        self.diary_editor.textChanged.connect(self._on_content_changed)
+        self.diary_editor.cursorPositionChanged.connect(self.sync_preview_scroll)
+        # Markdown 语法高亮，只重新处理被修改的段落
+        self.highlighter = MarkdownHighlighter(self.diary_editor.document())
 
-        #QWebEngineView 使用了 HTTP 缓存
-        profile = QWebEngineProfile.defaultProfile()
-        profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)  # 使用磁盘缓存
-        profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies)  # 持久化 cookies
+        # 编辑框和预览框左右排列，分屏时同时显示
+        self.splitter = QSplitter(Qt.Orientation.Horizontal, self)
+        self.splitter.setChildrenCollapsible(False)
+        self.splitter.addWidget(self.diary_editor)
+        main_layout.addWidget(self.splitter)
 
-        # 隐藏的 QWebEngineView，用于加载资源
-        self.resource_loader = QWebEngineView()
-        self.resource_loader.hide()
-        self.load_resources()
+        # 预览框：第一次预览时才创建，启动时不加载 QtWebEngine（Chromium 进程）
+        self.preview = None
 
         # 设置主布局
         self.setLayout(main_layout)
@@ -68,9 +180,83 @@ class MarkdownEditor(QWidget):
         self.dev_tools = None
         #self.enable_dev_tools()
 
+    def ensure_preview(self):
+        """创建预览框，第一次预览或导出时调用"""
+        if self.preview:
+            return self.preview
+        start = time.perf_counter()
+        # QtWebEngine 的导入和初始化都推迟到这里
+        from PySide6.QtWebEngineWidgets import QWebEngineView
+        from src.widget.preview_page import PreviewPage
+
+        self.preview = QWebEngineView(self)
+        preview_page = PreviewPage(self.preview_profile(), self.preview)
+        preview_page.wikiLinkClicked.connect(self.wikiLinkClicked)
+        preview_page.tagClicked.connect(self.tagClicked)
+        self.preview.setPage(preview_page)
+        self.preview.setUrl(QUrl("about:blank"))  # 设置初始空白页面
+        self.preview.loadFinished.connect(self._on_preview_loaded)
+        self.preview.setVisible(False)
+        self.splitter.addWidget(self.preview)
+        logger.info(f"预览框创建耗时 {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self.preview
+
+    @classmethod
+    def preview_profile(cls):
+        """
+        预览专用的 profile：没有存储名称，是 off-the-record 的，缓存和 cookie 只在内存中，不写磁盘
+
+        解密后的日记页面不与默认 profile 共用缓存。profile 以 QApplication 为父对象，在所有页面之后释放。
+        """
+        if cls._preview_profile is None:
+            from PySide6.QtWebEngineCore import QWebEngineProfile
+            profile = QWebEngineProfile(QApplication.instance())
+            profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.MemoryHttpCache)
+            profile.setHttpCacheMaximumSize(cls.PREVIEW_HTTP_CACHE_BYTES)
+            profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.NoPersistentCookies)
+            profile.setSpellCheckEnabled(False)
+            cls._preview_profile = profile
+        return cls._preview_profile
+
+    def release_preview(self):
+        """
+        删除预览框，Chromium 渲染进程随之退出并释放内存，再次预览时重新创建
+
+        渲染器缓存的 HTML 和预渲染的结果同样是解密后的内容，一并丢弃
+        """
+        self.release_timer.stop()
+        self._prerendered = None
+        for thread in self.prerender_threads:
+            thread.cancel()
+        self.renderer.clear()
+        if self._worker_renderer is not None:
+            self._worker_renderer.clear()
+        # 开发者工具绑定在预览页面上，打开时不释放
+        if self.preview is None or self.dev_tools:
+            return
+        self.stream_timer.stop()
+        self.preview.deleteLater()
+        self.preview = None
+        self._preview_keys = None
+        self._preview_loading = False
+        self._preview_target = []
+        self._preview_lines = []
+        self._synced_block = None
+        logger.info("已释放预览框")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 隐藏到托盘时预览框已被释放，恢复显示时重新创建
+        if self.preview is None and self._is_preview:
+            self.switch_to_preview()
+        elif self.preview is None and self._is_split:
+            self.switch_to_split()
+
     def enable_dev_tools(self):
         # 确保开发者工具只创建一次
         if not self.dev_tools:
+            from PySide6.QtWebEngineWidgets import QWebEngineView
+            self.ensure_preview()
             self.dev_tools = QWebEngineView()  # 创建开发者工具窗口
             self.dev_tools.setWindowTitle("Developer Tools")
             self.dev_tools.resize(800, 600)
@@ -83,11 +269,6 @@ class MarkdownEditor(QWidget):
             self.dev_tools.raise_()
             self.dev_tools.activateWindow()
 
-    def load_resources(self):
-        """提前加载预览所需的外部资源"""
-        static_resources = LoadResourcesUtil.static_resources()
-        self.resource_loader.setHtml(static_resources, QUrl("https://cdn.jsdelivr.net/"))
-
     def add_toolbar(self):
         """添加工具栏"""
         toolbar = QToolBar("工具栏", self)
@@ -205,6 +386,12 @@ class MarkdownEditor(QWidget):
         toolbar.addAction(preview_action)
         self.toolbar_actions['preview'] = preview_action
 
+        # 添加分屏预览按钮
+        split_action = QAction(QIcon(CommonUtil.get_resource_path(FsConstants.SPLIT_BTN_PATH)), "分屏预览", self)
+        split_action.triggered.connect(self.switch_to_split)
+        toolbar.addAction(split_action)
+        self.toolbar_actions['split'] = split_action
+
         # 添加切换到编辑模式按钮
         edit_action = QAction(QIcon(CommonUtil.get_resource_path(FsConstants.EDIT_BTN_PATH)), "编辑模式", self)
         edit_action.triggered.connect(self.switch_to_edit)
@@ -365,72 +552,318 @@ class MarkdownEditor(QWidget):
 
 
 
+    def is_split_mode(self):
+        """检查是否处于分屏预览"""
+        return self._is_split
+
     def switch_to_preview(self):
         """切换到预览模式"""
+        self.release_timer.stop()
+        self.ensure_preview()
         self.diary_editor.setVisible(False)
         self.preview.setVisible(True)
         self._is_preview = True
+        self._is_split = False
         self.update_preview()
-        # 禁用所有工具栏按钮，除了“编辑模式”按钮
+        # 禁用所有工具栏按钮，除了“编辑模式”和“分屏预览”按钮
         for action_name, action in self.toolbar_actions.items():
-            if action_name != 'edit':
+            if action_name not in ('edit', 'split'):
                 action.setDisabled(True)
 
     def switch_to_edit(self):
         """切换到编辑模式"""
-        self.preview.setVisible(False)
+        if self.preview:
+            self.preview.setVisible(False)
         self.diary_editor.setVisible(True)
         self._is_preview = False
+        self._is_split = False
+        self.live_timer.stop()
+        if self.preview:
+            self.release_timer.start()
         # 启用所有工具栏按钮
         for action in self.toolbar_actions.values():
             action.setDisabled(False)
 
+    def switch_to_split(self):
+        """切换到分屏预览：左边编辑，右边随输入更新预览"""
+        self.switch_to_edit()
+        self.release_timer.stop()
+        self.ensure_preview().setVisible(True)
+        self._is_split = True
+        self.splitter.setSizes([1, 1])
+        self._synced_block = None
+        self.schedule_live_preview()
+
+    def schedule_live_preview(self):
+        """分屏时内容有变化，停止输入后再渲染"""
+        if not self._is_split:
+            return
+        self.live_revision += 1
+        self.live_timer.start()
+
+    def _start_live_render(self):
+        # 正在渲染时等它完成，再渲染最新的内容
+        if self.render_thread or not (self._is_split or self._is_preview):
+            return
+        # 只缓存预览模式下的完整渲染，分屏时边输入边渲染的中间结果不写入磁盘
+        self.render_thread = PreviewRenderThread(self.worker_renderer(), self.live_revision,
+                                                 self.diary_editor.toPlainText(),
+                                                 self.render_cache if self._is_preview else None)
+        self.render_thread.finished_signal.connect(self._on_live_rendered)
+        self.render_thread.start()
+
+    def _on_live_rendered(self, revision, blocks):
+        if self.sender() is not self.render_thread:
+            return
+        self.render_thread.wait()
+        self.render_thread = None
+        if not (self._is_split or self._is_preview):
+            return
+        if blocks is not None:
+            self._show_blocks(blocks)
+            self.sync_preview_scroll()
+        # 渲染期间又有修改，中间的版本不再渲染
+        if revision != self.live_revision and not self.live_timer.isActive():
+            self._start_live_render()
+
+    def wait_live_render(self):
+        if self.render_thread:
+            self.render_thread.wait()
+        for thread in self.prerender_threads:
+            thread.cancel()
+            thread.wait()
+        for thread in self.export_threads:
+            thread.wait()
+
+    def sync_preview_scroll(self):
+        """分屏时把预览滚动到光标所在的块"""
+        if not self._is_split or not self._preview_lines or self._preview_loading:
+            return
+        line = self.diary_editor.textCursor().blockNumber()
+        index = max(bisect_right(self._preview_lines, line) - 1, 0)
+        if index != self._synced_block:
+            self._synced_block = index
+            self.preview.page().runJavaScript(f"fsScrollToBlock({index});")
+
     def update_preview(self):
-        """实时更新 Markdown 预览"""
+        """
+        更新 Markdown 预览，页面已加载时只替换有变化的块，保留滚动位置
+
+        长文档先渲染开头的第一屏并立即显示，其余部分用按估算高度占位，完整结果在后台查询渲染缓存或渲染后分批送入页面
+        """
+        self.live_revision += 1
+        if self._prerendered and self._prerendered[0] == self.content_revision:
+            self._show_blocks(self._prerendered[1])
+            return
         content = self.diary_editor.toPlainText()
+        head = MarkdownRenderer.head(content, self.PREVIEW_FIRST_CHARS)
+        if len(head) == len(content):
+            # 不超过一屏的日记直接渲染，不在界面线程中读写渲染缓存
+            self._show_blocks(self.renderer.render_blocks(content))
+            return
+        blocks = self.renderer.render_blocks(head)
+        if self._preview_target and len(blocks) > 1:
+            # 页面中已经是这篇日记时只替换第一屏，之后的块按行数变化平移后保留，由完整结果修正
+            blocks.pop()
+            cut = blocks[-1][2] + 1
+            shift = self.diary_editor.blockCount() - self._preview_line_count
+            blocks += [(key, html, line + shift) for key, html, line in self._preview_target if line + shift >= cut]
+        self._show_blocks(blocks)
+        if any(thread.revision == self.content_revision and not thread.cancel_event.is_set()
+               for thread in self.prerender_threads):
+            # 预渲染还没完成，完成后直接显示，不再重复渲染
+            return
+        self._start_live_render()
 
-        # 启用表格解析功能
-        html_content = self.md_parser.render(content)
+    def prerender(self):
+        """打开日记后在后台以最低优先级渲染，切换到预览时不用再等待"""
+        content = self.diary_editor.toPlainText()
+        if self._is_split or not content:
+            return
+        thread = PrerenderThread(self.worker_renderer(), self.content_revision, content, self.render_cache)
+        thread.finished_signal.connect(self._on_prerendered)
+        thread.finished.connect(self._on_prerender_thread_finished)
+        self.prerender_threads.append(thread)
+        thread.start(QThread.Priority.LowestPriority)
+
+    def _on_prerendered(self, revision, blocks):
+        if revision != self.content_revision:
+            return
+        if blocks is None:
+            # 预渲染失败时预览停在第一屏，改为完整渲染
+            if self._is_preview and self.preview is not None:
+                self._start_live_render()
+            return
+        self._prerendered = (revision, blocks)
+        if self._is_preview:
+            # 预览时显示的是第一屏，补上其余部分
+            self._show_blocks(blocks)
+
+    def _on_prerender_thread_finished(self):
+        thread = self.sender()
+        if thread in self.prerender_threads:
+            self.prerender_threads.remove(thread)
+
+    def _on_content_changed(self):
+        """内容有变化（编辑或换了日记），之前的预渲染作废"""
+        self.content_revision += 1
+        self._prerendered = None
+        for thread in self.prerender_threads:
+            thread.cancel()
+
+    def worker_renderer(self):
+        if self._worker_renderer is None:
+            self._worker_renderer = MarkdownRenderer()
+        return self._worker_renderer
+
+    def _show_blocks(self, blocks):
+        """把渲染结果显示到预览页面"""
+        self.ensure_preview()
+        self._preview_target = blocks
+        self._preview_lines = [line for _, _, line in blocks]
+        self._preview_line_count = self.diary_editor.blockCount()
+        if self._preview_loading:
+            # 加载完成后继续送入
+            return
+        if self._preview_keys is None:
+            self._load_preview_page()
+        else:
+            self._stream_step()
+
+    def _block_heights(self, blocks, start, stop):
+        """按源文本行数估算 [start, stop) 各块的高度"""
+        heights = []
+        for index in range(start, stop):
+            if index + 1 < len(blocks):
+                lines = blocks[index + 1][2] - blocks[index][2]
+            else:
+                lines = blocks[index][1].count("\n")
+            heights.append(max(lines, 1) * self.BLOCK_LINE_HEIGHT)
+        return heights
+
+    def _rest_height(self, index):
+        """从第 index 个块到文档末尾的估算高度"""
+        first_line = self._preview_target[index][2] if index < len(self._preview_target) else self._preview_line_count
+        return max(self._preview_line_count - first_line, 0) * self.BLOCK_LINE_HEIGHT
+
+    def _next_chunk(self, start, stop, limit):
+        """从 start 开始不超过 limit 字节的块（至少一块），返回结束位置"""
+        end = start
+        size = 0
+        while end < stop and (end == start or limit is None or size < limit):
+            size += len(self._preview_target[end][1])
+            end += 1
+        return end
+
+    def _stream_step(self, limit=PREVIEW_CHUNK_BYTES):
+        """把页面中与目标不同的块替换一批，还有剩余时在下一次事件循环中继续"""
+        self.stream_timer.stop()
+        if self._preview_keys is None or self._preview_loading:
+            return
+        target = self._preview_target
+        keys = [key for key, _, _ in target]
+        change = MarkdownRenderer.diff_blocks(self._preview_keys, keys)
+        if change is None:
+            return
+        start, remove_count, new_blocks = change
+        end = self._next_chunk(start, new_blocks.stop, limit)
+        blocks = json.dumps([[target[index][1], height]
+                             for index, height in zip(range(start, end), self._block_heights(target, start, end))])
+        self.preview.page().runJavaScript(
+            f"fsPatchBlocks({start}, {remove_count}, {blocks}, {self._rest_height(end)});")
+        self._preview_keys = keys[:end] + self._preview_keys[start + remove_count:]
+        self._synced_block = None
+        if end < new_blocks.stop:
+            self.stream_timer.start()
+
+    def _page_html(self, blocks, rest_height):
+        """预览页面的 HTML，块之后是按估算高度占位的空白"""
+        heights = self._block_heights(blocks, 0, len(blocks))
+        html_content = "".join(f'<div class="md-block" style="contain-intrinsic-size: auto {height}px">{html}</div>'
+                               for (_, html, _), height in zip(blocks, heights))
         # 添加样式
-        styled_html = f"""
+        return f"""
             <html>
             <head>
                 <meta charset="UTF-8">
-                <link href="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/themes/prism-coy.min.css" rel="stylesheet">
-                <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/prism.min.js" defer></script>
-                <script src="https://cdn.jsdelivr.net/npm/prismjs@1.29.0/plugins/autoloader/prism-autoloader.min.js" defer></script>
-                <script>
-                    document.addEventListener('DOMContentLoaded', function () {{
-                        Prism.plugins.autoloader.languages_path = 'https://cdn.jsdelivr.net/npm/prismjs@1.29.0/components/';
-                    }});                
-                </script>
                 <style>
                     body {{ 
                         font-family: "Consolas","Courier New",sans-serif;
                         font-size: 16px; 
                         padding: 6px;
                         line-height: 1.6; padding: 10px; }}
-                    pre {{ padding: 10px; overflow: auto; }}
+                    pre {{ padding: 10px; overflow: auto; background: #f8f8f8; }}
                     code {{ color: inherit; }}
+                    /* 不在可见区域附近的块不排版，按估算高度占位 */
+                    .md-block {{ content-visibility: auto; display: flow-root; }}
+                    {MarkdownRenderer.highlight_css()}
                 </style>
             </head>
             <body>
-                {html_content}
+                <div id="fs-content">{html_content}</div>
+                <div id="fs-rest" style="height: {rest_height}px"></div>
             </body>
             <script>
-                  document.addEventListener("DOMContentLoaded", function () {{
-                        if (typeof Prism === 'undefined') {{
-                            console.error('Prism.js 未正确加载！');
-                        }} else {{
-                            console.log('Prism.js 加载成功');
-                            Prism.highlightAll();
-
+                  // 从 start 开始删除 removeCount 个块，再插入新的块 [HTML, 估算高度]，restHeight 是之后还没送入部分的高度
+                  function fsPatchBlocks(start, removeCount, blocks, restHeight) {{
+                        var root = document.getElementById('fs-content');
+                        for (var i = 0; i < removeCount && root.children[start]; i++) {{
+                            root.removeChild(root.children[start]);
+                        }}
+                        var anchor = root.children[start] || null;
+                        var fragment = document.createDocumentFragment();
+                        blocks.forEach(function (item) {{
+                            var block = document.createElement('div');
+                            block.className = 'md-block';
+                            block.style.containIntrinsicSize = 'auto ' + item[1] + 'px';
+                            block.innerHTML = item[0];
+                            fragment.appendChild(block);
+                        }});
+                        root.insertBefore(fragment, anchor);
+                        document.getElementById('fs-rest').style.height = restHeight + 'px';
+                  }}
+
+                  // 分屏时把第 index 个块滚动到可见位置
+                  function fsScrollToBlock(index) {{
+                        var block = document.getElementById('fs-content').children[index];
+                        if (block) {{
+                            block.scrollIntoView({{block: 'nearest'}});
                         }}
-                    }});
+                  }}
             </script>
             </html>
         """
-        self.preview.setHtml(styled_html)
+
+    def _load_preview_page(self):
+        """第一次预览时生成页面，只包含第一屏的块，其余的之后通过 fsPatchBlocks 分批送入"""
+        end = self._next_chunk(0, len(self._preview_target), self.PREVIEW_CHUNK_BYTES) if self._preview_target else 0
+        blocks = self._preview_target[:end]
+        self._preview_loading = True
+        self._preview_keys = [key for key, _, _ in blocks]
+        self._synced_block = None
+        # 以本地 resources 目录为 base URL，页面不经过网络
+        self.preview.setHtml(self._page_html(blocks, self._rest_height(end)), LoadResourcesUtil.base_url())
+
+    def _on_preview_loaded(self, ok):
+        if not self._preview_loading:
+            return
+        self._preview_loading = False
+        if not ok:
+            self._preview_keys = None
+            return
+        # 加载期间的更新和剩余的块
+        self._stream_step()
+        if self.is_split_mode():
+            self.sync_preview_scroll()
+
+    def clear_preview(self):
+        """清空预览内容，保留已加载的页面"""
+        if self.preview is None:
+            return
+        self._preview_target = []
+        self._preview_lines = []
+        self._preview_line_count = 0
+        self._stream_step()
 
     def get_content(self):
         """获取编辑器中的内容"""
@@ -439,15 +872,139 @@ class MarkdownEditor(QWidget):
     def set_content(self, content):
         """设置编辑器中的内容"""
         # 清空之前预览框中的值
-        self.preview.setHtml("")
-        self.diary_editor.setPlainText(content)
+        self.clear_preview()
+        # 载入内容不是用户修改，不发出 textChangedSignal，避免触发自动保存
+        self.diary_editor.blockSignals(True)
+        # 在空文档上重新挂上高亮；挂在有内容的文档上会在之后重新高亮全文并发出 textChanged
+        self.highlighter.setDocument(None)
+        self.diary_editor.clear()
+        self.highlighter.setDocument(self.diary_editor.document())
+        self.highlighter.set_plain_text(self.diary_editor, content,
+                                        deferred=content.count("\n") >= self.HIGHLIGHT_SYNC_LINES)
+        self._on_content_changed()
+        self.diary_editor.blockSignals(False)
+        self.diary_editor.setReadOnly(False)
+        self.diary_editor.setPlaceholderText(self.EDITOR_PLACEHOLDER)
+        # 没有发出 textChanged，分屏预览需要单独刷新
+        self.schedule_live_preview()
+
+    def show_loading(self):
+        """日记在后台加载时先清空编辑器并显示提示，加载完成前不可编辑"""
+        self.clear_preview()
+        self.diary_editor.blockSignals(True)
+        self.diary_editor.clear()
+        self.diary_editor.blockSignals(False)
+        self._on_content_changed()
+        self.diary_editor.setReadOnly(True)
+        self.diary_editor.setPlaceholderText("正在加载...")
+
+    def select_range(self, position, length):
+        """选中正文中的一段文字并滚动到可见位置"""
+        if self.is_preview_mode():
+            self.switch_to_edit()
+        cursor = self.diary_editor.textCursor()
+        cursor.setPosition(min(position, len(self.diary_editor.toPlainText())))
+        cursor.setPosition(min(position + length, len(self.diary_editor.toPlainText())),
+                           QTextCursor.MoveMode.KeepAnchor)
+        self.diary_editor.setTextCursor(cursor)
+        self.diary_editor.centerCursor()
+        self.diary_editor.setFocus()
 
     def clear_content(self):
         self.diary_editor.clear()
 
     def get_preview_html(self, callback):
         """异步获取预览内容的HTML"""
-        if self.is_preview_mode():
-            self.preview.page().toHtml(callback)
+        if self.is_preview_mode() or self.is_split_mode():
+            # 页面中的块是分批送入的，直接用完整的渲染结果生成页面
+            if self._prerendered and self._prerendered[0] == self.content_revision:
+                callback(self._page_html(self._prerendered[1], 0))
+                return
+            # 在后台查询渲染缓存或渲染，长日记导出时界面不卡顿
+            thread = PreviewRenderThread(self.worker_renderer(), self.content_revision,
+                                         self.diary_editor.toPlainText(), self.render_cache)
+            thread.callback = callback
+            thread.finished_signal.connect(self._on_export_rendered)
+            thread.finished.connect(self._on_export_thread_finished)
+            self.export_threads.append(thread)
+            thread.start()
         else:
-            callback("")  # 编辑模式下没有预览内容
\ No newline at end of file
+            callback("")  # 编辑模式下没有预览内容
+
+    def _on_export_rendered(self, revision, blocks):
+        thread = self.sender()
+        if blocks is None:
+            # 后台渲染失败时在界面线程中重新渲染
+            blocks = self.renderer.render_blocks(thread.content)
+        thread.callback(self._page_html(blocks, 0))
+
+    def _on_export_thread_finished(self):
+        thread = self.sender()
+        if thread in self.export_threads:
+            self.export_threads.remove(thread)
+
+
+def _process_tree_rss_mb():
+    """当前进程及其子进程（Chromium 的 QtWebEngineProcess）的常驻内存之和，只支持 Linux"""
+    parents = {}
+    for pid in os.listdir("/proc"):
+        try:
+            with open(f"/proc/{pid}/stat") as file:
+                parents[int(pid)] = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (ValueError, OSError):
+            continue
+    tree, pending = set(), [os.getpid()]
+    while pending:
+        pid = pending.pop()
+        tree.add(pid)
+        pending += [child for child, parent in parents.items() if parent == pid]
+    total = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/statm") as file:
+                total += int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            continue
+    return total / 1024 / 1024
+
+
+def benchmark(mode=None):
+    """
+    测量启动时创建编辑器的耗时和内存
+
+    lazy 只创建编辑器（预览框推迟到第一次预览）；eager 创建编辑器后立即创建预览框并加载空白页面，即推迟之前的做法。
+    两种方式各在单独的进程中测量，内存包含 Chromium 子进程。
+    """
+    import subprocess
+    import sys
+
+    if mode is None:
+        for mode in ("lazy", "eager"):
+            subprocess.run([sys.executable, "-m", "src.widget.markdown_editor", mode], check=False)
+        return
+    QtCore.QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    start = time.perf_counter()
+    app = QApplication.instance() or QApplication(sys.argv)
+    base_rss = _process_tree_rss_mb()
+    editor = MarkdownEditor()
+    editor.show()
+    if mode == "eager":
+        loop = QtCore.QEventLoop()
+        editor.ensure_preview().loadFinished.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        loop.exec()
+    app.processEvents()
+    elapsed = (time.perf_counter() - start) * 1000
+    # 等子进程启动完成后再统计内存
+    QTimer.singleShot(1000, app.quit)
+    app.exec()
+    print(f"{mode}：创建编辑器 {elapsed:.0f} ms，常驻内存 {_process_tree_rss_mb():.0f} MB"
+          f"（QApplication 创建后 {base_rss:.0f} MB），"
+          f"已加载 QtWebEngine：{'PySide6.QtWebEngineWidgets' in sys.modules}")
+
+
+if __name__ == "__main__":
+    # python -m src.widget.markdown_editor [lazy|eager]
+    import sys
+
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
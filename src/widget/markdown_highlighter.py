@@ -0,0 +1,291 @@
+import re
+import sys
+import time
+
+from PySide6.QtCore import QObject, QTimer, SIGNAL, SLOT
+from PySide6.QtGui import QSyntaxHighlighter, QTextCharFormat, QColor, QFont
+
+from src.search.link_index import LinkIndex
+from src.util.diary_file_util import DiaryFileUtil
+
+
+class MarkdownHighlighter(QSyntaxHighlighter):
+    """
+    编辑器中的 Markdown 语法高亮
+
+    QSyntaxHighlighter 只重新高亮被修改的段落，段落状态（是否在代码块中）变化时才继续处理后面的段落。
+    段落状态记录所在代码块的围栏：-1（未高亮段落的默认值）表示不在代码块中，否则为 围栏长度 * 2 + 是否为 ~~~，
+    只有输入或删除围栏时才会重新高亮到代码块结束为止。
+    长文档载入时不高亮，先只扫描围栏设置好代码块中段落的状态，再在空闲时从可见部分开始分批高亮。
+    """
+    FENCE_PATTERN = re.compile(r" {0,3}(`{3,}|~{3,})")
+    HEADING_PATTERN = re.compile(r" {0,3}#{1,6}(?:\s|$)")
+    QUOTE_PATTERN = re.compile(r" {0,3}(?:>\s?)+")
+    LIST_PATTERN = re.compile(r"\s*(?:[-+*]|\d{1,9}[.)])(?:\s+|$)")
+    TASK_PATTERN = re.compile(r"\[([ xX])\](?=\s|$)")
+    RULE_PATTERN = re.compile(r" {0,3}(?:(?:\*\s*){3,}|(?:-\s*){3,}|(?:_\s*){3,})$")
+    TABLE_DELIMITER_PATTERN = re.compile(r"\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)+\|?\s*$")
+    PIPE_PATTERN = re.compile(r"(?<!\\)\|")
+    # 行内格式，后面的覆盖前面的（行内代码优先）
+    STRONG_PATTERN = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+    EMPHASIS_PATTERN = re.compile(r"(?<![*\w])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?!\*)|(?<![_\w])_(?=\S)(.+?)(?<=\S)_(?![_\w])")
+    STRIKE_PATTERN = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+    LINK_PATTERN = re.compile(r"!?\[[^\]\n]*\]\([^)\n]*\)|<https?://[^>\s]+>")
+    INLINE_CODE_PATTERN = re.compile(r"(`+)(.+?)(?<!`)\1(?!`)")
+    # 可能带有格式的字符，普通文字段落直接跳过
+    MARKUP_PATTERN = re.compile(r"[#>*+\-|`\[<~_=]|\d[.)]")
+    # 码点超出 BMP 的字符，Qt 中按 UTF-16 计算位置，需要换算
+    WIDE_CHAR_PATTERN = re.compile(r"[\U00010000-\U0010FFFF]")
+    # 可能是围栏的行，载入长文档时用来找出代码块
+    FENCE_LINE_PATTERN = re.compile(r"^ {0,3}(?:`{3,}|~{3,}).*$", re.M)
+    # 分批高亮时每次处理的段落数
+    CHUNK_BLOCKS = 1000
+
+    def __init__(self, document=None):
+        super().__init__(document)
+        self.formats = {
+            "heading": self._format("#1f5f99", bold=True),
+            "strong": self._format(bold=True),
+            "emphasis": self._format(italic=True),
+            "strike": self._format("#8a8a8a", strike=True),
+            "code": self._format("#c7254e", background="#f3f3f3"),
+            "fence": self._format("#6a737d", background="#f6f8fa"),
+            "link": self._format("#0366d6", underline=True),
+            "tag": self._format("#d35400"),
+            "quote": self._format("#6a737d"),
+            "marker": self._format("#d35400", bold=True),
+            "task": self._format("#d35400", bold=True),
+            "task_done": self._format("#2e7d32", bold=True),
+            "table": self._format("#9a9a9a"),
+            "rule": self._format("#9a9a9a"),
+        }
+        # 等待分批高亮的段落 [(起始段落, 结束段落)]
+        self._pending = []
+        self._chunk_timer = QTimer(self)
+        self._chunk_timer.setInterval(0)
+        self._chunk_timer.timeout.connect(self._highlight_chunk)
+
+    @staticmethod
+    def _format(color=None, background=None, bold=False, italic=False, underline=False, strike=False):
+        text_format = QTextCharFormat()
+        if color:
+            text_format.setForeground(QColor(color))
+        if background:
+            text_format.setBackground(QColor(background))
+        if bold:
+            text_format.setFontWeight(QFont.Weight.Bold)
+        text_format.setFontItalic(italic)
+        text_format.setFontUnderline(underline)
+        text_format.setFontStrikeOut(strike)
+        return text_format
+
+    @classmethod
+    def fence_state(cls, fence, text):
+        """上一段落之后的围栏状态为 fence 时，这一段落之后的围栏状态，0 表示不在代码块中"""
+        match = cls.FENCE_PATTERN.match(text)
+        if fence:
+            # 闭合围栏：同一种字符、不短于开头、后面只有空白
+            if match and match.group(1)[0] == "`~"[fence & 1] and len(match.group(1)) >= fence >> 1 \
+                    and not text[match.end():].strip():
+                return 0
+            return fence
+        if match and not (match.group(1)[0] == "`" and "`" in text[match.end():]):
+            return len(match.group(1)) * 2 + (match.group(1)[0] == "~")
+        return 0
+
+    def highlightBlock(self, text):
+        # 位置换算表，只有包含 BMP 之外字符的段落才需要
+        self._offsets = self._utf16_offsets(text) if self.WIDE_CHAR_PATTERN.search(text) else None
+        fence = max(self.previousBlockState(), 0)
+        state = self.fence_state(fence, text)
+        self.setCurrentBlockState(state or -1)
+        if fence or state:
+            self._set(0, len(text), "fence")
+            return
+        if not self.MARKUP_PATTERN.search(text):
+            return
+
+        if self.HEADING_PATTERN.match(text):
+            self._set(0, len(text), "heading")
+            return
+        if self.RULE_PATTERN.match(text):
+            self._set(0, len(text), "rule")
+            return
+        if self.TABLE_DELIMITER_PATTERN.match(text):
+            self._set(0, len(text), "table")
+            return
+        start = 0
+        match = self.QUOTE_PATTERN.match(text)
+        if match:
+            self._set(0, len(text), "quote")
+            start = match.end()
+        match = self.LIST_PATTERN.match(text, start)
+        if match:
+            self._set(match.start(), match.end(), "marker")
+            start = match.end()
+            task = self.TASK_PATTERN.match(text, start)
+            if task:
+                self._set(task.start(), task.end(), "task" if task.group(1) == " " else "task_done")
+                start = task.end()
+        if "|" in text:
+            for match in self.PIPE_PATTERN.finditer(text, start):
+                self._set(match.start(), match.end(), "table")
+        self._highlight_inline(text, start)
+
+    def _highlight_inline(self, text, start):
+        for pattern, name in ((self.STRONG_PATTERN, "strong"), (self.EMPHASIS_PATTERN, "emphasis"),
+                              (self.STRIKE_PATTERN, "strike")):
+            for match in pattern.finditer(text, start):
+                self._set(match.start(), match.end(), name)
+        if "[" in text or "<" in text:
+            for match in self.LINK_PATTERN.finditer(text, start):
+                self._set(match.start(), match.end(), "link")
+            for match in LinkIndex.LINK_PATTERN.finditer(text, start):
+                self._set(match.start(), match.end(), "link")
+        if "#" in text:
+            for match in DiaryFileUtil.TAG_PATTERN.finditer(text, start):
+                self._set(match.start(), match.end(), "tag")
+        if "`" in text:
+            for match in self.INLINE_CODE_PATTERN.finditer(text, start):
+                self._set(match.start(), match.end(), "code")
+
+    def _set(self, start, end, name):
+        if self._offsets:
+            start, end = self._offsets[start], self._offsets[end]
+        self.setFormat(start, end - start, self.formats[name])
+
+    def set_plain_text(self, editor, content, deferred=False):
+        """
+        把内容载入编辑器
+
+        :param deferred: 为 True 时载入时不高亮，之后从可见部分开始分批高亮，用于很长的日记
+        """
+        self._pending = []
+        self._chunk_timer.stop()
+        document = editor.document()
+        # 暂时断开高亮器对文档变化的处理；断开失败时退回到载入时同步高亮
+        detached = deferred and document is self.document() and QObject.disconnect(
+            document, SIGNAL("contentsChange(int,int,int)"), self, SLOT("_q_reformatBlocks(int,int,int)"))
+        try:
+            editor.setPlainText(content)
+        finally:
+            if detached:
+                QObject.connect(document, SIGNAL("contentsChange(int,int,int)"),
+                                self, SLOT("_q_reformatBlocks(int,int,int)"))
+        if not detached:
+            return
+        self._set_fence_states(document, content)
+        first = editor.firstVisibleBlock().blockNumber()
+        self._pending = [(first, document.blockCount()), (0, first)]
+        self._chunk_timer.start()
+
+    def _set_fence_states(self, document, content):
+        """只扫描可能是围栏的行，给代码块中的段落设置状态，分批高亮时各段落的状态不变，不会连带高亮后面的段落"""
+        fence, start, line, position = 0, 0, 0, 0
+        for match in self.FENCE_LINE_PATTERN.finditer(content):
+            line += content.count("\n", position, match.start())
+            position = match.start()
+            state = self.fence_state(fence, match.group())
+            if state and not fence:
+                fence, start = state, line
+            elif fence and not state:
+                self._set_block_states(document, start, line, fence)
+                fence = 0
+        if fence:
+            self._set_block_states(document, start, document.blockCount(), fence)
+
+    @staticmethod
+    def _set_block_states(document, start, stop, state):
+        block = document.findBlockByNumber(start)
+        for _ in range(start, stop):
+            if not block.isValid():
+                return
+            block.setUserState(state)
+            block = block.next()
+
+    def _highlight_chunk(self):
+        document = self.document()
+        if document is None or not self._pending:
+            self._pending = []
+            self._chunk_timer.stop()
+            return
+        start, end = self._pending[0]
+        stop = min(start + self.CHUNK_BLOCKS, end)
+        block = document.findBlockByNumber(start)
+        # 只改变格式，不发出内容变化的信号，否则编辑器会当作用户修改
+        document.blockSignals(True)
+        try:
+            for _ in range(start, stop):
+                if not block.isValid():
+                    break
+                self.rehighlightBlock(block)
+                block = block.next()
+        finally:
+            document.blockSignals(False)
+        if stop < end:
+            self._pending[0] = (stop, end)
+        else:
+            self._pending.pop(0)
+
+    @property
+    def pending(self):
+        """是否还有等待分批高亮的段落"""
+        return bool(self._pending)
+
+    @staticmethod
+    def _utf16_offsets(text):
+        offsets = [0]
+        for char in text:
+            offsets.append(offsets[-1] + (2 if ord(char) > 0xFFFF else 1))
+        return offsets
+
+
+def benchmark(line_count=20000, keystrokes=500):
+    """在 line_count 行的日记中模拟输入，对比有无高亮时每次按键的耗时"""
+    import random
+    from PySide6.QtWidgets import QApplication, QPlainTextEdit
+    from PySide6.QtGui import QTextCursor
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    random.seed(0)
+    samples = [
+        "# 2024 年 {i} 日", "", "今天 **天气** 很好，和朋友去了 [公园](https://example.com) #散步 [[读书笔记]]。",
+        "- [ ] 待办事项 {i}", "- [x] 已完成 `code` 的 *整理*", "> 引用的一句话", "| 项目 | 花费 |", "| --- | ---: |",
+        "| 咖啡 | {i} |", "```python", "print({i})", "```", "~~删除线~~ 和 _强调_", "---",
+    ]
+    content = "\n".join(samples[i % len(samples)].format(i=i) for i in range(line_count))
+    results = []
+    for highlighted in (False, True):
+        editor = QPlainTextEdit()
+        editor.resize(800, 600)
+        editor.setPlainText(content)
+        highlighter = None
+        start = time.perf_counter()
+        if highlighted:
+            highlighter = MarkdownHighlighter(editor.document())
+            highlighter.rehighlight()
+        full = (time.perf_counter() - start) * 1000
+        times = []
+        cursor = QTextCursor(editor.document())
+        for _ in range(keystrokes):
+            block = editor.document().findBlockByNumber(random.randrange(line_count))
+            cursor.setPosition(block.position() + random.randint(0, block.length() - 1))
+            char = random.choice("a中*`#|[ ")
+            start = time.perf_counter()
+            cursor.insertText(char)
+            cursor.deletePreviousChar()
+            times.append((time.perf_counter() - start) * 1000 / 2)
+        app.processEvents()
+        times.sort()
+        results.append(times)
+        print(f"{'有' if highlighted else '无'}高亮：{line_count} 行，全文高亮 {full:.0f} ms，"
+              f"每次按键平均 {sum(times) / len(times):.3f} ms，"
+              f"P99 {times[int(len(times) * 0.99)]:.3f} ms，最大 {times[-1]:.3f} ms")
+        del highlighter
+        editor.deleteLater()
+    return results
+
+
+if __name__ == "__main__":
+    # python -m src.widget.markdown_highlighter [行数]
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
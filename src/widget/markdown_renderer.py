@@ -0,0 +1,200 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import markdown_it
+import pygments
+from markdown_it import MarkdownIt
+from markdown_it.rules_core import StateCore
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+from src.search.link_index import LinkIndex
+
+
+class MarkdownRenderer:
+    """
+    按顶层块渲染 Markdown
+
+    先只做块级解析，按顶层块（段落、标题、列表、代码块等）切分，每块以源文本的哈希为键缓存
+    行内解析后的 token 和 HTML，未修改的块不再做行内解析和生成 HTML。预览只需把键不同的块替换到页面中。
+    缓存的大小跟随文档：每次完整渲染后只保留本次用到的块，块再多也不会因为容量不足而全部失效。
+    代码块在渲染时用 Pygments 高亮，预览和导出得到相同的 HTML，不依赖页面中的脚本。
+    可以在后台线程中调用。
+    """
+    # 最多缓存的代码块高亮结果
+    MAX_HIGHLIGHT_CACHE = 1024
+    # Pygments 配色
+    HIGHLIGHT_STYLE = "default"
+    # 输出的 HTML 有变化时加一，渲染缓存随之失效
+    VERSION = 2
+
+    def __init__(self):
+        # 使用 markdown-it-py 进行 Markdown 渲染，启用表格解析功能，代码块交给 highlight 钩子
+        self.md_parser = MarkdownIt("commonmark", {"highlight": self._highlight}).enable("table")
+        # [[链接]] 和 #标签 在行内解析之后转成可点击的链接
+        self.md_parser.core.ruler.before("text_join", "wiki_links", self._linkify)
+        self._formatter = HtmlFormatter(nowrap=True, style=self.HIGHLIGHT_STYLE)
+        # (语言, 代码哈希) -> 高亮后的 HTML
+        self._highlight_cache = OrderedDict()
+        # 语言 -> Pygments lexer，查找 lexer 的开销比高亮一小段代码还大
+        self._lexers = {}
+        # 块的键 -> (tokens, HTML)，只包含上一次完整渲染用到的块
+        self._cache = {}
+        self._lock = threading.Lock()
+        # 核心规则分成块级解析和之后的行内解析两部分
+        rules = zip(self.md_parser.core.ruler.get_active_rules(), self.md_parser.core.ruler.getRules(""))
+        self._block_rules, self._inline_rules = [], []
+        for name, rule in rules:
+            (self._block_rules if name in ("normalize", "block") else self._inline_rules).append(rule)
+
+    def render_blocks(self, content, cancel_event=None):
+        """
+        渲染文档，返回 [(块的键, HTML, 块的起始行)]
+
+        :param cancel_event: threading.Event，置位后在处理下一块之前停止并返回 None
+        """
+        with self._lock:
+            if cancel_event and cancel_event.is_set():
+                return None
+            return self._render_blocks(content, cancel_event)
+
+    def _render_blocks(self, content, cancel_event):
+        env = {}
+        state = StateCore(content, self.md_parser, env)
+        for rule in self._block_rules:
+            rule(state)
+        tokens = state.tokens
+        lines = state.src.split("\n")
+        # 引用式链接的定义影响整篇文档，计入每个块的键
+        references = repr(sorted((label, ref["href"], ref["title"]) for label, ref in env.get("references", {}).items()))
+        blocks = []
+        # 本次用到的块，完整渲染后替换掉原来的缓存
+        cache = {}
+        for start, end in self._split_blocks(tokens):
+            if cancel_event and cancel_event.is_set():
+                # 已经渲染的块留到下次使用
+                self._cache.update(cache)
+                return None
+            block_tokens = tokens[start:end]
+            first_line, last_line = block_tokens[0].map or (0, 0)
+            key = hashlib.sha1("\n".join(lines[first_line:last_line]).encode()
+                               + references.encode()).hexdigest()
+            cached = cache.get(key) or self._cache.get(key)
+            if cached is None:
+                block_state = StateCore(state.src, self.md_parser, env, block_tokens)
+                for rule in self._inline_rules:
+                    rule(block_state)
+                block_tokens = block_state.tokens
+                cached = (block_tokens, self.md_parser.renderer.render(block_tokens, self.md_parser.options, env))
+            cache[key] = cached
+            blocks.append((key, cached[1], first_line))
+        self._cache = cache
+        return blocks
+
+    @staticmethod
+    def _linkify(state):
+        """markdown-it 的核心规则：把行内 token 中的 [[链接]] 和 #标签 转成链接"""
+        for token in state.tokens:
+            if token.type == "inline" and token.children:
+                token.children = LinkIndex.linkify(token.children)
+
+    def _highlight(self, code, lang, attrs):
+        """
+        高亮代码块（markdown-it 的 highlight 钩子），按 (语言, 代码哈希) 缓存
+
+        没有指定语言或 Pygments 不认识该语言时返回空字符串，由 markdown-it 按原文转义
+        """
+        if not lang:
+            return ""
+        key = (lang, hashlib.sha1(code.encode()).hexdigest())
+        html = self._highlight_cache.get(key)
+        if html is not None:
+            self._highlight_cache.move_to_end(key)
+            return html
+        if lang not in self._lexers:
+            try:
+                self._lexers[lang] = get_lexer_by_name(lang)
+            except ClassNotFound:
+                self._lexers[lang] = None
+        lexer = self._lexers[lang]
+        html = highlight(code, lexer, self._formatter) if lexer else ""
+        self._highlight_cache[key] = html
+        if len(self._highlight_cache) > self.MAX_HIGHLIGHT_CACHE:
+            self._highlight_cache.popitem(last=False)
+        return html
+
+    def clear(self):
+        """丢弃缓存的块和代码高亮结果，释放其中的明文；不等待正在进行的渲染，换成新的空缓存"""
+        self._cache = {}
+        self._highlight_cache = OrderedDict()
+
+    @classmethod
+    def version(cls):
+        """渲染结果的版本，包含依赖库的版本，用于渲染缓存的键"""
+        return f"{cls.VERSION}/{markdown_it.__version__}/{pygments.__version__}/{cls.HIGHLIGHT_STYLE}"
+
+    @classmethod
+    def highlight_css(cls):
+        """代码高亮的样式，放到预览页面中"""
+        return HtmlFormatter(style=cls.HIGHLIGHT_STYLE).get_style_defs("pre")
+
+    def render(self, content):
+        """渲染整篇文档的 HTML"""
+        return "".join(html for _, html, _ in self.render_blocks(content))
+
+    @staticmethod
+    def head(content, size):
+        """
+        文档开头约 size 个字符的部分，在代码块之外的空行处截断，用于先渲染第一屏
+
+        截断处之后的块（以及在后面定义的引用式链接）可能与完整渲染的结果不同，之后由完整渲染替换
+        """
+        if len(content) <= size:
+            return content
+        in_fence = False
+        position = 0
+        while position < len(content):
+            end = content.find("\n", position)
+            end = len(content) if end < 0 else end + 1
+            line = content[position:end]
+            position = end
+            stripped = line.strip()
+            if stripped.startswith(("```", "~~~")) and len(line) - len(line.lstrip(" ")) < 4:
+                in_fence = not in_fence
+            elif position >= size and (not stripped and not in_fence or position >= size * 4):
+                break
+        return content[:position]
+
+    @staticmethod
+    def _split_blocks(tokens):
+        """按顶层块切分 token，返回 [(开始, 结束)]"""
+        ranges = []
+        start = 0
+        depth = 0
+        for index, token in enumerate(tokens):
+            depth += token.nesting
+            if depth == 0:
+                ranges.append((start, index + 1))
+                start = index + 1
+        return ranges
+
+    @staticmethod
+    def diff_blocks(old_keys, new_keys):
+        """
+        比较前后两次渲染的块，返回 (开始位置, 删除的块数, 新块的下标范围)
+
+        只去掉相同的开头和结尾，中间部分整体替换；没有变化时返回 None
+        """
+        if old_keys == new_keys:
+            return None
+        prefix = 0
+        limit = min(len(old_keys), len(new_keys))
+        while prefix < limit and old_keys[prefix] == new_keys[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old_keys[-1 - suffix] == new_keys[-1 - suffix]:
+            suffix += 1
+        return prefix, len(old_keys) - prefix - suffix, range(prefix, len(new_keys) - suffix)
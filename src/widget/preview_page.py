@@ -0,0 +1,19 @@
+from PySide6.QtWebEngineCore import QWebEnginePage
+
+from PySide6.QtCore import Signal
+
+from src.search.link_index import LinkIndex
+
+
+class PreviewPage(QWebEnginePage):
+    """拦截预览中 [[链接]] 和 #标签 的点击，交给程序处理"""
+    wikiLinkClicked = Signal(str)
+    tagClicked = Signal(str)
+
+    def acceptNavigationRequest(self, url, navigation_type, is_main_frame):
+        target = LinkIndex.parse_url(url.toString())
+        if target:
+            kind, value = target
+            (self.wikiLinkClicked if kind == "link" else self.tagClicked).emit(value)
+            return False
+        return super().acceptNavigationRequest(url, navigation_type, is_main_frame)
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import time
+import unittest
+
+from cryptography.fernet import Fernet
+
+from src.storage.diary_cache import DiaryCache
+from src.storage.render_cache import RenderCache
+
+
+class DiaryCacheTest(unittest.TestCase):
+
+    def test_get_checks_signature(self):
+        cache = DiaryCache(1024)
+        cache.put("/d/a.enc", "正文", (1, 6))
+        self.assertEqual(cache.get("/d/a.enc", (1, 6)), "正文")
+        self.assertIsNone(cache.get("/d/a.enc", (2, 6)))
+        self.assertEqual(len(cache), 0)
+
+    def test_eviction_by_bytes(self):
+        cache = DiaryCache(10)
+        cache.put("/d/a.enc", "aaaa", (1, 4))
+        cache.put("/d/b.enc", "bbbb", (1, 4))
+        cache.get("/d/a.enc", (1, 4))
+        cache.put("/d/c.enc", "cccc", (1, 4))
+        # b 最久未使用，先被淘汰
+        self.assertIsNone(cache.get("/d/b.enc", (1, 4)))
+        self.assertEqual(cache.get("/d/a.enc", (1, 4)), "aaaa")
+        self.assertEqual(cache.size, 8)
+        cache.put("/d/big.enc", "x" * 11, (1, 11))
+        self.assertIsNone(cache.get("/d/big.enc", (1, 11)))
+        cache.set_max_bytes(4)
+        self.assertEqual(len(cache), 1)
+
+    def test_plaintext_wiped(self):
+        cache = DiaryCache(1024)
+        cache.put("/d/a.enc", "secret", (1, 6))
+        data = cache._entries["/d/a.enc"][1]
+        cache.discard("/d")
+        self.assertEqual(bytes(data), bytes(len(data)))
+        self.assertEqual(cache.size, 0)
+
+    def test_prefetch_keeps_newer_content(self):
+        cache = DiaryCache(1024)
+        cache.put("/d/a.enc", "saved", (2, 5))
+        cache.put("/d/a.enc", "old", (1, 3), prefetched=True)
+        self.assertEqual(cache.get("/d/a.enc", (2, 5)), "saved")
+
+
+class RenderCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.key = Fernet.generate_key()
+        self.dir = tempfile.TemporaryDirectory()
+        self.content = "x" * RenderCache.MIN_CONTENT_CHARS
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def cache(self, max_bytes=1 << 20, version="1"):
+        return RenderCache(self.key, self.dir.name, version, max_bytes)
+
+    def test_round_trip(self):
+        blocks = [("key1", "<p>段落</p>", 0), ("key2", "<h1>标题</h1>", 3)]
+        self.cache().put(self.content, blocks)
+        # 新实例从磁盘读取
+        self.assertEqual(self.cache().get(self.content), blocks)
+        self.assertIsNone(self.cache(version="2").get(self.content))
+        self.assertIsNone(RenderCache(Fernet.generate_key(), self.dir.name, "1", 1 << 20).get(self.content))
+
+    def test_short_content_not_cached(self):
+        cache = self.cache()
+        cache.put("short", [("k", "<p>short</p>", 0)])
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get("short"))
+
+    def test_no_plaintext_file_names(self):
+        self.cache().put(self.content, [("k", "<p>x</p>", 0)])
+        for name in os.listdir(self.dir.name):
+            self.assertNotIn("x" * 16, name)
+            with open(os.path.join(self.dir.name, name), "rb") as file:
+                self.assertNotIn(b"<p>", file.read())
+
+    def test_eviction_survives_restart(self):
+        cache = self.cache()
+        contents = [str(i) * RenderCache.MIN_CONTENT_CHARS for i in range(3)]
+        for content in contents:
+            cache.put(content, [("k", content[:100], 0)])
+            time.sleep(0.01)
+        entry_size = cache.size // 3
+        # 用过的排到最后，重启后仍按修改时间恢复顺序
+        self.assertIsNotNone(cache.get(contents[0]))
+        restarted = self.cache(max_bytes=entry_size * 2 + entry_size // 2)
+        self.assertIsNone(restarted.get(contents[1]))
+        self.assertEqual(len(restarted), 2)
+        self.assertIsNotNone(restarted.get(contents[0]))
+        self.assertIsNotNone(restarted.get(contents[2]))
+
+    def test_corrupt_entry_discarded(self):
+        cache = self.cache()
+        cache.put(self.content, [("k", "<p>x</p>", 0)])
+        (name,) = os.listdir(self.dir.name)
+        with open(os.path.join(self.dir.name, name), "wb") as file:
+            file.write(b"corrupt")
+        self.assertIsNone(cache.get(self.content))
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from cryptography.fernet import Fernet
+
+from src.util.diary_file_util import DiaryFileUtil
+from src.util.encryption_util import EncryptionUtil
+
+
+class DiaryFileUtilTest(unittest.TestCase):
+    """FSDM 文件头：MAGIC | VERSION | META_LEN | 元数据密文 | 正文密文"""
+
+    def setUp(self):
+        self.key = Fernet.generate_key()
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "diary.enc")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        content = "# 标题\n\n正文 #标签 和 `#代码`\n"
+        DiaryFileUtil.write_diary(self.path, content, self.key)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        self.assertTrue(data.startswith(DiaryFileUtil.MAGIC))
+        self.assertEqual(data[4], DiaryFileUtil.VERSION)
+        self.assertEqual(DiaryFileUtil.read_diary(self.path, self.key), content)
+        meta = DiaryFileUtil.read_meta(self.path, self.key)
+        self.assertEqual(meta["first_line"], "标题")
+        self.assertEqual(meta["tags"], ["标签"])
+        self.assertEqual(meta["chars"], len(content))
+
+    def test_rewrite_keeps_created(self):
+        DiaryFileUtil.write_diary(self.path, "a", self.key, created=1000)
+        DiaryFileUtil.write_diary(self.path, "b", self.key)
+        self.assertEqual(DiaryFileUtil.read_meta(self.path, self.key)["created"], 1000)
+
+    def test_legacy_file_is_read_only(self):
+        with open(self.path, "wb") as file:
+            file.write(EncryptionUtil.encrypt("旧日记".encode(), self.key))
+        os.utime(self.path, (1000, 1000))
+        before = os.stat(self.path)
+        self.assertIsNone(DiaryFileUtil.read_meta(self.path, self.key))
+        self.assertEqual(DiaryFileUtil.read_diary(self.path, self.key), "旧日记")
+        after = os.stat(self.path)
+        self.assertEqual((before.st_mtime_ns, before.st_size), (after.st_mtime_ns, after.st_size))
+        # 第一次保存时写入文件头，创建时间取原来的修改时间
+        DiaryFileUtil.write_diary(self.path, "旧日记", self.key)
+        self.assertEqual(DiaryFileUtil.read_meta(self.path, self.key)["created"], 1000)
+
+    def test_unknown_version_rejected(self):
+        DiaryFileUtil.write_diary(self.path, "a", self.key)
+        with open(self.path, "rb") as file:
+            data = bytearray(file.read())
+        data[4] = DiaryFileUtil.VERSION + 1
+        with open(self.path, "wb") as file:
+            file.write(data)
+        self.assertIsNone(DiaryFileUtil.read_meta(self.path, self.key))
+        with self.assertRaises(ValueError):
+            DiaryFileUtil.read_diary(self.path, self.key)
+
+    def test_truncated_header_rejected(self):
+        header = DiaryFileUtil.MAGIC + struct.pack(">BI", DiaryFileUtil.VERSION, 100)
+        with open(self.path, "wb") as file:
+            file.write(header + b"x" * 10)
+        self.assertIsNone(DiaryFileUtil.read_meta(self.path, self.key))
+        with self.assertRaises(ValueError):
+            DiaryFileUtil.split(header + b"x" * 10)
+        with self.assertRaises(ValueError):
+            DiaryFileUtil.split(DiaryFileUtil.MAGIC + b"\x01")
+
+    def test_tags_skip_both_fence_styles(self):
+        content = "#a\n```\n#b\n```\n~~~\n#c\n~~~~\n#d `#e`\n~~~\n#f"
+        self.assertEqual(DiaryFileUtil.extract_tags(content), ["a", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
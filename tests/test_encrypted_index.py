@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from cryptography.fernet import Fernet
+
+from src.search.link_index import LinkIndex
+from src.search.search_index import SearchIndex
+
+
+class EncryptedIndexTest(unittest.TestCase):
+    """索引的快照 + 追加日志"""
+
+    def setUp(self):
+        self.key = Fernet.generate_key()
+        self.dir = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.dir.name, "search_index.enc")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def reload(self):
+        index = SearchIndex(self.key, self.index_file)
+        self.assertTrue(index.load())
+        return index
+
+    def test_snapshot_and_log_round_trip(self):
+        index = SearchIndex(self.key, self.index_file)
+        index.update("/d/a.enc", "苹果 apple", [1, 10])
+        index.update("/d/b.enc", "香蕉 banana", [2, 20])
+        index.save()
+        self.assertTrue(os.path.exists(self.index_file))
+        self.assertFalse(os.path.exists(index.log_file))
+        # 之后的变化只追加到日志
+        index.update("/d/c.enc", "cherry", [3, 30])
+        index.remove("/d/b.enc")
+        index.rename("/d/a.enc", "/d/x/a.enc")
+        index.save()
+        self.assertTrue(os.path.exists(index.log_file))
+        self.assertFalse(index.dirty)
+
+        loaded = self.reload()
+        self.assertEqual(sorted(loaded.paths()), ["/d/c.enc", "/d/x/a.enc"])
+        self.assertEqual(loaded.signature("/d/x/a.enc"), [1, 10])
+        self.assertEqual([path for path, _ in loaded.search("apple")], ["/d/x/a.enc"])
+        self.assertEqual(loaded.search("banana"), [])
+        self.assertFalse(loaded.dirty)
+
+    def test_stale_log_records_ignored(self):
+        index = SearchIndex(self.key, self.index_file)
+        index.update("/d/a.enc", "apple", [1, 1])
+        index.save()
+        index.update("/d/b.enc", "banana", [2, 2])
+        index.save()
+        with open(index.log_file, "rb") as file:
+            stale_log = file.read()
+        # 重写快照后，旧快照的日志记录不再生效
+        index.remove("/d/b.enc")
+        index._generation = None
+        index.save()
+        with open(index.log_file, "wb") as file:
+            file.write(stale_log)
+        self.assertEqual(self.reload().paths(), ["/d/a.enc"])
+
+    def test_corrupt_log_tail(self):
+        index = SearchIndex(self.key, self.index_file)
+        index.update("/d/a.enc", "apple", [1, 1])
+        index.save()
+        index.update("/d/b.enc", "banana", [2, 2])
+        index.save()
+        with open(index.log_file, "ab") as file:
+            file.write(b"\x00\x00\x00\x10garbage")
+        loaded = self.reload()
+        self.assertEqual(sorted(loaded.paths()), ["/d/a.enc", "/d/b.enc"])
+        # 日志不完整时下次保存重写快照
+        self.assertTrue(loaded.dirty)
+        loaded.save()
+        self.assertFalse(os.path.exists(loaded.log_file))
+        self.assertEqual(sorted(self.reload().paths()), ["/d/a.enc", "/d/b.enc"])
+
+    def test_compaction(self):
+        index = SearchIndex(self.key, self.index_file)
+        index.COMPACT_MIN_BYTES = 0
+        index.update("/d/a.enc", "apple", [1, 1])
+        index.save()
+        for i in range(20):
+            index.update(f"/d/{i}.enc", f"word{i} " * 50, [i, i])
+            index.save()
+        self.assertLess(os.path.getsize(index.log_file) if os.path.exists(index.log_file) else 0,
+                        os.path.getsize(self.index_file))
+        self.assertEqual(len(self.reload()), 21)
+
+    def test_wrong_key(self):
+        index = SearchIndex(self.key, self.index_file)
+        index.update("/d/a.enc", "apple", [1, 1])
+        index.save()
+        other = SearchIndex(Fernet.generate_key(), self.index_file)
+        self.assertFalse(other.load())
+        self.assertEqual(len(other), 0)
+
+    def test_link_index_round_trip(self):
+        index_file = os.path.join(self.dir.name, "link_index.enc")
+        index = LinkIndex(self.key, index_file)
+        index.update("/d/a.enc", "见 [[B|乙]] #标签", [1, 1])
+        index.update("/d/B.enc", "", [2, 2])
+        index.save()
+        loaded = LinkIndex(self.key, index_file)
+        self.assertTrue(loaded.load())
+        self.assertEqual(loaded.backlinks("/d/B.enc"), ["/d/a.enc"])
+        self.assertEqual(loaded.tagged("标签"), ["/d/a.enc"])
+        self.assertEqual(loaded.resolve("b"), "/d/B.enc")
+
+
+if __name__ == "__main__":
+    unittest.main()
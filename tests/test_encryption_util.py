@@ -0,0 +1,50 @@
+import os
+import unittest
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet
+
+from src.util.encryption_util import EncryptionUtil
+
+
+class EncryptionUtilTest(unittest.TestCase):
+    """Fernet 和 FSEG（AES-GCM）两种密文，解密时按文件头识别"""
+
+    def setUp(self):
+        self.key = Fernet.generate_key()
+        self.data = os.urandom(4096)
+
+    def test_round_trip(self):
+        for algorithm in (EncryptionUtil.ALGORITHM_FERNET, EncryptionUtil.ALGORITHM_AESGCM):
+            token = EncryptionUtil.encrypt(self.data, self.key, algorithm)
+            self.assertEqual(EncryptionUtil.is_aesgcm(token), algorithm == EncryptionUtil.ALGORITHM_AESGCM)
+            self.assertEqual(EncryptionUtil.decrypt(token, self.key), self.data)
+
+    def test_aesgcm_layout(self):
+        token = EncryptionUtil.encrypt(self.data, self.key, EncryptionUtil.ALGORITHM_AESGCM)
+        self.assertEqual(token[:4], EncryptionUtil.GCM_MAGIC)
+        self.assertEqual(token[4], EncryptionUtil.GCM_VERSION)
+        self.assertEqual(len(token), EncryptionUtil.GCM_HEADER_SIZE + len(self.data) + EncryptionUtil.GCM_TAG_SIZE)
+
+    def test_aesgcm_tampering_detected(self):
+        token = bytearray(EncryptionUtil.encrypt(self.data, self.key, EncryptionUtil.ALGORITHM_AESGCM))
+        token[-1] ^= 1
+        with self.assertRaises(InvalidTag):
+            EncryptionUtil.decrypt(bytes(token), self.key)
+
+    def test_aesgcm_wrong_key(self):
+        token = EncryptionUtil.encrypt(self.data, self.key, EncryptionUtil.ALGORITHM_AESGCM)
+        with self.assertRaises(InvalidTag):
+            EncryptionUtil.decrypt(token, Fernet.generate_key())
+
+    def test_aesgcm_bad_header(self):
+        token = bytearray(EncryptionUtil.encrypt(self.data, self.key, EncryptionUtil.ALGORITHM_AESGCM))
+        token[4] = EncryptionUtil.GCM_VERSION + 1
+        with self.assertRaises(ValueError):
+            EncryptionUtil.decrypt(bytes(token), self.key)
+        with self.assertRaises(ValueError):
+            EncryptionUtil.decrypt(EncryptionUtil.GCM_MAGIC + b"\x01", self.key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from cryptography.fernet import Fernet
+
+from src.storage.sqlite_storage import SqliteDiaryStorage
+from src.util.diary_file_util import DiaryFileUtil
+
+
+class SqliteDiaryStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.dir.name, "Diary")
+        self.storage = SqliteDiaryStorage(self.root, Fernet.generate_key(), os.path.join(self.dir.name, "diary.db"))
+
+    def tearDown(self):
+        self.storage.close()
+        self.dir.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def test_round_trip(self):
+        self.storage.write(self.path("a", "日记.enc"), "正文 #标签")
+        self.assertEqual(self.storage.read(self.path("a", "日记.enc")), "正文 #标签")
+        self.assertEqual(self.storage.read_meta(self.path("a", "日记.enc"))["tags"], ["标签"])
+        self.assertTrue(self.storage.is_dir(self.path("a")))
+        # read_raw 与文件后端的格式相同
+        raw = self.storage.read_raw(self.path("a", "日记.enc"))
+        self.assertEqual(DiaryFileUtil.unpack(raw, self.storage.key), "正文 #标签")
+
+    def test_write_keeps_created(self):
+        path = self.path("x.enc")
+        self.storage.write(path, "1")
+        created = self.storage.read_meta(path)["created"]
+        self.storage.write(path, "2")
+        self.assertEqual(self.storage.read_meta(path)["created"], created)
+
+    def test_subtree_does_not_match_siblings(self):
+        # "a/" 与 "a-b"、"a0"、"a.enc" 按字符串排序相邻，不能被当作 a 的子项
+        for rel in (("a", "1.enc"), ("a", "b", "2.enc"), ("a-b", "3.enc"), ("a0", "4.enc"), ("a.enc",)):
+            self.storage.write(self.path(*rel), rel[-1])
+        condition, params = self.storage._subtree("a")
+        rows = self.storage._conn().execute(f"SELECT path FROM entries WHERE {condition}", params).fetchall()
+        self.assertEqual(sorted(rel for (rel,) in rows), ["a", "a/1.enc", "a/b", "a/b/2.enc"])
+
+    def test_rename_folder(self):
+        self.storage.write(self.path("a", "b", "1.enc"), "one")
+        self.storage.write(self.path("a0", "2.enc"), "two")
+        self.storage.rename(self.path("a"), self.path("c", "d"))
+        self.assertEqual(self.storage.read(self.path("c", "d", "b", "1.enc")), "one")
+        self.assertEqual(self.storage.read(self.path("a0", "2.enc")), "two")
+        self.assertFalse(self.storage.exists(self.path("a")))
+        self.assertEqual(sorted(self.storage.list_files()),
+                         sorted([self.path("c", "d", "b", "1.enc"), self.path("a0", "2.enc")]))
+        entries = self.storage.list_entries(self.path("c", "d"))
+        self.assertEqual([(name, is_dir) for name, _, is_dir in entries], [("b", True)])
+
+    def test_rename_errors(self):
+        self.storage.write(self.path("1.enc"), "one")
+        self.storage.write(self.path("2.enc"), "two")
+        with self.assertRaises(FileExistsError):
+            self.storage.rename(self.path("1.enc"), self.path("2.enc"))
+        with self.assertRaises(FileNotFoundError):
+            self.storage.rename(self.path("3.enc"), self.path("4.enc"))
+
+    def test_delete_subtree(self):
+        self.storage.write(self.path("a", "1.enc"), "one")
+        self.storage.write(self.path("a0", "2.enc"), "two")
+        self.storage.delete(self.path("a"))
+        self.assertEqual(self.storage.list_files(), [self.path("a0", "2.enc")])
+
+    def test_reopen(self):
+        self.storage.write(self.path("1.enc"), "one")
+        self.storage.close()
+        storage = SqliteDiaryStorage(self.root, self.storage.key, self.storage.db_path)
+        try:
+            self.assertEqual(storage.read(self.path("1.enc")), "one")
+        finally:
+            storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()